@@ -0,0 +1,606 @@
+"""
+Ядро расписания будильников без зависимости от Kivy/KivyMD.
+
+Здесь находятся модель Alarm, определение чётности недели и расчёт ближайших
+срабатываний – как для одного будильника, так и пакетно для тысяч будильников
+(на массивах NumPy, если он установлен, иначе на чистом Python). AlarmArray хранит
+большие наборы будильников в одном буфере по записи фиксированного размера.
+"""
+import datetime
+import struct
+from array import array
+from collections.abc import MutableMapping
+from enum import IntEnum
+
+_np = False  # модуль numpy, None (не установлен) или False (ещё не импортировался)
+
+
+def _numpy():
+    # NumPy необязателен и импортируется только для пакетного расчёта: демону и UI он не нужен
+    global _np
+    if _np is False:
+        try:
+            import numpy
+            _np = numpy
+        except ImportError:
+            _np = None
+    return _np
+
+
+# Список дней недели (на русском), порядок совпадает с date.weekday()
+DAYS_OF_WEEK = ["Понедельник", "Вторник", "Среда", "Четверг", "Пятница", "Суббота", "Воскресенье"]
+
+# Чётность недели будильника (и код в пакетном представлении)
+class Parity(IntEnum):
+    ANY = 0
+    EVEN = 1
+    ODD = 2
+
+
+PARITY_ANY, PARITY_EVEN, PARITY_ODD = Parity.ANY, Parity.EVEN, Parity.ODD
+PARITY_CODES = {"любая": PARITY_ANY, "чётная": PARITY_EVEN, "нечётная": PARITY_ODD}
+WEEK_TYPE_NAMES = {code: week_type for week_type, code in PARITY_CODES.items()}
+
+# Общие объекты времени для всех будильников: расписание хранит только минуты от полуночи
+TIMES = [datetime.time(minute // 60, minute % 60) for minute in range(24 * 60)]
+_WEEKDAYS = {day: weekday for weekday, day in enumerate(DAYS_OF_WEEK)}
+
+# На сколько дней вперёд ищем срабатывание: двух недель хватает, чтобы встретить неделю любой чётности
+LOOKAHEAD_DAYS = 15
+
+# Начало отсчёта для времени в минутах, которое возвращает пакетный API
+EPOCH = datetime.datetime(1970, 1, 1)
+_EPOCH_DAY = EPOCH.toordinal()
+
+
+def _weekday(day):
+    try:
+        return _WEEKDAYS[day]
+    except KeyError:
+        raise ValueError(f"неизвестный день недели: {day!r}") from None
+
+
+class Schedule(MutableMapping):
+    """
+    Расписание будильника в прежнем виде – словарь {день недели: datetime.time} –
+    поверх маски дней и массива минут. Изменения сразу записываются в будильник.
+    Дни перечисляются с понедельника; секунды времени не сохраняются.
+    """
+
+    __slots__ = ("_alarm",)
+
+    def __init__(self, alarm):
+        self._alarm = alarm
+
+    def __getitem__(self, day):
+        weekday = _WEEKDAYS.get(day)
+        if weekday is None or not self._alarm.day_mask & (1 << weekday):
+            raise KeyError(day)
+        return TIMES[self._alarm.minutes[weekday]]
+
+    def __setitem__(self, day, scheduled_time):
+        weekday = _weekday(day)
+        self._alarm.minutes[weekday] = scheduled_time.hour * 60 + scheduled_time.minute
+        self._alarm.day_mask |= 1 << weekday
+
+    def __delitem__(self, day):
+        weekday = _WEEKDAYS.get(day)
+        if weekday is None or not self._alarm.day_mask & (1 << weekday):
+            raise KeyError(day)
+        self._alarm.day_mask &= ~(1 << weekday)
+
+    def __iter__(self):
+        mask = self._alarm.day_mask
+        return (DAYS_OF_WEEK[weekday] for weekday in range(7) if mask & (1 << weekday))
+
+    def __len__(self):
+        return bin(self._alarm.day_mask).count("1")
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+# Класс будильника
+class Alarm:
+    """
+    Будильник в компактном виде: 7-битная маска дней (бит 0 – понедельник),
+    минуты от полуночи по дням недели в массиве array('H') и чётность Parity.
+    Прежний интерфейс (schedule – словарь, week_type – строка) сохранён через свойства.
+    id – номер строки в хранилище этого устройства; uid и version – постоянный идентификатор
+    и версия записи для синхронизации между устройствами (их выдаёт storage.AlarmStore).
+    """
+
+    __slots__ = ("day_mask", "minutes", "parity", "active", "id", "last_triggered", "sound", "sound_name", "source",
+                 "uid", "version")
+
+    def __init__(self, schedule=None, week_type="любая", active=True, sound="Sounds/Beep.mp3", sound_name="Beep",
+                 source=None):
+        """
+        :param schedule: словарь, где ключ – день недели (str), а значение – объект datetime.time
+        :param week_type: "любая", "чётная" или "нечётная" (или Parity)
+        :param active: активен ли будильник
+        :param sound: путь к звуковому файлу
+        :param sound_name: отображаемое название звука
+        :param source: откуда создан будильник (например, "timetable:<группа>"); None – вручную
+        """
+        self.day_mask = 0
+        self.minutes = array("H", bytes(14))
+        if schedule:
+            self.schedule = schedule
+        self.week_type = week_type
+        self.active = active
+        self.id = None  # идентификатор в хранилище
+        self.last_triggered = None  # время последнего срабатывания
+        self.sound = sound
+        self.sound_name = sound_name
+        self.source = source
+        self.uid = None  # идентификатор для синхронизации, одинаковый на всех устройствах
+        self.version = 0
+
+    @classmethod
+    def compact(cls, day_mask, minutes, parity=PARITY_ANY, active=True, sound="Sounds/Beep.mp3", sound_name="Beep",
+                source=None):
+        """Будильник из компактных полей: minutes – 7 значений минут от полуночи (для невыбранных дней любые)."""
+        alarm = cls.__new__(cls)
+        alarm.day_mask = day_mask
+        alarm.minutes = array("H", minutes)
+        alarm.parity = Parity(parity)
+        alarm.active = active
+        alarm.id = None
+        alarm.last_triggered = None
+        alarm.sound = sound
+        alarm.sound_name = sound_name
+        alarm.source = source
+        alarm.uid = None
+        alarm.version = 0
+        return alarm
+
+    @property
+    def schedule(self):
+        return Schedule(self)
+
+    @schedule.setter
+    def schedule(self, schedule):
+        entries = [(_weekday(day), scheduled_time.hour * 60 + scheduled_time.minute)
+                   for day, scheduled_time in schedule.items()]
+        self.day_mask = 0
+        for weekday, minute in entries:
+            self.minutes[weekday] = minute
+            self.day_mask |= 1 << weekday
+
+    @property
+    def week_type(self):
+        return WEEK_TYPE_NAMES[self.parity]
+
+    @week_type.setter
+    def week_type(self, week_type):
+        if isinstance(week_type, Parity):
+            self.parity = week_type
+        elif week_type in PARITY_CODES:
+            self.parity = PARITY_CODES[week_type]
+        else:
+            raise ValueError(f"неизвестный тип недели: {week_type!r}")
+
+    def __str__(self):
+        if not self.day_mask:
+            schedule_str = "Нет дней"
+        else:
+            schedule_str = ", ".join([f"{day}: {time.strftime('%H:%M')}" for day, time in self.schedule.items()])
+        return f"{schedule_str} (Неделя: {self.week_type}, Звук: {self.sound_name})"
+
+
+def alarm_to_dict(alarm):
+    """Будильник в виде словаря для JSON (обмен с демоном)."""
+    return {
+        "id": alarm.id,
+        "schedule": {day: scheduled_time.strftime("%H:%M") for day, scheduled_time in alarm.schedule.items()},
+        "week_type": alarm.week_type,
+        "active": alarm.active,
+        "sound": alarm.sound,
+        "sound_name": alarm.sound_name,
+        "source": alarm.source,
+        "last_triggered": alarm.last_triggered.isoformat() if alarm.last_triggered else None,
+        "uid": alarm.uid,
+        "version": alarm.version,
+    }
+
+
+def alarm_from_dict(data):
+    schedule = {day: datetime.datetime.strptime(value, "%H:%M").time()
+                for day, value in data.get("schedule", {}).items()}
+    alarm = Alarm(schedule=schedule, week_type=data.get("week_type", "любая"), active=data.get("active", True),
+                  sound=data.get("sound", "Sounds/Beep.mp3"), sound_name=data.get("sound_name", "Beep"),
+                  source=data.get("source"))
+    alarm.id = data.get("id")
+    alarm.uid = data.get("uid")
+    alarm.version = data.get("version", 0)
+    if data.get("last_triggered"):
+        alarm.last_triggered = datetime.datetime.fromisoformat(data["last_triggered"])
+    return alarm
+
+
+def week_index(date):
+    """Номер недели от 0001-01-01 (понедельник); в отличие от isocalendar() не сбивается на стыке годов."""
+    return (date.toordinal() - 1) // 7
+
+
+# Для справки: определение чётности недели по дате (по умолчанию – по системной)
+def is_even_week(today=None):
+    week_number = (today if today is not None else datetime.date.today()).isocalendar()[1]
+    return week_number % 2 == 0
+
+
+def current_week_type(today=None):
+    return "чётная" if is_even_week(today) else "нечётная"
+
+
+def parity_offset_for(week_type, date):
+    """
+    Сдвиг чётности: неделя чётная, если (week_index + сдвиг) делится на 2.
+    Возвращает None, если чётность неизвестна ("любая").
+    """
+    if week_type == "чётная":
+        return week_index(date) % 2
+    if week_type == "нечётная":
+        return (week_index(date) + 1) % 2
+    return None
+
+
+def week_type_on(date, parity_offset):
+    return WEEK_TYPE_NAMES[parity_on(date, parity_offset)]
+
+
+def parity_on(date, parity_offset):
+    """Чётность недели, в которую попадает date: Parity.EVEN/ODD или Parity.ANY, если она неизвестна."""
+    if parity_offset is None:
+        return PARITY_ANY
+    return PARITY_EVEN if (week_index(date) + parity_offset) % 2 == 0 else PARITY_ODD
+
+
+def next_occurrence(alarm, after, parity_offset):
+    """
+    Ближайшее срабатывание будильника строго позже after.
+
+    :param alarm: объект Alarm
+    :param after: datetime.datetime, от которого ищем
+    :param parity_offset: сдвиг чётности (см. parity_offset_for) или None, если чётность неизвестна
+    :return: datetime.datetime или None, если будильник не сработает
+    """
+    mask = alarm.day_mask
+    if not alarm.active or not mask:
+        return None
+    parity = alarm.parity
+    if parity != PARITY_ANY and parity_offset is None:
+        return None
+    start = after.date()
+    first_weekday = start.weekday()
+    for offset in range(LOOKAHEAD_DAYS):
+        weekday = (first_weekday + offset) % 7
+        if not mask & (1 << weekday):
+            continue
+        day = start + datetime.timedelta(days=offset)
+        if parity != PARITY_ANY and (week_index(day) + parity_offset) % 2 != parity - PARITY_EVEN:
+            continue
+        minute = alarm.minutes[weekday]
+        fire_dt = datetime.datetime(day.year, day.month, day.day, minute // 60, minute % 60)
+        if fire_dt > after:
+            return fire_dt
+    return None
+
+
+# Пакетное представление
+class AlarmTable:
+    """
+    Массивное представление набора будильников:
+    day_mask – 7-битная маска дней (бит 0 – понедельник),
+    minutes – минуты от полуночи по дням недели (-1, если день не выбран),
+    parity – код PARITY_*, active – флаг активности.
+    Секунды в расписании не учитываются.
+    """
+
+    def __init__(self, day_mask, minutes, parity, active):
+        self.day_mask = day_mask
+        self.minutes = minutes
+        self.parity = parity
+        self.active = active
+
+    def __len__(self):
+        return len(self.day_mask)
+
+
+def encode_alarm(alarm):
+    mask = alarm.day_mask
+    minutes = [minute if mask & (1 << weekday) else -1 for weekday, minute in enumerate(alarm.minutes)]
+    return mask, minutes, alarm.parity, bool(alarm.active)
+
+
+def encode_alarms(alarms):
+    rows = [encode_alarm(alarm) for alarm in alarms]
+    day_mask = [row[0] for row in rows]
+    minutes = [row[1] for row in rows]
+    parity = [row[2] for row in rows]
+    active = [row[3] for row in rows]
+    np = _numpy()
+    if np is not None:
+        return AlarmTable(np.array(day_mask, dtype=np.uint8),
+                          np.array(minutes, dtype=np.int16).reshape(len(rows), 7),
+                          np.array(parity, dtype=np.uint8),
+                          np.array(active, dtype=bool))
+    return AlarmTable(day_mask, minutes, parity, active)
+
+
+# Запись AlarmArray: id, last_triggered (микросекунды от EPOCH), version, маска дней, чётность, активность,
+# минуты по 7 дням недели и номера строк sound, sound_name, source, uid в общей таблице строк
+_RECORD = struct.Struct("<qqqBBB7HHHHH")
+_MISSING = -1 << 63  # id или last_triggered не заданы
+_MICROSECOND = datetime.timedelta(microseconds=1)
+
+
+class AlarmArray:
+    """
+    Набор будильников в одном bytearray (array-of-structs, по _RECORD.size байт на будильник).
+    Строки (звук, название, источник, uid) хранятся по одному разу в общей таблице – до 65535 разных строк.
+    Будильники преобразуются в Alarm и обратно без потерь, вместе с uid и version для синхронизации.
+    """
+
+    def __init__(self, alarms=()):
+        self._data = bytearray()
+        self._strings = [None]  # номер 0 – None
+        self._string_numbers = {None: 0}
+        self.extend(alarms)
+
+    def _number(self, value):
+        number = self._string_numbers.get(value)
+        if number is None:
+            number = self._string_numbers[value] = len(self._strings)
+            self._strings.append(value)
+        return number
+
+    def _pack(self, alarm):
+        last_triggered = alarm.last_triggered
+        return _RECORD.pack(
+            _MISSING if alarm.id is None else alarm.id,
+            _MISSING if last_triggered is None else (last_triggered - EPOCH) // _MICROSECOND,
+            alarm.version, alarm.day_mask, alarm.parity, bool(alarm.active), *alarm.minutes,
+            self._number(alarm.sound), self._number(alarm.sound_name), self._number(alarm.source),
+            self._number(alarm.uid))
+
+    def _unpack(self, fields):
+        alarm_id, last_triggered, version, day_mask, parity, active = fields[:6]
+        sound, sound_name, source, uid = fields[13:]
+        strings = self._strings
+        alarm = Alarm.compact(day_mask, fields[6:13], parity, bool(active),
+                              strings[sound], strings[sound_name], strings[source])
+        alarm.uid = strings[uid]
+        alarm.version = version
+        if alarm_id != _MISSING:
+            alarm.id = alarm_id
+        if last_triggered != _MISSING:
+            alarm.last_triggered = EPOCH + datetime.timedelta(microseconds=last_triggered)
+        return alarm
+
+    def _offset(self, index):
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("индекс вне AlarmArray")
+        return index * _RECORD.size
+
+    def __len__(self):
+        return len(self._data) // _RECORD.size
+
+    def __getitem__(self, index):
+        return self._unpack(_RECORD.unpack_from(self._data, self._offset(index)))
+
+    def __setitem__(self, index, alarm):
+        self._data[self._offset(index):self._offset(index) + _RECORD.size] = self._pack(alarm)
+
+    def __iter__(self):
+        return map(self._unpack, _RECORD.iter_unpack(self._data))
+
+    def append(self, alarm):
+        self._data += self._pack(alarm)
+
+    def extend(self, alarms):
+        self._data += b"".join(map(self._pack, alarms))
+
+    def to_alarms(self):
+        return list(self)
+
+    @property
+    def nbytes(self):
+        return len(self._data)
+
+    def table(self):
+        """AlarmTable для next_occurrences без создания объектов Alarm."""
+        np = _numpy()
+        if np is None:
+            rows = [encode_alarm(alarm) for alarm in self]
+            return AlarmTable([row[0] for row in rows], [row[1] for row in rows],
+                              [row[2] for row in rows], [row[3] for row in rows])
+        records = np.frombuffer(self._data, dtype=np.dtype([
+            ("id", "<i8"), ("last_triggered", "<i8"), ("version", "<i8"), ("day_mask", "u1"), ("parity", "u1"),
+            ("active", "u1"), ("minutes", "<u2", (7,)), ("sound", "<u2"), ("sound_name", "<u2"), ("source", "<u2"),
+            ("uid", "<u2")]))
+        selected = (records["day_mask"][:, None] >> np.arange(7)) & 1
+        minutes = np.where(selected == 1, records["minutes"].astype(np.int16), -1).astype(np.int16)
+        return AlarmTable(records["day_mask"].copy(), minutes, records["parity"].copy(),
+                          records["active"].astype(bool))
+
+
+def to_epoch_minutes(dt):
+    return (dt.toordinal() - _EPOCH_DAY) * 1440 + dt.hour * 60 + dt.minute
+
+
+def from_epoch_minutes(value):
+    return EPOCH + datetime.timedelta(minutes=int(value))
+
+
+def _horizon_days(count):
+    # С учётом чётности будильник гарантированно срабатывает хотя бы раз за 14 дней
+    return 14 * count + 1
+
+
+def next_occurrences(table, after, count=1, parity_offset=None):
+    """
+    Ближайшие count срабатываний для каждого будильника таблицы строго позже after.
+
+    :param table: AlarmTable (см. encode_alarms)
+    :param after: datetime.datetime
+    :param count: сколько срабатываний вернуть на будильник
+    :param parity_offset: сдвиг чётности или None, если чётность неизвестна
+    :return: для каждого будильника count значений в минутах от EPOCH, -1 – срабатывания нет
+             (numpy.ndarray формы (len(table), count), если NumPy установлен, иначе список списков)
+    """
+    np = _numpy()
+    if np is not None and isinstance(table.day_mask, np.ndarray):
+        return _next_occurrences_numpy(table, after, count, parity_offset)
+    return _next_occurrences_python(table, after, count, parity_offset)
+
+
+def occurrences_between(table, after, until, parity_offset=None, block_days=28):
+    """
+    Все срабатывания будильников таблицы в интервале (after, until] по порядку времени.
+
+    :return: пара (индексы будильников, минуты от EPOCH) – numpy.ndarray, если NumPy установлен,
+             иначе списки; при равном времени будильники идут по порядку в таблице
+    """
+    np = _numpy()
+    numpy_table = np is not None and isinstance(table.day_mask, np.ndarray)
+    indices, moments = [], []
+    first = to_epoch_minutes(after) + 1
+    last = to_epoch_minutes(until)
+    day = after.date()
+    # Интервал обходится блоками по block_days дней, чтобы память не зависела от его длины
+    while day <= until.date():
+        days = min(block_days, (until.date() - day).days + 1)
+        if numpy_table:
+            block = _occurrences_numpy(table, day, days, parity_offset)
+        else:
+            block = _occurrences_python(table, day, days, parity_offset)
+        block_indices, block_moments = block
+        if numpy_table:
+            keep = (block_moments >= first) & (block_moments <= last)
+            indices.append(block_indices[keep])
+            moments.append(block_moments[keep])
+        else:
+            for index, moment in zip(block_indices, block_moments):
+                if first <= moment <= last:
+                    indices.append(index)
+                    moments.append(moment)
+        day += datetime.timedelta(days=days)
+    if numpy_table:
+        if not indices:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        return np.concatenate(indices), np.concatenate(moments)
+    return indices, moments
+
+
+def _occurrences_python(table, start, days, parity_offset):
+    weekdays = [(start.weekday() + offset) % 7 for offset in range(days)]
+    parities = _day_parities(start, days, parity_offset)
+    base = to_epoch_minutes(datetime.datetime.combine(start, datetime.time()))
+    found = []
+    for index, (mask, minutes, parity, active) in enumerate(zip(table.day_mask, table.minutes, table.parity,
+                                                                  table.active)):
+        if not active or not mask:
+            continue
+        for offset in range(days):
+            weekday = weekdays[offset]
+            if not mask & (1 << weekday):
+                continue
+            if parity != PARITY_ANY and (parities is None or parities[offset] != parity):
+                continue
+            found.append((base + offset * 1440 + minutes[weekday], index))
+    found.sort()
+    return [index for _, index in found], [moment for moment, _ in found]
+
+
+def _occurrences_numpy(table, start, days, parity_offset):
+    np = _numpy()
+    offsets = np.arange(days)
+    weekdays = (start.weekday() + offsets) % 7
+    # (день, будильник): np.nonzero обходит строки по порядку, дальше остаётся упорядочить внутри дня
+    minutes = table.minutes.astype(np.int64)[:, weekdays].T
+    valid = (minutes >= 0) & table.active[None, :]
+    if parity_offset is None:
+        valid &= (table.parity == PARITY_ANY)[None, :]
+    else:
+        weeks = week_index(start) + (start.weekday() + offsets) // 7
+        day_parity = np.where((weeks + parity_offset) % 2 == 0, PARITY_EVEN, PARITY_ODD)
+        valid &= (table.parity[None, :] == PARITY_ANY) | (table.parity[None, :] == day_parity[:, None])
+    day_index, alarm_index = np.nonzero(valid)
+    base = to_epoch_minutes(datetime.datetime.combine(start, datetime.time()))
+    moments = base + day_index * 1440 + minutes[day_index, alarm_index]
+    order = np.argsort(moments, kind="stable")
+    return alarm_index[order], moments[order]
+
+
+def _day_parities(start, days, parity_offset):
+    """Код чётности (PARITY_EVEN/PARITY_ODD) каждого дня горизонта или None, если чётность неизвестна."""
+    if parity_offset is None:
+        return None
+    first_week = week_index(start)
+    result = []
+    for offset in range(days):
+        week = first_week + (start.weekday() + offset) // 7
+        result.append(PARITY_EVEN if (week + parity_offset) % 2 == 0 else PARITY_ODD)
+    return result
+
+
+def _next_occurrences_python(table, after, count, parity_offset):
+    start = after.date()
+    # Срабатывание в ту же минуту, что и after, уже не считается будущим
+    after_minute = after.hour * 60 + after.minute
+    days = _horizon_days(count)
+    weekdays = [(start.weekday() + offset) % 7 for offset in range(days)]
+    parities = _day_parities(start, days, parity_offset)
+    base = to_epoch_minutes(datetime.datetime.combine(start, datetime.time()))
+    result = []
+    for mask, minutes, parity, active in zip(table.day_mask, table.minutes, table.parity, table.active):
+        found = []
+        if active and mask:
+            for offset in range(days):
+                weekday = weekdays[offset]
+                if not mask & (1 << weekday):
+                    continue
+                minute = minutes[weekday]
+                if offset == 0 and minute <= after_minute:
+                    continue
+                if parity != PARITY_ANY and (parities is None or parities[offset] != parity):
+                    continue
+                found.append(base + offset * 1440 + minute)
+                if len(found) == count:
+                    break
+        result.append(found + [-1] * (count - len(found)))
+    return result
+
+
+def _next_occurrences_numpy(table, after, count, parity_offset):
+    np = _numpy()
+    start = after.date()
+    after_minute = after.hour * 60 + after.minute
+    days = _horizon_days(count)
+    offsets = np.arange(days)
+    weekdays = (start.weekday() + offsets) % 7
+
+    # candidates[i, d] – время срабатывания будильника i в день d горизонта
+    minutes = table.minutes.astype(np.int64)[:, weekdays]
+    valid = minutes >= 0
+    valid &= table.active[:, None]
+    valid[:, 0] &= minutes[:, 0] > after_minute
+    if parity_offset is None:
+        valid &= (table.parity == PARITY_ANY)[:, None]
+    else:
+        weeks = week_index(start) + (start.weekday() + offsets) // 7
+        day_parity = np.where((weeks + parity_offset) % 2 == 0, PARITY_EVEN, PARITY_ODD)
+        valid &= (table.parity[:, None] == PARITY_ANY) | (table.parity[:, None] == day_parity[None, :])
+
+    base = to_epoch_minutes(datetime.datetime.combine(start, datetime.time()))
+    candidates = np.where(valid, base + offsets[None, :] * 1440 + minutes, np.iinfo(np.int64).max)
+    # Оставляем count самых ранних кандидатов: частичная сортировка дешевле полной
+    if count < days:
+        candidates = np.partition(candidates, count - 1, axis=1)[:, :count]
+    candidates = np.sort(candidates, axis=1)[:, :count]
+    return np.where(candidates == np.iinfo(np.int64).max, -1, candidates)
@@ -0,0 +1,284 @@
+"""
+Индекс будильников в памяти для поиска и фильтров на главном экране.
+
+Будильники разложены по дням недели и минутам (для каждого дня – словарь минута -> множество
+и отсортированный список занятых минут), по чётности, по названию звука и по активности.
+Подпись str(alarm) вычисляется один раз при добавлении или изменении будильника и
+хранится здесь же, поэтому ни запрос, ни построение строк списка не перебирают и не
+форматируют все будильники. Индекс обновляется по одному будильнику (add/update/remove);
+полная перестройка нужна только после загрузки.
+
+Без зависимости от Kivy/KivyMD.
+"""
+import datetime
+import re
+from bisect import bisect_left, bisect_right, insort
+
+from alarm_core import DAYS_OF_WEEK, PARITY_ANY, PARITY_CODES, Parity, parity_on
+
+MINUTES_PER_DAY = 24 * 60
+
+# Слова строки поиска (parse_query)
+DAY_WORDS = {}
+for _weekday, _day in enumerate(DAYS_OF_WEEK):
+    for _word in (_day.lower(), ("пн", "вт", "ср", "чт", "пт", "сб", "вс")[_weekday]):
+        DAY_WORDS[_word] = _weekday
+PARITY_WORDS = dict(PARITY_CODES, **{week_type.replace("ё", "е"): code for week_type, code in PARITY_CODES.items()})
+ACTIVE_WORDS = {"вкл": True, "включён": True, "включен": True, "активные": True,
+                "выкл": False, "отключён": False, "отключен": False, "неактивные": False}
+SOUND_PREFIX = "звук:"
+_TIME_RE = re.compile(r"^(\d{1,2}):(\d{2})(?:-(\d{1,2}):(\d{2}))?$")
+
+
+def parse_query(text):
+    """
+    Разбирает строку поиска в условия для AlarmIndex.select:
+    дни недели («пн», «вторник»), время «7:30» или интервал «7:00-9:00», чётность («чётная»),
+    «вкл»/«выкл», «звук:<название>»; остальные слова ищутся в подписи будильника.
+    """
+    criteria = {}
+    words = []
+    for word in text.lower().split():
+        match = _TIME_RE.match(word)
+        if word in DAY_WORDS:
+            criteria.setdefault("weekdays", set()).add(DAY_WORDS[word])
+        elif word in PARITY_WORDS:
+            criteria["parity"] = PARITY_WORDS[word]
+        elif word in ACTIVE_WORDS:
+            criteria["active"] = ACTIVE_WORDS[word]
+        elif word.startswith(SOUND_PREFIX) and len(word) > len(SOUND_PREFIX):
+            criteria["sound_name"] = word[len(SOUND_PREFIX):]
+        elif match:
+            first = int(match[1]) * 60 + int(match[2])
+            last = int(match[3]) * 60 + int(match[4]) if match[3] else first
+            criteria["time_from"], criteria["time_to"] = first, last
+        else:
+            words.append(word)
+    if words:
+        criteria["words"] = words
+    return criteria
+
+
+def _keys(alarm):
+    return (alarm.day_mask, tuple(alarm.minutes), alarm.parity, alarm.sound_name.lower(), alarm.active)
+
+
+class AlarmIndex:
+    """
+    Индекс набора будильников (например, AlarmClockApp.alarms).
+
+    Результаты возвращаются в порядке добавления будильников в индекс, то есть в порядке списка.
+    """
+
+    def __init__(self, alarms=()):
+        self.rebuild(alarms)
+
+    def rebuild(self, alarms):
+        self._labels = {}  # будильник -> подпись в нижнем регистре для поиска; порядок – порядок добавления
+        self._texts = {}  # будильник -> str(alarm) для строки списка
+        self._keys = {}  # будильник -> ключи, под которыми он лежит в индексе (см. _keys)
+        self._order = {}  # будильник -> порядковый номер
+        self._next = 0
+        self._slots = [{} for _ in DAYS_OF_WEEK]  # день недели -> {минута: множество будильников}
+        self._minutes = [[] for _ in DAYS_OF_WEEK]  # день недели -> отсортированные занятые минуты
+        self._parity = {code: set() for code in Parity}
+        self._sounds = {}  # название звука в нижнем регистре -> множество будильников
+        self._active = set()
+        self.add_many(alarms)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, alarm):
+        return alarm in self._keys
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def text(self, alarm):
+        """Подпись будильника для строки списка (str(alarm), вычисленная при последнем изменении)."""
+        return self._texts[alarm]
+
+    def add(self, alarm):
+        keys = _keys(alarm)
+        self._keys[alarm] = keys
+        self._order[alarm] = self._next
+        self._next += 1
+        self._texts[alarm] = text = str(alarm)
+        self._labels[alarm] = text.lower()
+        self._post(alarm, keys)
+
+    def add_many(self, alarms):
+        for alarm in alarms:
+            self.add(alarm)
+
+    def remove(self, alarm):
+        keys = self._keys.pop(alarm, None)
+        if keys is None:
+            return
+        del self._order[alarm], self._texts[alarm], self._labels[alarm]
+        self._unpost(alarm, keys)
+
+    def remove_many(self, alarms):
+        for alarm in alarms:
+            self.remove(alarm)
+
+    def update(self, alarm):
+        """Переносит изменённый будильник под новые ключи; место в порядке списка сохраняется."""
+        old = self._keys.get(alarm)
+        if old is None:
+            self.add(alarm)
+            return
+        keys = _keys(alarm)
+        if keys != old:
+            self._unpost(alarm, old)
+            self._post(alarm, keys)
+            self._keys[alarm] = keys
+        # Подпись зависит ещё и от полей, которых нет в ключах, поэтому пересчитывается всегда
+        self._texts[alarm] = text = str(alarm)
+        self._labels[alarm] = text.lower()
+
+    def _post(self, alarm, keys):
+        day_mask, minutes, parity, sound, active = keys
+        for weekday in range(7):
+            if day_mask & (1 << weekday):
+                slot = self._slots[weekday].get(minutes[weekday])
+                if slot is None:
+                    slot = self._slots[weekday][minutes[weekday]] = set()
+                    insort(self._minutes[weekday], minutes[weekday])
+                slot.add(alarm)
+        self._parity[parity].add(alarm)
+        self._sounds.setdefault(sound, set()).add(alarm)
+        if active:
+            self._active.add(alarm)
+
+    def _unpost(self, alarm, keys):
+        day_mask, minutes, parity, sound, active = keys
+        for weekday in range(7):
+            if day_mask & (1 << weekday):
+                slot = self._slots[weekday][minutes[weekday]]
+                slot.discard(alarm)
+                if not slot:
+                    del self._slots[weekday][minutes[weekday]]
+                    occupied = self._minutes[weekday]
+                    del occupied[bisect_left(occupied, minutes[weekday])]
+        self._parity[parity].discard(alarm)
+        sounds = self._sounds[sound]
+        sounds.discard(alarm)
+        if not sounds:
+            del self._sounds[sound]
+        self._active.discard(alarm)
+
+    def _at(self, weekday, time_from=0, time_to=MINUTES_PER_DAY - 1):
+        """Пары (минута, множество будильников) дня недели с минутой в [time_from, time_to] по возрастанию."""
+        occupied = self._minutes[weekday]
+        slots = self._slots[weekday]
+        return [(minute, slots[minute])
+                for minute in occupied[bisect_left(occupied, time_from):bisect_right(occupied, time_to)]]
+
+    def select(self, weekdays=None, time_from=None, time_to=None, parity=None, sound_name=None, active=None,
+               words=None):
+        """
+        Множество будильников, подходящих под все заданные условия (None – условие не задано).
+
+        :param weekdays: дни недели (0 – понедельник); будильник подходит, если звонит в один из них
+        :param time_from: минуты от полуночи; вместе с time_to – время звонка хотя бы в один из дней
+        :param parity: Parity – точная чётность будильника
+        :param sound_name: название звука без учёта регистра
+        :param active: True/False – только включённые/выключенные
+        :param words: слова, которые должны встречаться в подписи будильника
+        """
+        sets = []
+        if weekdays is not None or time_from is not None or time_to is not None:
+            first = time_from if time_from is not None else 0
+            last = time_to if time_to is not None else MINUTES_PER_DAY - 1
+            ranges = [(first, last)] if first <= last else [(first, MINUTES_PER_DAY - 1), (0, last)]  # через полночь
+            matched = set()
+            for weekday in (weekdays if weekdays is not None else range(7)):
+                for low, high in ranges:
+                    for _, slot in self._at(weekday, low, high):
+                        matched |= slot
+            sets.append(matched)
+        if parity is not None:
+            sets.append(self._parity[parity])
+        if sound_name is not None:
+            sets.append(self._sounds.get(sound_name.lower(), set()))
+        if active is True:
+            sets.append(self._active)
+        if not sets:
+            result = set(self._keys) if active is None else {a for a in self._keys if a not in self._active}
+        else:
+            sets.sort(key=len)
+            result = set(sets[0]).intersection(*sets[1:])
+            if active is False:
+                result -= self._active
+        if words:
+            labels = self._labels
+            result = {alarm for alarm in result if all(word in labels[alarm] for word in words)}
+        return result
+
+    def ordered(self, alarms):
+        """Будильники из alarms в порядке списка."""
+        if len(alarms) * 4 > len(self._keys):
+            return [alarm for alarm in self._keys if alarm in alarms]
+        return sorted(alarms, key=self._order.__getitem__)
+
+    def query(self, **criteria):
+        """Будильники, подходящие под условия select, в порядке списка."""
+        if not criteria:
+            return list(self._keys)
+        return self.ordered(self.select(**criteria))
+
+    def _in_order(self, slot):
+        return sorted(slot, key=self._order.__getitem__)
+
+    def _ringing(self, date, parity_offset, within):
+        # Будильник звонит в этот день, если он включён, а его чётность любая или совпадает с чётностью недели
+        allowed = (PARITY_ANY, parity_on(date, parity_offset))
+        keys = self._keys
+        return lambda alarm: keys[alarm][4] and keys[alarm][2] in allowed and (within is None or alarm in within)
+
+    def today(self, date, parity_offset, within=None):
+        """
+        Звонки дня date по времени: список (минута, будильник).
+        :param within: множество будильников (например, результат select), которым ограничить ответ
+        """
+        ringing = self._ringing(date, parity_offset, within)
+        return [(minute, alarm) for minute, slot in self._at(date.weekday()) for alarm in self._in_order(slot)
+                if ringing(alarm)]
+
+    def this_parity(self, date, parity_offset, within=None):
+        """Включённые будильники, которые звонят на неделе, куда попадает date, – в порядке списка."""
+        parity = parity_on(date, parity_offset)
+        alarms = self._parity[PARITY_ANY] if parity == PARITY_ANY else self._parity[PARITY_ANY] | self._parity[parity]
+        alarms = alarms & self._active
+        if within is not None:
+            alarms &= within
+        return self.ordered(alarms)
+
+    def next_hours(self, now, parity_offset, hours=24, pending=(), within=None):
+        """
+        Звонки в ближайшие hours часов строго после now: список (datetime, будильник) по времени.
+        :param pending: разовые срабатывания (будильник, время) – отложенные звонки из планировщика
+        """
+        end = now + datetime.timedelta(hours=hours)
+        start = now.replace(second=0, microsecond=0)
+        upcoming = []
+        day = start.date()
+        while True:
+            midnight = datetime.datetime(day.year, day.month, day.day)
+            first = (start - midnight) // datetime.timedelta(minutes=1) + 1 if day == start.date() else 0
+            last = min((end - midnight) // datetime.timedelta(minutes=1), MINUTES_PER_DAY - 1)
+            if first > last:
+                break
+            ringing = self._ringing(day, parity_offset, within)
+            for minute, slot in self._at(day.weekday(), first, last):
+                at = midnight + datetime.timedelta(minutes=minute)
+                upcoming.extend((at, alarm) for alarm in self._in_order(slot) if ringing(alarm))
+            day += datetime.timedelta(days=1)
+        snoozed = [(when, alarm) for alarm, when in pending
+                   if now < when <= end and alarm in self._keys and (within is None or alarm in within)]
+        if snoozed:
+            upcoming.extend(snoozed)
+            upcoming.sort(key=lambda item: (item[0], self._order[item[1]]))
+        return upcoming
@@ -0,0 +1,79 @@
+"""
+Общая основа фоновых задач: получение чётности, импорт звуков, импорт и экспорт календаря.
+
+Работа выполняется в пуле потоков, а обработчики результатов и хода работы вызываются
+через post(fn, *args) – функцию, которая переносит вызов в главный цикл (в приложении
+это Clock.schedule_once). Без post обработчик вызывается сразу, в фоновом потоке.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+PROGRESS_STEP = 0.01  # о ходе работы сообщается не чаще, чем раз в 1 %
+
+
+def call_now(fn, *args):
+    fn(*args)
+
+
+class BackgroundWorker:
+    def __init__(self, post=None, workers=1, name="worker"):
+        """
+        :param post: post(fn, *args) – вызвать fn в главном цикле; по умолчанию вызывается сразу
+        :param workers: число потоков пула
+        :param name: префикс имён потоков
+        """
+        self.post = post if post is not None else call_now
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        """Прерывает текущую работу; уже переданные результаты остаются."""
+        self._cancelled.set()
+
+    def shutdown(self):
+        self.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def progress(self, on_progress, total=1.0):
+        """ProgressReporter, который передаёт долю выполненной работы в on_progress через post."""
+        return ProgressReporter(self.post, on_progress, total)
+
+
+class ProgressReporter:
+    """
+    Прореживает сообщения о ходе работы: следующее – после роста доли на PROGRESS_STEP,
+    завершение (доля 1) – всегда. Можно вызывать из нескольких потоков.
+    """
+
+    def __init__(self, post, on_progress, total=1.0):
+        self.post = post
+        self.on_progress = on_progress
+        self.total = max(total, 1)
+        self.done = 0
+        self.reported = 0.0
+        self._lock = threading.Lock()
+
+    def advance(self, amount):
+        """Выполнено ещё amount единиц работы из total."""
+        with self._lock:
+            self.done += amount
+        self._report()
+
+    def set(self, done):
+        """Выполнено done единиц работы из total."""
+        with self._lock:
+            self.done = done
+        self._report()
+
+    def finish(self):
+        self.set(self.total)
+
+    def _report(self):
+        if self.on_progress is None:
+            return
+        with self._lock:
+            fraction = min(self.done / self.total, 1.0)
+            if fraction - self.reported < PROGRESS_STEP and not (fraction >= 1 > self.reported):
+                return
+            self.reported = fraction
+        self.post(self.on_progress, fraction)
@@ -0,0 +1,114 @@
+"""
+Индекс будильников для поиска и представлений главного экрана (alarm_index.py) против
+перебора списка с форматированием каждого будильника, как строился список раньше.
+
+Для каждого размера – время построения индекса, изменения одного будильника и запросов:
+«Сегодня», «Эта неделя», «Ближайшие 24 ч» и строки поиска QUERY. Ответы индекса
+сверяются с перебором (для 24 часов – с alarm_core.next_occurrence).
+Запуск: python benchmarks/bench_alarm_index.py
+"""
+import datetime
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from alarm_core import PARITY_ANY, next_occurrence, parity_offset_for, parity_on  # noqa: E402
+from alarm_index import AlarmIndex, parse_query  # noqa: E402
+from bench_storage import make_alarms  # noqa: E402
+
+SIZES = (10000, 100000)
+NOW = datetime.datetime(2024, 9, 4, 12, 30, 15)  # среда
+PARITY_OFFSET = parity_offset_for("чётная", NOW.date())
+QUERY = "пн ср 7:00-9:00 чётная вкл"
+REPEAT = 5
+
+
+def best_ms(action, repeat=REPEAT):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = action()
+        elapsed = (time.perf_counter() - started) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+# Перебор всех будильников – то, что пришлось бы делать без индекса
+def scan_today(alarms):
+    weekday, parity = NOW.weekday(), parity_on(NOW.date(), PARITY_OFFSET)
+    rows = [(alarm.minutes[weekday], str(alarm)) for alarm in alarms
+            if alarm.active and alarm.day_mask & (1 << weekday) and alarm.parity in (PARITY_ANY, parity)]
+    rows.sort(key=lambda row: row[0])
+    return rows
+
+
+def scan_this_parity(alarms):
+    parity = parity_on(NOW.date(), PARITY_OFFSET)
+    return [str(alarm) for alarm in alarms if alarm.active and alarm.parity in (PARITY_ANY, parity)]
+
+
+def scan_next_24h(alarms):
+    end = NOW + datetime.timedelta(hours=24)
+    rows = []
+    for alarm in alarms:
+        # Будильник может прозвонить дважды: сегодня позже NOW и завтра раньше
+        fire_dt = next_occurrence(alarm, NOW, PARITY_OFFSET)
+        while fire_dt is not None and fire_dt <= end:
+            rows.append((fire_dt, str(alarm)))
+            fire_dt = next_occurrence(alarm, fire_dt, PARITY_OFFSET)
+    rows.sort(key=lambda row: row[0])
+    return rows
+
+
+def scan_query(alarms, criteria):
+    weekdays = criteria["weekdays"]
+    first, last = criteria["time_from"], criteria["time_to"]
+    return [str(alarm) for alarm in alarms
+            if alarm.active == criteria["active"] and alarm.parity == criteria["parity"]
+            and any(alarm.day_mask & (1 << weekday) and first <= alarm.minutes[weekday] <= last
+                    for weekday in weekdays)]
+
+
+def run(sizes=SIZES):
+    results = {}
+    criteria = parse_query(QUERY)
+    for size in sizes:
+        alarms = make_alarms(size)
+        index, build_ms = best_ms(lambda: AlarmIndex(alarms), repeat=1)
+        row = {"build_ms": build_ms}
+
+        today, row["today_ms"] = best_ms(
+            lambda: [(minute, index.text(alarm)) for minute, alarm in index.today(NOW.date(), PARITY_OFFSET)])
+        expected, row["today_scan_ms"] = best_ms(lambda: scan_today(alarms))
+        row["today_rows"] = len(today)
+        row["today_ok"] = sorted(today) == sorted(expected)
+
+        week, row["this_parity_ms"] = best_ms(
+            lambda: [index.text(alarm) for alarm in index.this_parity(NOW.date(), PARITY_OFFSET)])
+        expected, row["this_parity_scan_ms"] = best_ms(lambda: scan_this_parity(alarms))
+        row["this_parity_ok"] = week == expected
+
+        upcoming, row["next_24h_ms"] = best_ms(
+            lambda: [(at, index.text(alarm)) for at, alarm in index.next_hours(NOW, PARITY_OFFSET)])
+        expected, row["next_24h_scan_ms"] = best_ms(lambda: scan_next_24h(alarms), repeat=1)
+        row["next_24h_rows"] = len(upcoming)
+        row["next_24h_ok"] = sorted(upcoming) == sorted(expected)
+
+        found, row["query_ms"] = best_ms(lambda: [index.text(alarm) for alarm in index.query(**criteria)])
+        expected, row["query_scan_ms"] = best_ms(lambda: scan_query(alarms, criteria))
+        row["query_rows"] = len(found)
+        row["query_ok"] = found == expected
+
+        alarm = alarms[size // 2]
+        alarm.minutes[0] = (alarm.minutes[0] + 1) % (24 * 60)
+        alarm.active = not alarm.active
+        _, row["update_ms"] = best_ms(lambda: index.update(alarm), repeat=1)
+        results[size] = row
+    return results
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2, ensure_ascii=False))
@@ -0,0 +1,98 @@
+"""
+Время перерисовки списка будильников MainScreen в зависимости от числа будильников.
+
+Сравнивается полная перестройка модели RecycleView, обновление одной строки и прежний
+способ (clear_widgets и новые виджеты на каждый будильник). Kivy запускается без окна
+на экране (SDL offscreen). Запуск: python benchmarks/bench_alarm_list.py
+"""
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SDL_VIDEODRIVER", "offscreen")
+os.environ.setdefault("KIVY_NO_ARGS", "1")
+
+from bench_storage import make_alarms  # noqa: E402
+
+SIZES = [10, 100, 1000, 5000]
+# Прежняя реализация строит виджеты для всех будильников, поэтому на больших списках её не запускаем
+LEGACY_MAX_SIZE = 1000
+
+
+def legacy_rebuild(box, alarms):
+    from kivy.uix.boxlayout import BoxLayout
+    from kivy.uix.button import Button
+    from kivy.uix.label import Label
+
+    box.clear_widgets()
+    for alarm in alarms:
+        row = BoxLayout(orientation='horizontal', size_hint_y=None, height=40, spacing=10)
+        row.add_widget(Label(text=str(alarm), size_hint=(0.6, 1)))
+        row.add_widget(Button(text="Редактировать", size_hint=(0.2, 1)))
+        row.add_widget(Button(text="Удалить", size_hint=(0.2, 1)))
+        box.add_widget(row)
+    box.do_layout()
+
+
+def run(sizes=SIZES):
+    from kivy.clock import Clock
+    from kivy.uix.boxlayout import BoxLayout
+    from kivymd.app import MDApp
+
+    import main
+    from alarm_index import AlarmIndex
+    from metrics import Metrics
+
+    results = {}
+
+    class BenchApp(MDApp):
+        def build(self):
+            self.alarms = []
+            self.alarm_index = AlarmIndex()
+            self.metrics = Metrics()
+            self.main_screen = main.MainScreen(name="main")
+            return self.main_screen
+
+        def week_label_text(self):
+            return ""
+
+        def on_start(self):
+            # Замеры – после первого кадра, когда окно и панель инструментов уже построены
+            Clock.schedule_once(self.measure, 0.5)
+
+        def measure(self, dt):
+            screen = self.main_screen
+            rv = screen.alarm_list
+            for size in sizes:
+                self.alarms = make_alarms(size)
+                self.alarm_index.rebuild(self.alarms)
+                start = time.perf_counter()
+                screen.update_alarm_list()
+                rv.refresh_views()
+                full_ms = (time.perf_counter() - start) * 1000
+
+                alarm = self.alarms[size // 2]
+                alarm.active = not alarm.active
+                start = time.perf_counter()
+                self.alarm_index.update(alarm)
+                screen.alarm_changed(alarm)
+                rv.refresh_views()
+                row_ms = (time.perf_counter() - start) * 1000
+
+                result = {"full_ms": full_ms, "row_ms": row_ms, "views": len(rv.layout_manager.children)}
+                if size <= LEGACY_MAX_SIZE:
+                    box = BoxLayout(orientation='vertical', spacing=10, size_hint_y=None)
+                    start = time.perf_counter()
+                    legacy_rebuild(box, self.alarms)
+                    result["legacy_ms"] = (time.perf_counter() - start) * 1000
+                results[size] = result
+            self.stop()
+
+    BenchApp().run()
+    return results
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
@@ -0,0 +1,112 @@
+"""
+Память и скорость представлений будильника на 100 000 будильников.
+
+Сравниваются прежний вид (словарь {день: datetime.time} и строка week_type),
+компактный Alarm (__slots__, маска дней, array минут, Parity) и AlarmArray
+(одна запись фиксированного размера на будильник). Память – tracemalloc,
+скорость – поиск ближайшего срабатывания и преобразования туда и обратно.
+Запуск: python benchmarks/bench_alarm_model.py
+"""
+import datetime
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from alarm_core import (Alarm, AlarmArray, DAYS_OF_WEEK, LOOKAHEAD_DAYS, next_occurrence,  # noqa: E402
+                        next_occurrences, week_type_on)
+
+ALARM_COUNT = 100000
+AFTER = datetime.datetime(2024, 9, 4, 7, 13)
+PARITY_OFFSET = 0
+
+
+class LegacyAlarm:
+    """Прежнее представление будильника – для сравнения."""
+
+    def __init__(self, schedule, week_type, active, sound="Sounds/Beep.mp3", sound_name="Beep", source=None):
+        self.schedule = schedule
+        self.week_type = week_type
+        self.active = active
+        self.id = None
+        self.last_triggered = None
+        self.sound = sound
+        self.sound_name = sound_name
+        self.source = source
+
+
+def legacy_next_occurrence(alarm, after, parity_offset):
+    if not alarm.active or not alarm.schedule:
+        return None
+    start = after.date()
+    for offset in range(LOOKAHEAD_DAYS):
+        day = start + datetime.timedelta(days=offset)
+        scheduled_time = alarm.schedule.get(DAYS_OF_WEEK[day.weekday()])
+        if scheduled_time is None:
+            continue
+        fire_dt = datetime.datetime.combine(day, scheduled_time)
+        if fire_dt <= after:
+            continue
+        if alarm.week_type == "любая" or alarm.week_type == week_type_on(day, parity_offset):
+            return fire_dt
+    return None
+
+
+def make_rows(count, seed=0):
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(count):
+        days = rng.sample(DAYS_OF_WEEK, rng.randint(1, 7))
+        schedule = {day: datetime.time(rng.randrange(24), rng.randrange(60)) for day in days}
+        rows.append((schedule, rng.choice(["любая", "чётная", "нечётная"]), rng.random() < 0.9))
+    return rows
+
+
+def measure_memory(build):
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+def timed_ms(action):
+    start = time.perf_counter()
+    result = action()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def run(count=ALARM_COUNT):
+    rows = make_rows(count)
+    results = {"alarms": count}
+
+    # Память считается вместе с расписаниями: у прежнего вида это отдельные словари и объекты времени
+    legacy, legacy_bytes = measure_memory(lambda: [LegacyAlarm(dict(s), w, a) for s, w, a in rows])
+    alarms, alarm_bytes = measure_memory(lambda: [Alarm(schedule=s, week_type=w, active=a) for s, w, a in rows])
+    packed, packed_bytes = measure_memory(lambda: AlarmArray(alarms))
+    results["memory_bytes_per_alarm"] = {"legacy": legacy_bytes / count, "alarm": alarm_bytes / count,
+                                         "alarm_array": packed_bytes / count}
+
+    legacy_next, legacy_ms = timed_ms(lambda: [legacy_next_occurrence(a, AFTER, PARITY_OFFSET) for a in legacy])
+    compact_next, compact_ms = timed_ms(lambda: [next_occurrence(a, AFTER, PARITY_OFFSET) for a in alarms])
+    if legacy_next != compact_next:
+        raise AssertionError("компактный Alarm срабатывает иначе, чем прежний")
+    _, table_ms = timed_ms(lambda: next_occurrences(packed.table(), AFTER, 1, PARITY_OFFSET))
+    results["next_occurrence_ms"] = {"legacy": legacy_ms, "alarm": compact_ms, "alarm_array_batch": table_ms}
+
+    _, pack_ms = timed_ms(lambda: AlarmArray(alarms))
+    unpacked, unpack_ms = timed_ms(packed.to_alarms)
+    lossless = all(a.schedule == b.schedule and a.week_type == b.week_type and a.active == b.active
+                   for a, b in zip(alarms, unpacked))
+    results["conversion_ms"] = {"to_alarm_array": pack_ms, "to_alarms": unpack_ms, "lossless": lossless}
+    return results
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2, ensure_ascii=False))
@@ -0,0 +1,87 @@
+"""
+Ресурсы демона будильника в простое и задержка запросов через Unix-сокет.
+
+Демон запускается отдельным процессом с временным каталогом данных и без
+запросов к сайту (--no-parity). Замеряются память (VmRSS), процессорное время
+за IDLE_SECONDS простоя и время ответа на list/status при разном числе будильников.
+Только Linux (/proc). Запуск: python benchmarks/bench_daemon.py
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench_storage import make_alarms  # noqa: E402
+from daemon import DaemonClient  # noqa: E402
+
+IDLE_SECONDS = 5
+SIZES = [10, 1000]
+REQUESTS = 50
+
+
+def rss_kb(pid):
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return None
+
+
+def cpu_seconds(pid):
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def connect(path, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        client = DaemonClient.connect(path)
+        if client is not None:
+            return client
+        time.sleep(0.05)
+    raise RuntimeError("демон не запустился")
+
+
+def request_ms(client, op):
+    samples = []
+    for _ in range(REQUESTS):
+        start = time.perf_counter()
+        client.request(op)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def run():
+    results = {}
+    with tempfile.TemporaryDirectory() as data_dir:
+        socket_path = os.path.join(data_dir, "daemon.sock")
+        process = subprocess.Popen([sys.executable, os.path.join(ROOT, "daemon.py"), "--data-dir", data_dir,
+                                    "--no-parity"], cwd=ROOT, stdout=subprocess.DEVNULL)
+        try:
+            client = connect(socket_path)
+            results["rss_kb"] = rss_kb(process.pid)
+            cpu_before = cpu_seconds(process.pid)
+            time.sleep(IDLE_SECONDS)
+            results["idle_cpu_ms_per_s"] = (cpu_seconds(process.pid) - cpu_before) * 1000 / IDLE_SECONDS
+            saved = 0
+            for size in SIZES:
+                client.save_many(make_alarms(size - saved))
+                saved = size
+                results[size] = {"list_ms": request_ms(client, "list"), "status_ms": request_ms(client, "status")}
+            results["rss_kb_loaded"] = rss_kb(process.pid)
+            client.close()
+        finally:
+            process.terminate()
+            process.wait(10)
+    return results
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
@@ -0,0 +1,63 @@
+"""
+Срабатывание пачки будильников на одно время (например, все будильники группы):
+выборка наступивших из планировщика и запись их состояния в SQLite –
+по одной транзакции на будильник (как было) и одной на всю пачку (update_states).
+
+Запуск: python benchmarks/bench_dispatch.py
+"""
+import datetime
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from alarm_core import Alarm  # noqa: E402
+from scheduler import AlarmScheduler  # noqa: E402
+from storage import AlarmStore  # noqa: E402
+
+SIZES = (1, 10, 100, 1000)
+START = datetime.datetime(2024, 9, 2, 6, 0)  # понедельник
+AT = datetime.datetime(2024, 9, 2, 7, 0)
+
+
+def dispatch(store, count, batched):
+    alarms = [Alarm(schedule={"Понедельник": datetime.time(7, 0)}) for _ in range(count)]
+    store.save_many(alarms)
+    scheduler = AlarmScheduler(now=START)
+    scheduler.reindex_all(alarms)
+    started = time.perf_counter()
+    due = scheduler.pop_due(AT)
+    pop_ms = (time.perf_counter() - started) * 1000
+    fired = [alarm for alarm, fire_dt in due]
+    for alarm in fired:
+        alarm.last_triggered = AT
+    started = time.perf_counter()
+    if batched:
+        store.update_states(fired)
+    else:
+        for alarm in fired:
+            store.update_state(alarm)
+    return len(fired), pop_ms, (time.perf_counter() - started) * 1000
+
+
+def run(sizes=SIZES):
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for count in sizes:
+            row = {}
+            for batched in (False, True):
+                store = AlarmStore(os.path.join(directory, f"alarms-{count}-{batched}.db"))
+                fired, pop_ms, write_ms = dispatch(store, count, batched)
+                store.close()
+                row["fired"] = fired
+                row["pop_due_ms"] = pop_ms
+                row["write_batch_ms" if batched else "write_each_ms"] = write_ms
+            results[count] = row
+    return results
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2, ensure_ascii=False))
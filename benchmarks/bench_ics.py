@@ -0,0 +1,80 @@
+"""
+Импорт и экспорт календаря .ics для 20 000 будильников: время записи и чтения,
+скорость разбора (событий в секунду) и пик памяти при потоковом чтении.
+
+Чтение идёт по строкам, поэтому пик памяти определяется пачкой будильников (IMPORT_BATCH),
+а не размером файла. Запуск: python benchmarks/bench_ics.py
+"""
+import collections
+import datetime
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_storage import make_alarms  # noqa: E402
+from ics import IMPORT_BATCH, read_alarms, write_alarms  # noqa: E402
+
+ALARM_COUNT = 20000
+REFERENCE = datetime.date(2024, 9, 2)
+PARITY_OFFSET = 0
+
+
+def run(count=ALARM_COUNT):
+    alarms = make_alarms(count)
+    for number, alarm in enumerate(alarms):
+        alarm.id = number + 1
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "alarms.ics")
+        started = time.perf_counter()
+        with open(path, "w", encoding="utf-8", newline="") as out:
+            write_alarms(alarms, out, PARITY_OFFSET, REFERENCE)
+        export_ms = (time.perf_counter() - started) * 1000
+        file_bytes = os.path.getsize(path)
+
+        # Импорт так же, как в CalendarWorker: пачки по IMPORT_BATCH, после передачи пачка отпускается
+        stats = collections.Counter()
+        started = time.perf_counter()
+        mismatched = import_file(path, alarms, stats)
+        import_ms = (time.perf_counter() - started) * 1000
+        # Пик памяти – отдельным проходом: под tracemalloc разбор идёт в разы медленнее
+        tracemalloc.start()
+        import_file(path, alarms, collections.Counter())
+        peak_bytes = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return {"alarms": count, "file_bytes": file_bytes, "export_ms": export_ms, "import_ms": import_ms,
+            "import_alarms_per_second": stats["imported"] / (import_ms / 1000),
+            "import_peak_bytes": peak_bytes, "imported": stats["imported"], "skipped": stats["skipped"],
+            "round_trip_mismatches": mismatched}
+
+
+def import_file(path, alarms, stats):
+    """Читает path пачками; возвращает, сколько будильников отличаются от исходных (расписание и чётность)."""
+    mismatched = 0
+    imported = 0
+    with open(path, encoding="utf-8", newline="") as f:
+        batch = []
+        for alarm in read_alarms(f, PARITY_OFFSET, stats=stats):
+            batch.append(alarm)
+            if len(batch) >= IMPORT_BATCH:
+                mismatched += check(alarms, batch, imported)
+                imported += len(batch)
+                batch = []
+        mismatched += check(alarms, batch, imported)
+    return mismatched
+
+
+def check(alarms, batch, offset):
+    mismatched = 0
+    for original, imported in zip(alarms[offset:offset + len(batch)], batch):
+        if (imported.schedule, imported.week_type) != (original.schedule, original.week_type):
+            mismatched += 1
+    return mismatched
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2, ensure_ascii=False))
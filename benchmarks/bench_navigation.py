@@ -0,0 +1,90 @@
+"""
+Задержка переходов между экранами и открытия окон (выбор звука, выбор файла, ошибка).
+
+Для каждого действия замеряется синхронное время первого и повторных вызовов
+(медиана), переходы – без анимации. Сеть не используется. Kivy запускается
+без окна на экране (SDL offscreen). Запуск: python benchmarks/bench_navigation.py
+"""
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SDL_VIDEODRIVER", "offscreen")
+os.environ.setdefault("KIVY_NO_ARGS", "1")
+
+REPEATS = 10
+
+
+def timed(action):
+    start = time.perf_counter()
+    action()
+    return (time.perf_counter() - start) * 1000
+
+
+def first_and_repeat(action, reset, repeats=REPEATS):
+    first = timed(action)
+    reset()
+    samples = []
+    for _ in range(repeats):
+        samples.append(timed(action))
+        reset()
+    return {"first_ms": first, "repeat_ms": statistics.median(samples)}
+
+
+def run():
+    from kivy.clock import Clock
+    from kivy.uix.screenmanager import NoTransition
+
+    import main
+
+    results = {}
+
+    class BenchApp(main.AlarmClockApp):
+        def update_current_week(self, dt):
+            pass  # без запросов к сайту
+
+        def on_start(self):
+            Clock.schedule_once(self.measure, 0.5)
+
+        def measure(self, dt):
+            results["build_ms"] = (self.build_finished - self.build_started) * 1000
+            sm = self.sm
+            sm.transition = NoTransition()
+
+            def go(name):
+                return lambda: setattr(sm, "current", name)
+
+            results["edit_screen"] = first_and_repeat(go("edit"), go("main"))
+            results["settings_screen"] = first_and_repeat(go("settings"), go("main"))
+
+            edit = sm.get_screen("edit")
+            sm.current = "edit"
+
+            def close_popups():
+                from kivy.core.window import Window
+                from kivy.uix.modalview import ModalView
+                for child in list(Window.children):
+                    if isinstance(child, ModalView):
+                        child.dismiss(animation=False)
+
+            results["sound_picker"] = first_and_repeat(edit.open_sound_picker, close_popups)
+            results["file_chooser"] = first_and_repeat(edit.open_file_chooser, close_popups)
+
+            # Ошибка проверки: день отмечен, время не выбрано
+            checkbox, time_btn = edit.day_inputs[main.DAYS_OF_WEEK[0]]
+            checkbox.active = True
+            time_btn.text = "Выбрать время"
+            results["error_popup"] = first_and_repeat(lambda: edit.save_alarm(None), close_popups)
+            checkbox.active = False
+            sm.current = "main"
+            self.stop()
+
+    BenchApp().run()
+    return results
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
@@ -0,0 +1,76 @@
+"""
+Общий сервис чётности (parity_service.py) против прямых запросов к сайту без сети.
+
+Сайт изображает fixture_server.py с задержкой SITE_DELAY. CLIENTS копий приложения
+одновременно узнают чётность: напрямую (каждая – своим запросом к сайту) и через сервис
+(холодный кэш – один запрос к сайту на всех, тёплый – ответ из памяти).
+Запуск: python benchmarks/bench_parity_service.py
+"""
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fixture_server import FixtureServer  # noqa: E402
+from parity_service import ParityServer, ParityService, make_session, service_fetch  # noqa: E402
+from parser import fetch_week_parity  # noqa: E402
+
+CLIENTS = 50
+SITE_DELAY = 0.1
+WARM_LOOKUPS = 200
+
+
+def concurrently(count, action):
+    """Запускает action в count потоках одновременно; (результаты, время до последнего ответа в мс)."""
+    results = [None] * count
+    barrier = threading.Barrier(count + 1)
+
+    def worker(number):
+        barrier.wait()
+        results[number] = action()
+
+    threads = [threading.Thread(target=worker, args=(number,)) for number in range(count)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return results, (time.perf_counter() - started) * 1000
+
+
+def run(clients=CLIENTS):
+    results = {"clients": clients, "site_delay_ms": SITE_DELAY * 1000}
+    with FixtureServer("timetable_odd.html", delay=SITE_DELAY) as site:
+        parities, wall_ms = concurrently(clients, lambda: fetch_week_parity(base_url=site.base_url))
+        results["direct"] = {"wall_ms": wall_ms, "site_requests": site.requests, "ok": parities.count("odd")}
+
+        with ParityServer(ParityService(site.base_url), port=0) as server:
+            site.requests = 0
+            fetch = service_fetch(server.url)
+            replies, wall_ms = concurrently(clients, fetch)
+            results["service_cold"] = {"wall_ms": wall_ms, "site_requests": site.requests,
+                                       "ok": sum(reply[1] == "odd" for reply in replies)}
+
+            replies, wall_ms = concurrently(clients, fetch)
+            results["service_warm"] = {"wall_ms": wall_ms, "site_requests": site.requests,
+                                       "ok": sum(reply[1] == "odd" for reply in replies)}
+
+            # Один клиент с пулом соединений: задержка ответа из памяти сервиса
+            pooled = service_fetch(server.url, session=make_session())
+            samples = []
+            for _ in range(WARM_LOOKUPS):
+                started = time.perf_counter()
+                pooled()
+                samples.append((time.perf_counter() - started) * 1000)
+            results["service_warm"]["lookup_median_ms"] = statistics.median(samples)
+            results["service_stats"] = server.service.snapshot()
+    return results
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2, ensure_ascii=False))
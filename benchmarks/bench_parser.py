@@ -0,0 +1,72 @@
+"""
+Сравнение полного разбора страницы расписания (BeautifulSoup) с потоковым поиском баннера.
+
+Для каждой сохранённой страницы из fixtures/ измеряются прочитанные байты, время и пиковая память.
+Запуск: python benchmarks/bench_parser.py
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from parser import CHUNK_SIZE, parse_week_parity, scan_week_parity  # noqa: E402
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+FIXTURES = ["timetable_even.html", "timetable_odd.html", "timetable_no_banner.html"]
+REPEAT = 20
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), "rb") as f:
+        return f.read()
+
+
+def full_parse(body):
+    # Прежний путь: весь ответ целиком, затем полное дерево BeautifulSoup
+    return parse_week_parity(body.decode("utf-8")), len(body)
+
+
+def streaming_parse(body):
+    read = [0]
+
+    def chunks():
+        for start in range(0, len(body), CHUNK_SIZE):
+            chunk = body[start:start + CHUNK_SIZE]
+            read[0] += len(chunk)
+            yield chunk
+
+    parity, rest = scan_week_parity(chunks())
+    if parity is None and rest:
+        parity = parse_week_parity(rest.decode("utf-8"))
+    return parity, read[0]
+
+
+def measure(func, body):
+    parity, bytes_read = func(body)
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        func(body)
+    elapsed = (time.perf_counter() - start) / REPEAT
+    tracemalloc.start()
+    func(body)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"parity": parity, "bytes_read": bytes_read, "time_ms": elapsed * 1000, "peak_kb": peak / 1024}
+
+
+def run():
+    results = {}
+    for name in FIXTURES:
+        body = load_fixture(name)
+        results[name] = {"full": measure(full_parse, body), "streaming": measure(streaming_parse, body)}
+    return results
+
+
+if __name__ == "__main__":
+    for name, modes in run().items():
+        print(name)
+        for mode, r in modes.items():
+            print(f"  {mode:<10} parity={r['parity']!s:<5} read={r['bytes_read']:>7} B  "
+                  f"time={r['time_ms']:7.2f} ms  peak={r['peak_kb']:8.1f} KB")
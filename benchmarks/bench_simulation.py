@@ -0,0 +1,47 @@
+"""
+Скорость моделирования семестра (18 недель) для 10 000 будильников со сменой чётности.
+
+Сравниваются пакетный расчёт без ответов пользователя (с записью событий и без неё)
+и пошаговый, когда каждый звонок один раз откладывается.
+Запуск: python benchmarks/bench_simulation.py
+"""
+import datetime
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_storage import make_alarms  # noqa: E402
+from simulation import Simulation, snooze_times  # noqa: E402
+
+ALARM_COUNT = 10000
+START = datetime.datetime(2024, 9, 2)  # понедельник
+WEEKS = 18
+FLIP = datetime.datetime(2024, 12, 30)  # с нового года чётность считается заново
+
+
+def simulate(count, **kwargs):
+    simulation = Simulation(make_alarms(count), START, "нечётная", **kwargs)
+    simulation.set_week_type(FLIP, "чётная")
+    started = time.perf_counter()
+    simulation.run_until(START + datetime.timedelta(weeks=WEEKS))
+    seconds = time.perf_counter() - started
+    events = sum(simulation.counts.values())
+    return {"events": events, "fired": simulation.counts["fired"], "run_ms": seconds * 1000,
+            "events_per_second": events / seconds}
+
+
+def run(count=ALARM_COUNT):
+    return {
+        "alarms": count,
+        "weeks": WEEKS,
+        "batch": simulate(count, keep_trace=False),
+        "batch_trace": simulate(count),
+        "step_snooze_once": simulate(count, respond=snooze_times(1), keep_trace=False),
+    }
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2, ensure_ascii=False))
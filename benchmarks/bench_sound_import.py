@@ -0,0 +1,81 @@
+"""
+Импорт звуков в библиотеку (sound_store.py): время на FILES файлов по 3 минуты WAV,
+из которых половина – повторы под другими именами, при разном числе потоков.
+
+Повторы не перекодируются и не занимают места: в библиотеке остаётся по одному файлу
+на содержимое. Без ffmpeg WAV обрезается средствами стандартной библиотеки.
+Запуск: python benchmarks/bench_sound_import.py
+"""
+import json
+import math
+import os
+import shutil
+import struct
+import sys
+import tempfile
+import threading
+import time
+import wave
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sound_store import MAX_SECONDS, SoundImporter, SoundStore  # noqa: E402
+
+FILES = 16
+SECONDS = 180
+RATE = 44100
+WORKERS = (1, 2, 4)
+
+
+def make_sources(directory, count=FILES):
+    """count путей: count // 2 разных стерео WAV, каждый встречается дважды под разными именами."""
+    paths = []
+    for number in range(count // 2):
+        path = os.path.join(directory, f"sound{number}.wav")
+        period = 40 + number
+        cycle = b"".join(struct.pack("<hh", *(int(8000 * math.sin(2 * math.pi * i / period)),) * 2)
+                         for i in range(period))
+        with wave.open(path, "wb") as f:
+            f.setnchannels(2)
+            f.setsampwidth(2)
+            f.setframerate(RATE)
+            f.writeframes(b"\x00" * 4 * RATE + cycle * (RATE * SECONDS // period))
+        copy = os.path.join(directory, f"копия {number}.wav")
+        shutil.copyfile(path, copy)
+        paths += [path, copy]
+    return paths
+
+
+def import_all(paths, library, workers, ffmpeg):
+    importer = SoundImporter(SoundStore(library, ffmpeg=ffmpeg), workers=workers)
+    done = threading.Event()
+    results = []
+    started = time.perf_counter()
+    importer.import_files(paths, lambda items: (results.extend(items), done.set()))
+    done.wait()
+    seconds = time.perf_counter() - started
+    importer.shutdown()
+    return results, seconds * 1000
+
+
+def run(count=FILES, ffmpeg=None):
+    results = {"files": count, "source_seconds": SECONDS, "max_seconds": MAX_SECONDS}
+    with tempfile.TemporaryDirectory() as directory:
+        paths = make_sources(directory, count)
+        results["source_bytes"] = sum(os.path.getsize(path) for path in paths)
+        for workers in WORKERS:
+            library = os.path.join(directory, f"library{workers}")
+            imported, import_ms = import_all(paths, library, workers, ffmpeg)
+            assets = os.listdir(library)
+            results[f"workers_{workers}"] = {
+                "import_ms": import_ms, "assets": len(assets),
+                "library_bytes": sum(os.path.getsize(os.path.join(library, name)) for name in assets),
+                "errors": sum(error is not None for _, _, error in imported)}
+        # Повторный выбор уже импортированных файлов: только чтение для хэша
+        _, results["reimport_ms"] = import_all(paths, library, WORKERS[-1], ffmpeg)
+    results["ffmpeg"] = SoundStore(directory, ffmpeg=ffmpeg).ffmpeg or None
+    return results
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2, ensure_ascii=False))
@@ -0,0 +1,34 @@
+"""
+Время запуска приложения до первого кадра (main.py --startup-benchmark).
+
+Приложение запускается несколько раз в отдельном процессе без окна на экране
+(SDL offscreen); берётся медиана. Запуск: python benchmarks/bench_startup.py
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUNS = 5
+
+
+def startup_once():
+    env = dict(os.environ, SDL_VIDEODRIVER=os.environ.get("SDL_VIDEODRIVER", "offscreen"))
+    result = subprocess.run([sys.executable, os.path.join(ROOT, "main.py"), "--startup-benchmark"],
+                            cwd=ROOT, env=env, capture_output=True, text=True, timeout=120)
+    for line in result.stdout.splitlines():
+        if line.startswith("STARTUP "):
+            return json.loads(line[len("STARTUP "):])
+    raise RuntimeError("main.py не сообщил время запуска:\n" + result.stderr[-2000:])
+
+
+def run(runs=RUNS):
+    samples = [startup_once() for _ in range(runs)]
+    return {key: statistics.median(sample[key] for sample in samples) for key in samples[0]}
+
+
+if __name__ == "__main__":
+    for key, value in run().items():
+        print(f"{key:<16} {value:8.1f}")
@@ -0,0 +1,69 @@
+"""
+Холодный старт хранилища будильников: открытие базы и загрузка 10 000 записей,
+а также стоимость записи одного изменённого будильника.
+
+Запуск: python benchmarks/bench_storage.py
+"""
+import datetime
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from alarm_core import Alarm, DAYS_OF_WEEK  # noqa: E402
+from storage import AlarmStore  # noqa: E402
+
+ALARM_COUNT = 10000
+# Бюджет холодного старта (открытие базы и загрузка всех будильников), мс
+COLD_START_BUDGET_MS = 250
+WRITES = 200
+
+
+def make_alarms(count, seed=0):
+    rng = random.Random(seed)
+    alarms = []
+    for _ in range(count):
+        days = rng.sample(DAYS_OF_WEEK, rng.randint(1, 7))
+        schedule = {day: datetime.time(rng.randrange(24), rng.randrange(60)) for day in days}
+        alarms.append(Alarm(schedule=schedule, week_type=rng.choice(["любая", "чётная", "нечётная"]),
+                            active=rng.random() < 0.9))
+    return alarms
+
+
+def run(count=ALARM_COUNT):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "alarms.db")
+        store = AlarmStore(path)
+        store.save_many(make_alarms(count))
+        store.close()
+
+        start = time.perf_counter()
+        store = AlarmStore(path)
+        alarms = store.load()
+        cold_start_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        for alarm in alarms[:WRITES]:
+            alarm.active = not alarm.active
+            store.update_state(alarm)
+        update_ms = (time.perf_counter() - start) / WRITES * 1000
+
+        start = time.perf_counter()
+        for alarm in alarms[:WRITES]:
+            alarm.schedule[DAYS_OF_WEEK[0]] = datetime.time(7, 30)
+            store.save(alarm)
+        save_ms = (time.perf_counter() - start) / WRITES * 1000
+        store.close()
+        db_bytes = os.path.getsize(path)
+
+    return {"alarms": len(alarms), "cold_start_ms": cold_start_ms, "budget_ms": COLD_START_BUDGET_MS,
+            "within_budget": cold_start_ms <= COLD_START_BUDGET_MS, "update_state_ms": update_ms,
+            "save_ms": save_ms, "db_bytes": db_bytes}
+
+
+if __name__ == "__main__":
+    for key, value in run().items():
+        print(f"{key:<16} {value:.3f}" if isinstance(value, float) else f"{key:<16} {value}")
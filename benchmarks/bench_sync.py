@@ -0,0 +1,129 @@
+"""
+Синхронизация будильников между устройствами (sync.py) без сети: эталонный сервер на
+localhost и DEVICES устройств, у каждого своё хранилище SQLite.
+
+1. Первое устройство загружает ALARMS будильников, остальные получают их целиком.
+2. Каждое устройство меняет EDITS будильников и удаляет DELETES; часть правок приходится на
+   одни и те же будильники (конфликты). Все синхронизируются одновременно, затем ещё раз.
+3. Проверяется, что у всех устройств и сервера одинаковые записи.
+
+Для каждого шага – байты в обе стороны, число записей и время обмена; для сравнения –
+размер полного набора записей без сжатия и со сжатием.
+Запуск: python benchmarks/bench_sync.py
+"""
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_storage import make_alarms  # noqa: E402
+from storage import AlarmStore  # noqa: E402
+from sync import SyncClient, SyncServer, pack, to_record  # noqa: E402
+
+DEVICES = 5
+ALARMS = 2000
+EDITS = 20
+DELETES = 5
+SHARED = 5  # столько правок каждого устройства – в общих для всех будильниках
+
+
+class Device:
+    """Хранилище и клиент одного устройства; SQLite используется только в собственном потоке устройства."""
+
+    def __init__(self, path, url):
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self.store, self.client = self.call(self._open, path, url)
+
+    @staticmethod
+    def _open(path, url):
+        import requests
+
+        store = AlarmStore(path)
+        return store, SyncClient(store, url, session=requests.Session())
+
+    def call(self, fn, *args):
+        return self._executor.submit(fn, *args).result()
+
+    def submit(self, fn, *args):
+        return self._executor.submit(fn, *args)
+
+    def records(self):
+        return self.call(lambda: sorted(json.dumps(to_record(alarm), sort_keys=True) for alarm in self.store.load()))
+
+    def close(self):
+        self.call(self.store.close)
+        self._executor.shutdown()
+
+
+def sync_all(devices):
+    """Все устройства синхронизируются одновременно; сводки в порядке devices."""
+    barrier = threading.Barrier(len(devices))
+
+    def sync(device):
+        barrier.wait()
+        return device.client.sync()[1]
+
+    futures = [device.submit(sync, device) for device in devices]
+    return [future.result() for future in futures]
+
+
+def summary(stats):
+    return {"requests": sum(item["requests"] for item in stats),
+            "records_sent": sum(item["sent"] for item in stats),
+            "records_received": sum(item["received"] for item in stats),
+            "bytes_sent": sum(item["bytes_sent"] for item in stats),
+            "bytes_received": sum(item["bytes_received"] for item in stats),
+            "median_ms": statistics.median(item["ms"] for item in stats),
+            "max_ms": max(item["ms"] for item in stats)}
+
+
+def edit(device, rng, shared):
+    alarms = device.store.load()
+    chosen = rng.sample(alarms, EDITS + DELETES - SHARED)
+    by_uid = {alarm.uid: alarm for alarm in alarms}
+    for alarm in chosen[:EDITS - SHARED] + [by_uid[uid] for uid in shared if uid in by_uid]:
+        weekday = rng.randrange(7)
+        alarm.minutes[weekday] = rng.randrange(24 * 60)
+        alarm.day_mask |= 1 << weekday
+        alarm.active = not alarm.active
+        device.store.save(alarm)
+    device.store.delete_many(chosen[EDITS - SHARED:])
+
+
+def run(devices=DEVICES, count=ALARMS):
+    results = {"devices": devices, "alarms": count}
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as directory, SyncServer(port=0) as server:
+        fleet = [Device(os.path.join(directory, f"device{number}.db"), server.url) for number in range(devices)]
+        first = fleet[0]
+        first.call(first.store.save_many, make_alarms(count))
+        records = [to_record(alarm) for alarm in first.call(first.store.load)]
+        results["full_set_bytes"] = len(json.dumps(records, ensure_ascii=False).encode("utf-8"))
+        results["full_set_compressed_bytes"] = len(pack(records))
+
+        results["upload"] = summary([first.call(lambda: first.client.sync()[1])])
+        results["download"] = summary(sync_all(fleet[1:]))
+
+        shared = rng.sample([record["u"] for record in records], SHARED)
+        for device in fleet:
+            device.call(edit, device, random.Random(rng.random()), shared)
+        results["delta"] = summary(sync_all(fleet))
+        results["settle"] = summary(sync_all(fleet))
+
+        expected = fleet[0].records()
+        results["converged"] = all(device.records() == expected for device in fleet[1:])
+        results["records_after"] = len(expected)
+        results["server"] = {key: value for key, value in server.service.snapshot().items() if key != "epoch"}
+        for device in fleet:
+            device.close()
+    return results
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2, ensure_ascii=False))
@@ -0,0 +1,93 @@
+"""
+Разовые таймеры: колесо таймеров против кучи.
+
+Добавляется TIMER_COUNT отложенных звонков на ближайшие сутки, половина отменяется
+(пользователь выключил будильник), затем время проходит вперёд с шагом в минуту.
+У кучи отмена – поиск записи и heapify, как без словаря записей.
+Запуск: python benchmarks/bench_timer_wheel.py
+"""
+import datetime
+import heapq
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from timer_wheel import TimerWheel  # noqa: E402
+
+TIMER_COUNT = 100000
+CANCEL_COUNT = 200  # у кучи отмена – O(n), поэтому отменяется меньше
+START = datetime.datetime(2024, 9, 2, 6, 0)
+
+
+def make_deadlines(count, seed=0):
+    rng = random.Random(seed)
+    return [START + datetime.timedelta(seconds=rng.uniform(1, 86400)) for _ in range(count)]
+
+
+def timed_ms(action):
+    start = time.perf_counter()
+    result = action()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def run_wheel(deadlines, cancelled):
+    wheel = TimerWheel(START)
+    timers, insert_ms = timed_ms(lambda: [wheel.schedule(when, index) for index, when in enumerate(deadlines)])
+    _, cancel_ms = timed_ms(lambda: [wheel.cancel(timers[index]) for index in cancelled])
+
+    def drain():
+        fired = 0
+        for minute in range(1, 24 * 60 + 2):
+            fired += len(wheel.advance(START + datetime.timedelta(minutes=minute)))
+        return fired
+
+    fired, advance_ms = timed_ms(drain)
+    return {"insert_ms": insert_ms, "cancel_ms": cancel_ms, "advance_ms": advance_ms, "fired": fired}
+
+
+def run_heap(deadlines, cancelled):
+    heap = []
+
+    def insert():
+        for index, when in enumerate(deadlines):
+            heapq.heappush(heap, (when, index))
+
+    def cancel():
+        for index in cancelled:
+            heap.remove((deadlines[index], index))
+            heapq.heapify(heap)
+
+    _, insert_ms = timed_ms(insert)
+    _, cancel_ms = timed_ms(cancel)
+
+    def drain():
+        fired = 0
+        for minute in range(1, 24 * 60 + 2):
+            now = START + datetime.timedelta(minutes=minute)
+            while heap and heap[0][0] <= now:
+                heapq.heappop(heap)
+                fired += 1
+        return fired
+
+    fired, advance_ms = timed_ms(drain)
+    return {"insert_ms": insert_ms, "cancel_ms": cancel_ms, "advance_ms": advance_ms, "fired": fired}
+
+
+def run(count=TIMER_COUNT, cancel_count=CANCEL_COUNT):
+    deadlines = make_deadlines(count)
+    cancelled = random.Random(1).sample(range(count), cancel_count)
+    results = {"timers": count, "cancelled": cancel_count,
+               "wheel": run_wheel(deadlines, cancelled), "heap": run_heap(deadlines, cancelled)}
+    if results["wheel"]["fired"] != results["heap"]["fired"]:
+        raise AssertionError("колесо и куча сработали разное число раз")
+    results["cancel_us_per_timer"] = {name: results[name]["cancel_ms"] * 1000 / cancel_count
+                                      for name in ("wheel", "heap")}
+    return results
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2, ensure_ascii=False))
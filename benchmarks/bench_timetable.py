@@ -0,0 +1,49 @@
+"""
+Разбор расписания группы из сохранённой страницы и повторное создание будильников из кэша.
+
+Запуск: python benchmarks/bench_timetable.py
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from timetable import TimetableCache, generate_alarms, parse_timetable  # noqa: E402
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+FIXTURE = "timetable_even.html"
+REPEAT = 20
+
+
+def run():
+    with open(os.path.join(FIXTURES_DIR, FIXTURE), encoding="utf-8") as f:
+        page = f.read()
+
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        lessons = parse_timetable(page)
+    parse_ms = (time.perf_counter() - start) / REPEAT * 1000
+
+    with tempfile.TemporaryDirectory() as directory:
+        TimetableCache(directory, fetch_page=lambda group: page).get("group")
+        # Новый экземпляр читает расписание с диска, как после перезапуска приложения
+        cache = TimetableCache(directory, fetch_page=lambda group: None)
+        start = time.perf_counter()
+        cached = cache.get("group")
+        disk_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        for _ in range(REPEAT):
+            alarms = generate_alarms(cache.get("group"), lead_minutes=60)
+        regenerate_ms = (time.perf_counter() - start) / REPEAT * 1000
+
+    assert cached == lessons
+    return {"lessons": len(lessons), "alarms": len(alarms), "parse_ms": parse_ms,
+            "disk_cache_ms": disk_ms, "regenerate_ms": regenerate_ms}
+
+
+if __name__ == "__main__":
+    for key, value in run().items():
+        print(f"{key:<15} {value:.3f}" if isinstance(value, float) else f"{key:<15} {value}")
@@ -0,0 +1,103 @@
+"""
+Локальная замена сайта расписания: отдаёт сохранённые страницы из fixtures/.
+
+Сервер слушает 127.0.0.1 на свободном порту и отвечает на /timetable?group=...
+так же, как edu.sfu-kras.ru: HTML в UTF-8, ETag и 304 на If-None-Match.
+Какую страницу отдавать, задаётся атрибутом fixture (можно менять на лету);
+delay добавляет задержку ответа, чтобы изобразить медленную сеть.
+
+    with FixtureServer("timetable_odd.html") as server:
+        fetch_week_parity(base_url=server.base_url)
+
+Запуск отдельно: python benchmarks/fixture_server.py [страница] [порт]
+"""
+import hashlib
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+DEFAULT_FIXTURE = "timetable_even.html"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server.owner
+        url = urlsplit(self.path)
+        if url.path.rstrip("/") != "/timetable":
+            self.send_error(404)
+            return
+        server.requests += 1
+        server.groups.append(parse_qs(url.query).get("group", [None])[0])
+        if server.delay:
+            time.sleep(server.delay)
+        body = server.page(server.fixture)
+        etag = '"%s"' % hashlib.sha1(body).hexdigest()
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # потоковый клиент закрывает соединение, как только нашёл баннер
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FixtureServer:
+    def __init__(self, fixture=DEFAULT_FIXTURE, port=0, delay=0):
+        self.fixture = fixture
+        self.delay = delay
+        self.requests = 0
+        self.groups = []  # группы из запросов по порядку
+        self._pages = {}
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), _Handler)
+        self._server.daemon_threads = True
+        self._server.owner = self
+        self._thread = None
+
+    @property
+    def base_url(self):
+        return "http://127.0.0.1:%d/timetable" % self._server.server_address[1]
+
+    def page(self, name):
+        if name not in self._pages:
+            with open(os.path.join(FIXTURES_DIR, name), "rb") as f:
+                self._pages[name] = f.read()
+        return self._pages[name]
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+if __name__ == "__main__":
+    server = FixtureServer(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_FIXTURE,
+                           port=int(sys.argv[2]) if len(sys.argv) > 2 else 8000)
+    print("Страница расписания:", server.base_url)
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
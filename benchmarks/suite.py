@@ -0,0 +1,253 @@
+"""
+Набор замеров планировщика, разбора страницы чётности и списка будильников с сохранением
+результатов и сравнением запусков.
+
+Всё работает без сети: будильники генерируются (от 10 до 100 000), страница расписания
+отдаётся локальным сервером из fixtures/ (fixture_server.py), Kivy запускается без окна
+на экране (SDL offscreen) в отдельном процессе.
+
+    python benchmarks/suite.py run                       # все группы, результат в benchmarks/results/
+    python benchmarks/suite.py run --only scheduler --sizes 10 1000 -o base.json
+    python benchmarks/suite.py compare base.json new.json  # код возврата 1, если есть регрессии
+
+Результат – JSON: {"meta": {...}, "results": {"группа/размер/метрика": значение}}.
+Сравниваются метрики с суффиксами _ms, _us и _bytes (меньше – лучше); регрессия –
+рост больше чем на --threshold и больше чем на --min-delta-ms. Метрики, которых нет
+в одном из запусков, перечисляются отдельно.
+"""
+import argparse
+import datetime
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, ROOT)
+sys.path.insert(0, BENCH_DIR)
+
+from bench_storage import make_alarms  # noqa: E402
+
+GROUPS = ("scheduler", "parser", "ui")
+SIZES = (10, 100, 1000, 10000, 100000)
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+START = datetime.datetime(2024, 9, 2, 0, 0)  # понедельник
+TICKS = 1000
+REPEAT = 15
+SCHEDULER_REPEAT = 5
+FIXTURES = ("timetable_even.html", "timetable_odd.html", "timetable_no_banner.html")
+DEFAULT_THRESHOLD = 0.2
+DEFAULT_MIN_DELTA_MS = 0.05
+LOWER_IS_BETTER = ("_ms", "_us", "_bytes")
+
+
+def timed_ms(action):
+    start = time.perf_counter()
+    result = action()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def median_ms(action, repeat=REPEAT):
+    samples = []
+    for _ in range(repeat):
+        samples.append(timed_ms(action)[1])
+    return statistics.median(samples)
+
+
+# Группы замеров
+
+def scheduler_once(alarms):
+    from scheduler import AlarmScheduler
+
+    scheduler = AlarmScheduler(parity_offset=0, now=START)
+    _, reindex_all_ms = timed_ms(lambda: scheduler.reindex_all(alarms))
+
+    # Проверка, когда ничего не наступило: так check_alarms проходит почти всегда
+    idle_at = START + datetime.timedelta(seconds=1)
+    _, idle_ms = timed_ms(lambda: [scheduler.pop_due(idle_at) for _ in range(TICKS)])
+
+    alarm = alarms[len(alarms) // 2]
+    _, reindex_ms = timed_ms(lambda: [scheduler.reindex(alarm, START) for _ in range(TICKS)])
+
+    # Сутки работы: проверка в каждый ближайший срок, как у главного цикла приложения
+    def replay_day():
+        fired = 0
+        end = START + datetime.timedelta(days=1)
+        deadline = scheduler.next_deadline()
+        while deadline is not None and deadline < end:
+            fired += len(scheduler.pop_due(deadline))
+            deadline = scheduler.next_deadline()
+        return fired
+
+    fired, replay_ms = timed_ms(replay_day)
+    return {"reindex_all_ms": reindex_all_ms, "check_idle_us": idle_ms * 1000 / TICKS,
+            "reindex_one_us": reindex_ms * 1000 / TICKS, "replay_day_ms": replay_ms, "fired_per_day": fired}
+
+
+def bench_scheduler(sizes):
+    results = {}
+    for size in sizes:
+        alarms = make_alarms(size)
+        # Каждый прогон – с новым планировщиком; берётся медиана по каждой метрике
+        runs = [scheduler_once(alarms) for _ in range(SCHEDULER_REPEAT)]
+        results[size] = {key: statistics.median(run[key] for run in runs) for key in runs[0]}
+    return results
+
+
+def bench_parser(sizes=None):
+    from fixture_server import FixtureServer
+    from parser import fetch_week_parity, fetch_week_parity_conditional
+
+    results = {}
+    with FixtureServer() as server:
+        for fixture in FIXTURES:
+            server.fixture = fixture
+            parity = fetch_week_parity(base_url=server.base_url)
+            stream_ms = median_ms(lambda: fetch_week_parity(base_url=server.base_url))
+            full_ms = median_ms(lambda: fetch_week_parity(stream=False, base_url=server.base_url))
+            etag = fetch_week_parity_conditional(base_url=server.base_url)[2]
+            not_modified_ms = median_ms(lambda: fetch_week_parity_conditional(etag=etag, base_url=server.base_url))
+            results[fixture] = {"parity": parity, "stream_ms": stream_ms, "full_ms": full_ms,
+                                "not_modified_ms": not_modified_ms}
+    return results
+
+
+def bench_ui(sizes):
+    # У Kivy одно приложение на процесс, поэтому список замеряется в дочернем процессе
+    env = dict(os.environ, SDL_VIDEODRIVER=os.environ.get("SDL_VIDEODRIVER", "offscreen"), KIVY_NO_ARGS="1")
+    completed = subprocess.run([sys.executable, os.path.abspath(__file__), "ui-worker", "--sizes"]
+                               + [str(size) for size in sizes],
+                               cwd=ROOT, env=env, capture_output=True, text=True, timeout=1800)
+    for line in completed.stdout.splitlines():
+        if line.startswith("UI "):
+            return json.loads(line[3:])
+    raise RuntimeError("замер списка завершился без результата:\n" + completed.stderr[-2000:])
+
+
+def ui_worker(sizes):
+    import bench_alarm_list
+
+    print("UI " + json.dumps(bench_alarm_list.run(sizes)), flush=True)
+
+
+BENCHES = {"scheduler": bench_scheduler, "parser": bench_parser, "ui": bench_ui}
+
+
+# Результаты
+
+def flatten(value, prefix=""):
+    if isinstance(value, dict):
+        flat = {}
+        for key, item in value.items():
+            flat.update(flatten(item, f"{prefix}/{key}" if prefix else str(key)))
+        return flat
+    return {prefix: value}
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run(groups=GROUPS, sizes=SIZES):
+    results = {}
+    for group in groups:
+        started = time.perf_counter()
+        results[group] = BENCHES[group](sizes)
+        print(f"{group}: {time.perf_counter() - started:.1f} с", file=sys.stderr)
+    return {
+        "meta": {"time": datetime.datetime.now().isoformat(timespec="seconds"), "commit": git_commit(),
+                 "python": platform.python_version(), "platform": platform.platform(),
+                 "groups": list(groups), "sizes": list(sizes)},
+        "results": flatten(results),
+    }
+
+
+def compare(base, new, threshold=DEFAULT_THRESHOLD, min_delta_ms=DEFAULT_MIN_DELTA_MS):
+    """Список (метрика, было, стало, изменение, регрессия) для метрик, которые есть в обоих запусках."""
+    rows = []
+    for key in sorted(set(base["results"]) & set(new["results"])):
+        before, after = base["results"][key], new["results"][key]
+        if not key.endswith(LOWER_IS_BETTER) or isinstance(before, bool) or not isinstance(before, (int, float)):
+            continue
+        if before:
+            change = (after - before) / before
+        else:
+            change = math.inf if after > 0 else 0.0  # рост с нуля – регрессия при любом пороге
+        delta_ms = after - before
+        if key.endswith("_us"):
+            delta_ms /= 1000
+        significant = key.endswith("_bytes") or delta_ms > min_delta_ms
+        rows.append((key, before, after, change, change > threshold and significant))
+    return rows
+
+
+def missing_metrics(base, new):
+    """Метрики, которые есть только в одном из запусков: (только в base, только в new)."""
+    return sorted(set(base["results"]) - set(new["results"])), sorted(set(new["results"]) - set(base["results"]))
+
+
+def print_comparison(rows):
+    width = max((len(row[0]) for row in rows), default=10)
+    for key, before, after, change, regression in rows:
+        mark = "  РЕГРЕССИЯ" if regression else ""
+        print(f"{key:<{width}} {before:>12.3f} {after:>12.3f} {change:>+8.1%}{mark}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Набор замеров будильника")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="выполнить замеры и сохранить результат")
+    run_parser.add_argument("--only", nargs="+", choices=GROUPS, default=list(GROUPS))
+    run_parser.add_argument("--sizes", nargs="+", type=int, default=list(SIZES))
+    run_parser.add_argument("-o", "--output", help="файл результата (по умолчанию benchmarks/results/...)")
+    compare_parser = commands.add_parser("compare", help="сравнить два результата")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                                help="допустимый рост, доля (0.2 – 20%%)")
+    compare_parser.add_argument("--min-delta-ms", type=float, default=DEFAULT_MIN_DELTA_MS,
+                                help="меньший рост в мс не считается регрессией (шум)")
+    worker_parser = commands.add_parser("ui-worker")
+    worker_parser.add_argument("--sizes", nargs="+", type=int, default=list(SIZES))
+    args = parser.parse_args(argv)
+
+    if args.command == "ui-worker":
+        ui_worker(args.sizes)
+        return 0
+    if args.command == "run":
+        report = run(args.only, args.sizes)
+        output = args.output
+        if output is None:
+            os.makedirs(RESULTS_DIR, exist_ok=True)
+            stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+            output = os.path.join(RESULTS_DIR, f"{stamp}-{report['meta']['commit'] or 'nogit'}.json")
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(output)
+        return 0
+
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.new, encoding="utf-8") as f:
+        new = json.load(f)
+    rows = compare(base, new, args.threshold, args.min_delta_ms)
+    print_comparison(rows)
+    for title, keys in zip(("Нет в новом запуске", "Нет в базовом запуске"), missing_metrics(base, new)):
+        if keys:
+            print(f"{title}: {', '.join(keys)}")
+    regressions = [row for row in rows if row[4]]
+    print(f"Регрессий: {len(regressions)} из {len(rows)}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+"""
+Источники времени для демона будильника.
+
+SystemClock – настоящее время. SimulatedClock – время, которое идёт только
+по команде advance() или set(); с ним сценарии на недели вперёд проверяются за доли
+секунды (см. также simulation.py). Приложение и демон берут время только у часов.
+"""
+import datetime
+
+
+class SystemClock:
+    def now(self):
+        return datetime.datetime.now()
+
+    def today(self):
+        return datetime.date.today()
+
+    def sleep_timeout(self, delay, limit):
+        """Сколько секунд ждать в select(), если до ближайшего срока delay секунд."""
+        return max(min(delay, limit), 0)
+
+
+class SimulatedClock:
+    def __init__(self, start):
+        self.current = start
+        self._listeners = []
+
+    def now(self):
+        return self.current
+
+    def today(self):
+        return self.current.date()
+
+    def subscribe(self, callback):
+        """callback() вызывается после каждого advance() – демон по нему просыпается."""
+        self._listeners.append(callback)
+
+    def advance(self, delta=None, **kwargs):
+        """Сдвигает время: advance(datetime.timedelta(...)) или advance(minutes=5)."""
+        self.set(self.current + (delta if delta is not None else datetime.timedelta(**kwargs)))
+
+    def set(self, when):
+        """Переводит время на момент when (не раньше текущего)."""
+        if when < self.current:
+            raise ValueError("время не идёт назад")
+        self.current = when
+        for callback in self._listeners:
+            callback()
+
+    def sleep_timeout(self, delay, limit):
+        # Время само не идёт: срок либо уже наступил, либо ждём advance() или запроса
+        return 0 if delay <= 0 else None
@@ -0,0 +1,721 @@
+"""
+Фоновый процесс будильника без интерфейса.
+
+Демон владеет расписанием: читает будильники из того же SQLite, что и приложение,
+сам узнаёт чётность недели и запускает уведомление и звук. Kivy не загружается.
+Интерфейс подключается через Unix-сокет; протокол – JSON, по строке на запрос и ответ:
+
+    {"op": "list"}                           -> {"ok": true, "alarms": [...]}
+    {"op": "save", "alarm": {...}}           -> {"ok": true, "id": 3}
+    {"op": "delete", "id": 3}                -> {"ok": true}
+    {"op": "snooze", "ids": [3, 4], "minutes": 5}
+                                             -> {"ok": true, "at": "2024-09-02T07:05:00"}
+    {"op": "dismiss", "ids": [3, 4]}         -> {"ok": true} – все будильники одной записью
+    {"op": "states", "alarms": [{"id": 3, "active": false, "last_triggered": "2024-09-02T07:00:00"}]}
+                                             -> {"ok": true} – только активность и время срабатывания
+                                                (как AlarmStore.update_states), одной записью
+    {"op": "status"}                         -> {"ok": true, "week_type": "чётная", "next": "..."}
+    {"op": "subscribe"}                      -> {"ok": true}, затем события {"event": "fired", ...}
+                                                и {"event": "synced", "count": 2} – будильники изменены
+                                                с другого устройства (см. sync.py)
+
+Все будильники, наступившие к одной проверке, срабатывают вместе: одно уведомление, один звук
+(он играет, пока не отложены или не выключены все) и одно событие {"event": "fired", "alarms": [...]}.
+
+Между срабатываниями демон спит в select() до ближайшего срока (не дольше MAX_SLEEP),
+поэтому в простое почти не расходует процессор. Время берётся из clocks.SystemClock,
+в проверках его заменяет clocks.SimulatedClock.
+
+Если задан сервер синхронизации, демон обменивается с ним изменениями раз в SYNC_INTERVAL
+и вскоре после каждого изменения будильников.
+
+Запуск: python daemon.py [--socket путь] [--data-dir каталог] [--no-parity] [--parity-service URL]
+                         [--sync-server URL]
+"""
+import argparse
+import datetime
+import heapq
+import itertools
+import json
+import os
+import selectors
+import shutil
+import signal
+import socket
+import subprocess
+import threading
+from collections import deque
+
+from alarm_core import alarm_from_dict, alarm_to_dict, parity_offset_for, week_type_on
+from clocks import SystemClock
+from parity_cache import ParityCache, WEEK_TYPE_BY_PARITY
+from parity_service import service_fetch
+from parity_worker import ParityFetcher
+from scheduler import AlarmScheduler
+from sounds import SoundResolver, write_fallback_tone
+from storage import AlarmStore
+from sync import SyncClient, update_alarm
+
+# Каталог данных совпадает с App.user_data_dir приложения AlarmClockApp в Linux
+DEFAULT_DATA_DIR = os.path.join(os.environ.get("XDG_CONFIG_HOME", os.path.expanduser("~/.config")), "alarmclock")
+SOCKET_NAME = "daemon.sock"
+
+# Максимальный сон между проверками: страхует от перевода системных часов и сна устройства
+MAX_SLEEP = 300
+# Как часто перепроверять чётность недели, сек
+PARITY_REFRESH = 3600
+DEFAULT_SNOOZE_MINUTES = 5
+# Как часто синхронизироваться с другими устройствами и через сколько секунд после изменения
+SYNC_INTERVAL = 60
+SYNC_DELAY = 2
+# Сколько ждать медленного клиента при отправке, сек
+SEND_TIMEOUT = 1
+
+# Консольные проигрыватели в порядке предпочтения
+PLAYERS = [
+    ("ffplay", ["-nodisp", "-loop", "0", "-loglevel", "quiet"]),
+    ("paplay", []),
+    ("afplay", []),
+    ("aplay", ["-q"]),
+]
+
+
+class DaemonError(Exception):
+    """Ошибка, которую демон вернул в ответ на запрос."""
+
+
+def fired_message(alarms):
+    """Текст уведомления о сработавших вместе будильниках."""
+    if len(alarms) == 1:
+        return "Время просыпаться!"
+    return f"Время просыпаться! Сработало будильников: {len(alarms)}"
+
+
+def notify(title, message):
+    try:
+        from plyer import notification
+        notification.notify(title=title, message=message, timeout=10)
+    except Exception as e:  # plyer не установлен или платформа не поддерживается
+        print("Уведомление не показано:", e)
+
+
+class SoundPlayer:
+    """
+    Проигрывает звук по кругу внешним консольным проигрывателем, не загружая аудиобиблиотек
+    в процесс демона. Звук играет, пока не вызван stop.
+    """
+
+    def __init__(self, fallback_dir, resolver=None):
+        self.fallback_dir = fallback_dir
+        self.resolver = resolver if resolver is not None else SoundResolver()
+        self._process = None
+        self._stopped = None  # threading.Event текущего проигрывания
+        self._lock = threading.Lock()
+
+    def _command(self):
+        for name, args in PLAYERS:
+            path = shutil.which(name)
+            if path:
+                return [path] + args
+        return None
+
+    def _fallback_path(self):
+        path = os.path.join(self.fallback_dir, "fallback_tone.wav")
+        if not os.path.isfile(path):
+            os.makedirs(self.fallback_dir, exist_ok=True)
+            write_fallback_tone(path)
+        return path
+
+    def play(self, path):
+        self.stop()
+        command = self._command()
+        if command is None:
+            print("Не найден проигрыватель звука")
+            return
+        resolved = self.resolver.resolve(path) or self._fallback_path()
+        self._stopped = threading.Event()
+        threading.Thread(target=self._loop, args=(command + [resolved], self._stopped), daemon=True).start()
+
+    def _loop(self, command, stopped):
+        # paplay, afplay и aplay играют файл один раз – проигрыватель перезапускается, пока не вызван stop
+        while True:
+            with self._lock:
+                if stopped.is_set():
+                    return
+                try:
+                    process = self._process = subprocess.Popen(command, stdin=subprocess.DEVNULL,
+                                                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                except OSError as e:
+                    print("Не удалось запустить проигрыватель:", e)
+                    return
+            if process.wait() != 0 and not stopped.is_set():
+                print("Проигрыватель завершился с ошибкой, звук остановлен")
+                return
+
+    def stop(self):
+        if self._stopped is not None:
+            self._stopped.set()
+            self._stopped = None
+        with self._lock:
+            process, self._process = self._process, None
+        if process is not None:
+            if process.poll() is None:
+                process.terminate()
+            process.wait()
+
+
+class _Timer:
+    def __init__(self, fn):
+        self.fn = fn
+
+    def cancel(self):
+        self.fn = None
+
+
+class _Connection:
+    def __init__(self, sock):
+        self.sock = sock
+        self.buffer = b""
+        self.subscribed = False
+
+
+class AlarmDaemon:
+    def __init__(self, store, socket_path, clock=None, parity_cache=None, notify=notify, play=None, stop_sound=None,
+                 snooze_minutes=DEFAULT_SNOOZE_MINUTES, sync_client=None):
+        """
+        :param store: AlarmStore
+        :param socket_path: путь Unix-сокета для подключения интерфейса
+        :param clock: SystemClock (по умолчанию) или SimulatedClock
+        :param parity_cache: ParityCache; None – чётность не запрашивается
+        :param notify: notify(title, message) – системное уведомление
+        :param play: play(path) – запуск звука; stop_sound() – его остановка
+        :param sync_client: sync.SyncClient для того же store; None – без синхронизации
+        """
+        self.store = store
+        self.socket_path = socket_path
+        self.clock = clock if clock is not None else SystemClock()
+        self.parity_cache = parity_cache
+        self.notify = notify
+        self.play = play if play is not None else (lambda path: None)
+        self.stop_sound = stop_sound if stop_sound is not None else (lambda: None)
+        self.snooze_minutes = snooze_minutes
+        self.ringing = set()  # id будильников, которые звонят сейчас (звук у них общий)
+
+        now = self.clock.now()
+        self.scheduler = AlarmScheduler(now=now)
+        self.alarms = {alarm.id: alarm for alarm in store.load()}
+        self._timers = []  # куча (время, порядковый номер, _Timer)
+        self._counter = itertools.count()
+        self._calls = deque()  # вызовы, переданные из других потоков
+        self._running = False
+
+        self.selector = selectors.DefaultSelector()
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self.selector.register(self._wake_r, selectors.EVENT_READ, self._drain_wakeups)
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server.bind(socket_path)
+        self.server.listen()
+        self.server.setblocking(False)
+        self.selector.register(self.server, selectors.EVENT_READ, self._accept)
+        self._connections = {}
+
+        if hasattr(self.clock, "subscribe"):
+            self.clock.subscribe(self.wake)
+
+        self.parity_fetcher = None
+        if parity_cache is not None:
+            today = now.date()
+            self.scheduler.parity_offset = parity_cache.parity_offset(today)
+            self.parity_fetcher = ParityFetcher(
+                lambda timeout: parity_cache.fetch(timeout=timeout, now=self.clock.now()), self.on_week_parity,
+                post=self.call_soon, call_later=self.call_later)
+            self.refresh_parity()
+        self.scheduler.reindex_all(self.alarms.values())
+
+        self.sync_client = sync_client
+        self._sync_timer = None
+        self._syncing = False  # обмен идёт в отдельном потоке
+        self._sync_again = False
+        if sync_client is not None:
+            self.refresh_sync()
+
+    # Главный цикл
+
+    def serve_forever(self):
+        self._running = True
+        try:
+            while self._running:
+                self.step(self._timeout())
+        finally:
+            self.close()
+
+    def stop(self):
+        self._running = False
+        self.wake()
+
+    def step(self, timeout=0):
+        """Одна итерация: ждёт запросы не дольше timeout секунд, затем выполняет всё, что наступило."""
+        for key, _ in self.selector.select(timeout):
+            key.data(key.fileobj)
+        while self._calls:
+            fn, args = self._calls.popleft()
+            fn(*args)
+        now = self.clock.now()
+        while self._timers and self._timers[0][0] <= now:
+            timer = heapq.heappop(self._timers)[2]
+            if timer.fn is not None:
+                timer.fn()
+        self.check_alarms(now)
+
+    def _next_deadline(self):
+        deadlines = [self.scheduler.next_deadline()]
+        if self._timers:
+            deadlines.append(self._timers[0][0])
+        deadlines = [deadline for deadline in deadlines if deadline is not None]
+        return min(deadlines) if deadlines else None
+
+    def _timeout(self):
+        if self._calls:
+            return 0
+        deadline = self._next_deadline()
+        delay = MAX_SLEEP if deadline is None else (deadline - self.clock.now()).total_seconds()
+        return self.clock.sleep_timeout(delay, MAX_SLEEP)
+
+    def wake(self):
+        """Прерывает ожидание в select(); можно вызывать из любого потока."""
+        try:
+            self._wake_w.send(b"\0")
+        except OSError:
+            pass
+
+    def _drain_wakeups(self, sock):
+        try:
+            while sock.recv(4096):
+                pass
+        except BlockingIOError:
+            pass
+
+    def call_soon(self, fn, *args):
+        """Выполнить fn в потоке демона (для ParityFetcher)."""
+        self._calls.append((fn, args))
+        self.wake()
+
+    def call_later(self, delay, fn):
+        timer = _Timer(fn)
+        when = self.clock.now() + datetime.timedelta(seconds=delay)
+        heapq.heappush(self._timers, (when, next(self._counter), timer))
+        return timer
+
+    def close(self):
+        if self.parity_fetcher is not None:
+            self.parity_fetcher.shutdown()
+        for connection in list(self._connections.values()):
+            self._drop(connection)
+        self.selector.close()
+        self.server.close()
+        self._wake_r.close()
+        self._wake_w.close()
+        try:
+            os.unlink(self.socket_path)
+        except OSError:
+            pass
+        self.stop_sound()
+        self.store.close()
+
+    # Будильники
+
+    def check_alarms(self, now):
+        due = self.scheduler.pop_due(now)
+        if due:
+            self.fire([alarm for alarm, fire_dt in due], now)
+
+    def fire(self, alarms, now):
+        for alarm in alarms:
+            alarm.last_triggered = now
+        self.store.update_states(alarms)
+        self.notify("Будильник", fired_message(alarms))
+        if not self.ringing:
+            self.play(alarms[0].sound)  # если уже звонит, звук не перезапускается
+        self.ringing.update(alarm.id for alarm in alarms)
+        self.publish({"event": "fired", "alarms": [alarm_to_dict(alarm) for alarm in alarms], "at": now.isoformat()})
+
+    def _silence(self, *alarms):
+        for alarm in alarms:
+            self.ringing.discard(alarm.id)
+        if not self.ringing:
+            self.stop_sound()
+
+    def refresh_parity(self):
+        self.parity_fetcher.request()
+        self.call_later(PARITY_REFRESH, self.refresh_parity)
+
+    def on_week_parity(self, week_parity):
+        if week_parity not in WEEK_TYPE_BY_PARITY:
+            return  # остаётся последняя известная чётность
+        parity_offset = parity_offset_for(WEEK_TYPE_BY_PARITY[week_parity], self.clock.now().date())
+        if parity_offset != self.scheduler.parity_offset:
+            self.scheduler.parity_offset = parity_offset
+            self.scheduler.last_check = self.clock.now()
+            self.scheduler.reindex_all(self.alarms.values())
+
+    # Синхронизация
+
+    def refresh_sync(self):
+        self.request_sync()
+        self.call_later(SYNC_INTERVAL, self.refresh_sync)
+
+    def request_sync(self, delay=0):
+        """Обмен с сервером синхронизации через delay секунд; близкие запросы объединяются в один."""
+        if self.sync_client is not None and self._sync_timer is None:
+            self._sync_timer = self.call_later(delay, self._start_sync)
+
+    def _start_sync(self):
+        self._sync_timer = None
+        if self._syncing:
+            self._sync_again = True
+            return
+        # Хранилище читается в потоке демона, сеть – в отдельном потоке
+        body, sent = self.sync_client.prepare()
+        self._syncing = True
+
+        def work():
+            import requests
+
+            try:
+                reply, _ = self.sync_client.exchange(body)
+            except (requests.RequestException, ValueError) as e:
+                print("Синхронизация не удалась:", e)
+                self.call_soon(self._finish_sync, sent, None)
+                return
+            self.call_soon(self._finish_sync, sent, reply)
+
+        threading.Thread(target=work, daemon=True).start()
+
+    def _finish_sync(self, sent, reply):
+        self._syncing = False
+        more = False
+        if reply is not None:
+            changed, more = self.sync_client.finish(sent, reply)
+            self.apply_synced(changed)
+        if more or self._sync_again:
+            self._sync_again = False
+            self.request_sync()
+
+    def apply_synced(self, changed):
+        """Переносит в расписание будильники, изменённые на других устройствах (уже записанные в store)."""
+        if not changed:
+            return
+        by_uid = {alarm.uid: alarm for alarm in self.alarms.values()}
+        now = self.clock.now()
+        for uid, alarm in changed:
+            previous = by_uid.get(uid)
+            if alarm is None:
+                if previous is not None:
+                    del self.alarms[previous.id]
+                    self._silence(previous)
+                    self.scheduler.remove(previous)
+                continue
+            if previous is not None:
+                update_alarm(previous, alarm)
+                alarm = previous
+            else:
+                self.alarms[alarm.id] = by_uid[uid] = alarm
+            self.scheduler.reindex(alarm, now)
+        self.publish({"event": "synced", "count": len(changed)})
+
+    # Подключения
+
+    def _accept(self, server):
+        try:
+            sock, _ = server.accept()
+        except BlockingIOError:
+            return
+        sock.settimeout(SEND_TIMEOUT)
+        connection = _Connection(sock)
+        self._connections[sock] = connection
+        self.selector.register(sock, selectors.EVENT_READ, self._read)
+
+    def _drop(self, connection):
+        self._connections.pop(connection.sock, None)
+        try:
+            self.selector.unregister(connection.sock)
+        except (KeyError, ValueError):
+            pass
+        connection.sock.close()
+
+    def _read(self, sock):
+        connection = self._connections[sock]
+        try:
+            data = sock.recv(65536)
+        except OSError:
+            data = b""
+        if not data:
+            self._drop(connection)
+            return
+        connection.buffer += data
+        while b"\n" in connection.buffer:
+            line, connection.buffer = connection.buffer.split(b"\n", 1)
+            if line.strip():
+                self._send(connection, self.handle(line, connection))
+
+    def _send(self, connection, message):
+        try:
+            connection.sock.sendall(json.dumps(message, ensure_ascii=False).encode("utf-8") + b"\n")
+        except OSError:
+            self._drop(connection)
+
+    def publish(self, event):
+        for connection in list(self._connections.values()):
+            if connection.subscribed:
+                self._send(connection, event)
+
+    def handle(self, line, connection=None):
+        """Обрабатывает одну строку запроса и возвращает ответ."""
+        try:
+            request = json.loads(line)
+            handler = getattr(self, "op_" + str(request.get("op")), None)
+            if handler is None:
+                raise DaemonError(f"неизвестная операция {request.get('op')!r}")
+            if request.get("op") == "subscribe":
+                return handler(request, connection)
+            return handler(request)
+        except (DaemonError, ValueError, KeyError, TypeError) as e:
+            return {"ok": False, "error": str(e)}
+        except Exception as e:  # ошибка в одном запросе не должна останавливать демон
+            print("Ошибка при обработке запроса:", repr(e))
+            return {"ok": False, "error": repr(e)}
+
+    def _alarm(self, request):
+        return self._find(request["id"])
+
+    def _alarms(self, request):
+        """Будильники из списка ids; неизвестный id – ошибка до каких-либо изменений."""
+        return [self._find(alarm_id) for alarm_id in request["ids"]]
+
+    def _find(self, alarm_id):
+        alarm = self.alarms.get(alarm_id)
+        if alarm is None:
+            raise DaemonError(f"нет будильника {alarm_id}")
+        return alarm
+
+    def op_list(self, request):
+        return {"ok": True, "alarms": [alarm_to_dict(alarm) for alarm in self.alarms.values()]}
+
+    def op_save(self, request):
+        alarm = alarm_from_dict(request["alarm"])
+        previous = self.alarms.pop(alarm.id, None)
+        if previous is not None:
+            self.scheduler.remove(previous)
+        else:
+            alarm.id = None  # неизвестный id – новый будильник
+        if previous is not None and alarm.uid is None:
+            alarm.uid = previous.uid
+        self.store.save(alarm)
+        self.alarms[alarm.id] = alarm
+        self.scheduler.reindex(alarm, self.clock.now())
+        self.request_sync(SYNC_DELAY)
+        return {"ok": True, "id": alarm.id, "uid": alarm.uid, "version": alarm.version}
+
+    def op_delete(self, request):
+        alarm = self._alarm(request)
+        del self.alarms[alarm.id]
+        self._silence(alarm)
+        self.scheduler.remove(alarm)
+        self.store.delete(alarm)
+        self.request_sync(SYNC_DELAY)
+        return {"ok": True}
+
+    def op_snooze(self, request):
+        alarms = self._alarms(request)
+        self._silence(*alarms)
+        fire_dt = self.clock.now() + datetime.timedelta(minutes=request.get("minutes", self.snooze_minutes))
+        for alarm in alarms:
+            self.scheduler.schedule_once(alarm, fire_dt)
+        return {"ok": True, "at": fire_dt.isoformat()}
+
+    def op_dismiss(self, request):
+        alarms = self._alarms(request)
+        self._silence(*alarms)
+        for alarm in alarms:
+            alarm.active = False
+            self.scheduler.remove(alarm)
+        self.store.update_states(alarms)
+        self.request_sync(SYNC_DELAY)
+        return {"ok": True}
+
+    def op_states(self, request):
+        alarms = [(self._alarm(item), item) for item in request["alarms"]]
+        now = self.clock.now()
+        switched = False
+        for alarm, item in alarms:
+            alarm.last_triggered = (datetime.datetime.fromisoformat(item["last_triggered"])
+                                    if item.get("last_triggered") else None)
+            active = bool(item["active"])
+            if active == alarm.active:
+                continue
+            switched = True
+            alarm.active = active
+            if active:
+                self.scheduler.reindex(alarm, now)
+            else:
+                self._silence(alarm)
+                self.scheduler.remove(alarm)
+        self.store.update_states([alarm for alarm, _ in alarms])
+        if switched:  # время срабатывания не синхронизируется, активность – да
+            self.request_sync(SYNC_DELAY)
+        return {"ok": True}
+
+    def op_status(self, request):
+        now = self.clock.now()
+        deadline = self._next_deadline()
+        return {"ok": True, "now": now.isoformat(),
+                "week_type": week_type_on(now.date(), self.scheduler.parity_offset),
+                "next": deadline.isoformat() if deadline is not None else None}
+
+    def op_subscribe(self, request, connection):
+        if connection is None:
+            raise DaemonError("подписка возможна только через сокет")
+        connection.subscribed = True
+        return {"ok": True}
+
+
+class DaemonClient:
+    """
+    Подключение интерфейса к демону.
+    load/save/save_many/update_state/delete/delete_many/close повторяют AlarmStore,
+    поэтому приложение работает с клиентом так же, как с хранилищем.
+    """
+
+    def __init__(self, path, timeout=2):
+        self.path = path
+        self.timeout = timeout
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.sock.connect(path)
+        self._file = self.sock.makefile("rb")
+
+    @classmethod
+    def connect(cls, path, timeout=2):
+        """Клиент или None, если демон не запущен."""
+        try:
+            return cls(path, timeout)
+        except OSError:
+            return None
+
+    def close(self):
+        self._file.close()
+        self.sock.close()
+
+    def request(self, op, **fields):
+        fields["op"] = op
+        self.sock.sendall(json.dumps(fields, ensure_ascii=False).encode("utf-8") + b"\n")
+        line = self._file.readline()
+        if not line:
+            raise DaemonError("демон закрыл соединение")
+        response = json.loads(line)
+        if not response.get("ok"):
+            raise DaemonError(response.get("error", "неизвестная ошибка"))
+        return response
+
+    def load(self):
+        return [alarm_from_dict(data) for data in self.request("list")["alarms"]]
+
+    def save(self, alarm):
+        response = self.request("save", alarm=alarm_to_dict(alarm))
+        alarm.id, alarm.uid, alarm.version = response["id"], response.get("uid"), response.get("version", 0)
+
+    def save_many(self, alarms):
+        for alarm in alarms:
+            self.save(alarm)
+
+    def update_state(self, alarm):
+        self.update_states([alarm])
+
+    def update_states(self, alarms):
+        known = [alarm for alarm in alarms if alarm.id is not None]
+        self.save_many([alarm for alarm in alarms if alarm.id is None])
+        if known:
+            self.request("states", alarms=[
+                {"id": alarm.id, "active": alarm.active,
+                 "last_triggered": alarm.last_triggered.isoformat() if alarm.last_triggered else None}
+                for alarm in known])
+
+    def delete(self, alarm):
+        self.delete_many([alarm])
+
+    def delete_many(self, alarms):
+        for alarm in alarms:
+            if alarm.id is not None:
+                self.request("delete", id=alarm.id)
+            alarm.id = None
+
+    def snooze(self, alarm_ids, minutes=None):
+        """Откладывает будильники (список id) одним запросом; возвращает время нового звонка."""
+        fields = {"ids": list(alarm_ids)}
+        if minutes is not None:
+            fields["minutes"] = minutes
+        return datetime.datetime.fromisoformat(self.request("snooze", **fields)["at"])
+
+    def dismiss(self, alarm_ids):
+        """Выключает будильники (список id) одним запросом."""
+        self.request("dismiss", ids=list(alarm_ids))
+
+    def status(self):
+        return self.request("status")
+
+    def events(self):
+        """
+        Подписывается на события демона и возвращает генератор событий (блокирующее чтение).
+        Для подписки нужно отдельное подключение: этот клиент после неё запросов не принимает.
+        """
+        self.request("subscribe")
+        self.sock.settimeout(None)
+        for line in self._file:
+            yield json.loads(line)
+
+
+def _claim_socket(path):
+    """Удаляет сокет, оставшийся от упавшего демона; False, если демон уже работает."""
+    if not os.path.exists(path):
+        return True
+    probe = DaemonClient.connect(path)
+    if probe is not None:
+        probe.close()
+        return False
+    os.unlink(path)
+    return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Демон будильника без интерфейса")
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR)
+    parser.add_argument("--socket", default=None, help=f"путь сокета (по умолчанию <data-dir>/{SOCKET_NAME})")
+    parser.add_argument("--snooze", type=int, default=DEFAULT_SNOOZE_MINUTES, help="отложить на, мин")
+    parser.add_argument("--no-parity", action="store_true", help="не запрашивать чётность недели с сайта")
+    parser.add_argument("--parity-service", help="адрес общего сервиса чётности (parity_service.py) вместо сайта")
+    parser.add_argument("--sync-server", help="адрес сервера синхронизации (sync.py) для обмена с другими устройствами")
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.data_dir, exist_ok=True)
+    socket_path = args.socket or os.path.join(args.data_dir, SOCKET_NAME)
+    if not _claim_socket(socket_path):
+        print("Демон уже запущен:", socket_path)
+        return 1
+    player = SoundPlayer(os.path.join(args.data_dir, "sounds"))
+    store = AlarmStore(os.path.join(args.data_dir, "alarms.db"))
+    daemon = AlarmDaemon(store, socket_path,
+                         parity_cache=None if args.no_parity else ParityCache(
+                             os.path.join(args.data_dir, "parity_cache.json"),
+                             fetch=service_fetch(args.parity_service) if args.parity_service else None),
+                         play=player.play, stop_sound=player.stop, snooze_minutes=args.snooze,
+                         sync_client=SyncClient(store, args.sync_server) if args.sync_server else None)
+    signal.signal(signal.SIGTERM, lambda signum, frame: daemon.stop())
+    signal.signal(signal.SIGINT, lambda signum, frame: daemon.stop())
+    print("Демон будильника слушает", socket_path)
+    daemon.serve_forever()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,78 @@
+"""
+Общая основа HTTP-сервисов (parity_service.py, sync.py): ThreadingHTTPServer в фоновом потоке.
+
+Обработчик запросов наследуется от ServiceHandler и получает сервис через self.server.service;
+BackgroundHTTPServer запускает сервер в отдельном потоке (start/stop или with) либо
+в текущем (serve_forever – для запуска из командной строки).
+"""
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+JSON_TYPE = "application/json; charset=utf-8"
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # клиенты с пулом соединений не переподключаются на каждый запрос
+    disable_nagle_algorithm = True  # заголовки и тело уходят отдельно; без этого ответ ждёт ACK ~40 мс
+
+    def _reply(self, status, body, content_type=JSON_TYPE, etag=None, encoding=None):
+        """Ответ с телом body; при совпадении etag с If-None-Match – 304 без тела."""
+        if etag is not None and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        if encoding is not None:
+            self.send_header("Content-Encoding", encoding)
+        self.send_header("Content-Length", str(len(body)))
+        if etag is not None:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # при одновременном запуске класса клиенты не должны ждать повтора SYN
+
+
+class BackgroundHTTPServer:
+    def __init__(self, service, handler, host, port):
+        """
+        :param service: объект сервиса, доступный обработчику как self.server.service
+        :param handler: класс обработчика запросов (ServiceHandler)
+        :param port: 0 – любой свободный порт (см. url)
+        """
+        self.service = service
+        self._server = _Server((host, port), handler)
+        self._server.service = service
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return "http://%s:%d" % (host, port)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
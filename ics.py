@@ -0,0 +1,427 @@
+"""
+Импорт и экспорт будильников в формате iCalendar (.ics, RFC 5545).
+
+Файл читается построчно: в памяти держится только текущее событие (VEVENT), будильники
+отдаются по одному, поэтому расписания университета на тысячи событий разбираются
+без загрузки файла целиком. Будильником становится еженедельное повторяющееся событие
+(RRULE:FREQ=WEEKLY): INTERVAL=1 – каждая неделя ("любая"), INTERVAL=2 – через неделю,
+и чётность берётся по неделе первого занятия (DTSTART). Разовые и прочие события пропускаются.
+Серии, которые к моменту импорта уже закончились (прошёл UNTIL или все COUNT повторений),
+тоже пропускаются; ещё идущая серия становится бессрочным будильником – дату окончания
+будильник не хранит, и его нужно отключить самому.
+
+Экспорт пишет на каждый будильник по событию на каждое своё время звонка (дни с одинаковым
+временем – одно событие с BYDAY); поля приложения сохраняются в свойствах X-ALARMCLOCK-*,
+поэтому экспортированный файл импортируется обратно без потерь.
+
+CalendarWorker выполняет импорт и экспорт в фоновом потоке (background.BackgroundWorker).
+"""
+import collections
+import datetime
+import os
+
+from alarm_core import Alarm, PARITY_ANY, PARITY_CODES, WEEK_TYPE_NAMES, current_week_type, parity_on
+from background import BackgroundWorker
+
+BYDAY_CODES = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+MAX_LINE_OCTETS = 75
+PRODID = "-//smart-alarm-clock//alarms//RU"
+IMPORT_BATCH = 500  # столько будильников передаётся в главный поток за раз
+
+
+# Разбор
+
+def unfold(lines):
+    """Склеивает перенесённые строки (продолжение начинается с пробела или табуляции)."""
+    current = None
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if line[:1] in (" ", "\t"):
+            if current is not None:
+                current += line[1:]
+            continue
+        if current is not None:
+            yield current
+        current = line
+    if current:
+        yield current
+
+
+def parse_line(line):
+    """'DTSTART;TZID=Asia/Krasnoyarsk:20240902T083000' -> ('DTSTART', {'TZID': ...}, '20240902T083000')."""
+    position = line.find(":")
+    if position < 0:
+        raise ValueError(f"нет значения в строке {line!r}")
+    if '"' in line[:position]:  # двоеточие может стоять в кавычках внутри параметра
+        quoted = False
+        for position, char in enumerate(line):
+            if char == '"':
+                quoted = not quoted
+            elif char == ":" and not quoted:
+                break
+        else:
+            raise ValueError(f"нет значения в строке {line!r}")
+    head, value = line[:position], line[position + 1:]
+    if ";" not in head:
+        return head.upper(), {}, value
+    name, *params = head.split(";")
+    parameters = {}
+    for param in params:
+        key, _, param_value = param.partition("=")
+        parameters[key.upper()] = param_value.strip('"')
+    return name.upper(), parameters, value
+
+
+def iter_events(lines):
+    """
+    События VEVENT по одному: словарь имя свойства -> (параметры, значение).
+    Вложенные блоки (VALARM) пропускаются.
+    """
+    event = None
+    depth = 0  # вложенность блоков внутри VEVENT
+    for line in unfold(lines):
+        if not line:
+            continue
+        try:
+            name, params, value = parse_line(line)
+        except ValueError:
+            continue
+        if name == "BEGIN":
+            if event is not None:
+                depth += 1
+            elif value.upper() == "VEVENT":
+                event = {}
+        elif name == "END":
+            if depth:
+                depth -= 1
+            elif event is not None and value.upper() == "VEVENT":
+                yield event
+                event = None
+        elif event is not None and not depth:
+            event.setdefault(name, (params, value))
+
+
+def unescape_text(value):
+    if "\\" not in value:
+        return value
+    result = []
+    chars = iter(value)
+    for char in chars:
+        if char == "\\":
+            following = next(chars, "")
+            result.append("\n" if following in ("n", "N") else following)
+        else:
+            result.append(char)
+    return "".join(result)
+
+
+def escape_text(value):
+    return (value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+            .replace("\r\n", "\\n").replace("\n", "\\n"))
+
+
+def parse_datetime(params, value):
+    """Локальное время DTSTART; None для событий на весь день. Время в UTC (…Z) переводится в местное."""
+    if params.get("VALUE", "").upper() == "DATE" or "T" not in value:
+        return None
+    utc = value.endswith("Z")
+    value = value.rstrip("Z")
+    if len(value) < 15 or value[8] != "T" or not (value[:8] + value[9:15]).isdigit():
+        raise ValueError(f"неверное время {value!r}")
+    moment = datetime.datetime(int(value[:4]), int(value[4:6]), int(value[6:8]),
+                               int(value[9:11]), int(value[11:13]), int(value[13:15]))
+    if utc:
+        moment = moment.replace(tzinfo=datetime.timezone.utc).astimezone().replace(tzinfo=None)
+    # TZID не пересчитывается: считается, что календарь в поясе устройства
+    return moment
+
+
+def parse_rrule(value):
+    rule = {}
+    for part in value.split(";"):
+        key, _, part_value = part.partition("=")
+        rule[key.upper()] = part_value.upper()
+    return rule
+
+
+def parse_until(value):
+    """UNTIL правила: дата (серия идёт до конца этого дня) или время."""
+    if "T" not in value:
+        if len(value) != 8 or not value.isdigit():
+            raise ValueError(f"неверная дата {value!r}")
+        return datetime.datetime(int(value[:4]), int(value[4:6]), int(value[6:8]), 23, 59, 59)
+    return parse_datetime({}, value)
+
+
+def last_occurrence(start, weekdays, interval, count):
+    """Начало последнего из count занятий еженедельной серии (недели с понедельника, как WKST=MO)."""
+    days = sorted(set(weekdays))
+    first_week = [day for day in days if day >= start.weekday()]
+    if count <= len(first_week):
+        weeks, day = 0, first_week[count - 1]
+    else:
+        remaining = count - len(first_week)
+        weeks, day = (remaining - 1) // len(days) + 1, days[(remaining - 1) % len(days)]
+    monday = start.date() - datetime.timedelta(days=start.weekday())
+    return datetime.datetime.combine(monday + datetime.timedelta(weeks=weeks * interval, days=day), start.time())
+
+
+def alarm_from_event(event, parity_offset=None, lead_minutes=0, source=None, now=None):
+    """
+    Будильник из повторяющегося события или None, если событие не еженедельное
+    или серия к моменту now уже закончилась (UNTIL, COUNT).
+
+    :param parity_offset: сдвиг чётности (alarm_core.parity_offset_for); None – чётность
+                          недели определяется по номеру недели ISO
+    :param lead_minutes: за сколько минут до начала события звонить
+    :param now: момент импорта; по умолчанию текущее время
+    """
+    if "DTSTART" not in event or "RRULE" not in event:
+        return None
+    start = parse_datetime(*event["DTSTART"])
+    rule = parse_rrule(event["RRULE"][1])
+    if start is None or rule.get("FREQ") != "WEEKLY":
+        return None
+    interval = int(rule.get("INTERVAL", "1") or 1)
+    if interval not in (1, 2):
+        return None
+    # BYDAY в еженедельном правиле – список дней; числовые префиксы (1MO) бывают только в ежемесячных
+    weekdays = [BYDAY_CODES.index(code[-2:]) for code in rule.get("BYDAY", "").split(",")
+                if code[-2:] in BYDAY_CODES] or [start.weekday()]
+    now = now if now is not None else datetime.datetime.now()
+    if "UNTIL" in rule and parse_until(rule["UNTIL"]) < now:
+        return None
+    if "COUNT" in rule:
+        count = int(rule["COUNT"])
+        if count < 1 or last_occurrence(start, weekdays, interval, count) < now:
+            return None
+
+    fire = start - datetime.timedelta(minutes=lead_minutes)
+    shift = (fire.date() - start.date()).days  # звонок накануне, если занятие рано утром
+    minute = fire.hour * 60 + fire.minute
+    day_mask = 0
+    minutes = [0] * 7
+    for weekday in weekdays:
+        weekday = (weekday + shift) % 7
+        day_mask |= 1 << weekday
+        minutes[weekday] = minute
+
+    extra = {name: unescape_text(value) for name, (params, value) in event.items() if name.startswith("X-ALARMCLOCK-")}
+    if "X-ALARMCLOCK-WEEK-TYPE" in extra and extra["X-ALARMCLOCK-WEEK-TYPE"] in PARITY_CODES:
+        parity = PARITY_CODES[extra["X-ALARMCLOCK-WEEK-TYPE"]]
+    elif interval == 1:
+        parity = PARITY_ANY
+    elif parity_offset is not None:
+        parity = parity_on(fire.date(), parity_offset)
+    else:
+        parity = PARITY_CODES[current_week_type(fire.date())]
+
+    alarm = Alarm.compact(day_mask, minutes, parity, active=extra.get("X-ALARMCLOCK-ACTIVE", "TRUE") != "FALSE",
+                          source=extra.get("X-ALARMCLOCK-SOURCE") or source)
+    if "X-ALARMCLOCK-SOUND" in extra:
+        alarm.sound = extra["X-ALARMCLOCK-SOUND"]
+        alarm.sound_name = extra.get("X-ALARMCLOCK-SOUND-NAME", os.path.basename(alarm.sound))
+    return alarm
+
+
+def read_alarms(lines, parity_offset=None, lead_minutes=0, source=None, stats=None, now=None):
+    """
+    Будильники из строк календаря по одному (генератор).
+    Идущие подряд события с одинаковым X-ALARMCLOCK-ID (экспорт одного будильника) собираются в один.
+
+    :param stats: collections.Counter – сюда добавляются числа imported и skipped
+    """
+    stats = stats if stats is not None else collections.Counter()
+    pending, pending_key = None, None
+    for event in iter_events(lines):
+        try:
+            alarm = alarm_from_event(event, parity_offset, lead_minutes, source, now)
+        except ValueError:
+            alarm = None  # испорченное время или правило – событие пропускается
+        if alarm is None:
+            stats["skipped"] += 1
+            continue
+        key = event.get("X-ALARMCLOCK-ID", (None, None))[1]
+        if pending is not None and key is not None and key == pending_key:
+            for weekday in range(7):
+                if alarm.day_mask & (1 << weekday):
+                    pending.minutes[weekday] = alarm.minutes[weekday]
+            pending.day_mask |= alarm.day_mask
+            continue
+        if pending is not None:
+            stats["imported"] += 1
+            yield pending
+        pending, pending_key = alarm, key
+    if pending is not None:
+        stats["imported"] += 1
+        yield pending
+
+
+# Запись
+
+def fold(line):
+    """Переносит строку длиннее 75 октетов (продолжение начинается с пробела); CRLF в конце."""
+    encoded = line.encode("utf-8")
+    if len(encoded) <= MAX_LINE_OCTETS:
+        return line + "\r\n"
+    parts = []
+    limit = MAX_LINE_OCTETS
+    while encoded:
+        cut = min(limit, len(encoded))
+        while cut < len(encoded) and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1  # не разрезаем многобайтовый символ UTF-8
+        parts.append(encoded[:cut].decode("utf-8"))
+        encoded = encoded[cut:]
+        limit = MAX_LINE_OCTETS - 1  # с учётом пробела в начале продолжения
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def anchor_week(alarm, reference, parity_offset):
+    """Понедельник недели не раньше недели reference, чётность которой подходит будильнику."""
+    monday = reference - datetime.timedelta(days=reference.weekday())
+    if alarm.parity == PARITY_ANY:
+        return monday
+    for candidate in (monday, monday + datetime.timedelta(weeks=1)):
+        if parity_offset is not None:
+            matches = parity_on(candidate, parity_offset) == alarm.parity
+        else:
+            matches = current_week_type(candidate) == WEEK_TYPE_NAMES[alarm.parity]
+        if matches:
+            return candidate
+    return monday
+
+
+def alarm_events(alarm, key, reference, parity_offset=None, stamp=None):
+    """Строки VEVENT будильника: по событию на каждое время звонка."""
+    stamp = stamp or datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    monday = anchor_week(alarm, reference, parity_offset)
+    by_minute = collections.defaultdict(list)
+    for weekday in range(7):
+        if alarm.day_mask & (1 << weekday):
+            by_minute[alarm.minutes[weekday]].append(weekday)
+    interval = 1 if alarm.parity == PARITY_ANY else 2
+    for minute, weekdays in sorted(by_minute.items()):
+        start = datetime.datetime.combine(monday + datetime.timedelta(days=weekdays[0]),
+                                          datetime.time(minute // 60, minute % 60))
+        lines = [
+            "BEGIN:VEVENT",
+            f"UID:alarm-{key}-{minute:04d}@smart-alarm-clock",
+            f"DTSTAMP:{stamp}",
+            f"DTSTART:{start:%Y%m%dT%H%M%S}",
+            f"RRULE:FREQ=WEEKLY;INTERVAL={interval};BYDAY=" + ",".join(BYDAY_CODES[day] for day in weekdays),
+            "SUMMARY:" + escape_text("Будильник"),
+            f"X-ALARMCLOCK-ID:{key}",
+            "X-ALARMCLOCK-WEEK-TYPE:" + escape_text(alarm.week_type),
+            "X-ALARMCLOCK-ACTIVE:" + ("TRUE" if alarm.active else "FALSE"),
+            "X-ALARMCLOCK-SOUND:" + escape_text(alarm.sound),
+            "X-ALARMCLOCK-SOUND-NAME:" + escape_text(alarm.sound_name),
+        ]
+        if alarm.source:
+            lines.append("X-ALARMCLOCK-SOURCE:" + escape_text(alarm.source))
+        lines.append("END:VEVENT")
+        yield from lines
+
+
+def write_alarms(alarms, out, parity_offset=None, reference=None, on_alarm=None):
+    """
+    Пишет будильники в открытый текстовый файл out (newline="" – переводы строк CRLF по RFC 5545).
+
+    :param reference: дата, от недели которой отсчитываются DTSTART (по умолчанию сегодня)
+    :param on_alarm: on_alarm(номер) – вызывается после каждого будильника (для хода работы)
+    """
+    reference = reference or datetime.date.today()
+    stamp = datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    out.write(fold("BEGIN:VCALENDAR") + fold("VERSION:2.0") + fold("PRODID:" + PRODID) + fold("CALSCALE:GREGORIAN"))
+    written = 0
+    for number, alarm in enumerate(alarms):
+        if not alarm.day_mask:
+            continue
+        key = alarm.id if alarm.id is not None else f"n{number}"
+        out.write("".join(fold(line) for line in alarm_events(alarm, key, reference, parity_offset, stamp)))
+        written += 1
+        if on_alarm is not None:
+            on_alarm(number + 1)
+    out.write(fold("END:VCALENDAR"))
+    return written
+
+
+# Фоновая работа
+
+class CalendarWorker(BackgroundWorker):
+    """Импорт и экспорт в фоновом потоке; обработчики вызываются через post (см. background.py)."""
+
+    def __init__(self, post=None):
+        super().__init__(post, name="calendar")
+
+    def import_file(self, path, on_batch, on_progress=None, on_done=None, batch_size=IMPORT_BATCH, **options):
+        """
+        Читает path и передаёт будильники пачками: on_batch(список); on_progress(доля 0..1);
+        on_done(stats) – stats содержит imported, skipped и error (текст ошибки или None).
+        options – параметры read_alarms (parity_offset, lead_minutes, source, now).
+        """
+        self._cancelled.clear()
+        return self._executor.submit(self._import, path, on_batch, on_progress, on_done, batch_size, options)
+
+    def _import(self, path, on_batch, on_progress, on_done, batch_size, options):
+        stats = collections.Counter()
+        error = None
+        try:
+            progress = self.progress(on_progress, os.path.getsize(path))
+            read = [0]
+
+            def lines(f):
+                for raw in f:
+                    read[0] += len(raw)
+                    yield raw.decode("utf-8", errors="replace")
+
+            with open(path, "rb") as f:
+                batch = []
+                for alarm in read_alarms(lines(f), stats=stats, **options):
+                    if self._cancelled.is_set():
+                        error = "отменено"
+                        break
+                    batch.append(alarm)
+                    if len(batch) >= batch_size:
+                        self.post(on_batch, batch)
+                        batch = []
+                        progress.set(read[0])
+                if batch:
+                    self.post(on_batch, batch)
+            progress.finish()
+        except (OSError, ValueError) as e:
+            error = str(e)
+        if on_done is not None:
+            self.post(on_done, {"imported": stats["imported"], "skipped": stats["skipped"], "error": error})
+
+    def export_file(self, path, alarms, on_progress=None, on_done=None, **options):
+        """
+        Пишет будильники в path (через временный файл); on_done(stats) – exported и error.
+        alarms лучше передавать копией списка: он читается в фоновом потоке.
+        """
+        self._cancelled.clear()
+        return self._executor.submit(self._export, path, list(alarms), on_progress, on_done, options)
+
+    def _export(self, path, alarms, on_progress, on_done, options):
+        written = 0
+        error = None
+        progress = self.progress(on_progress, len(alarms))
+
+        def on_alarm(number):
+            if self._cancelled.is_set():
+                raise InterruptedError("отменено")
+            progress.set(number)
+
+        try:
+            with open(path + ".tmp", "w", encoding="utf-8", newline="") as out:
+                written = write_alarms(alarms, out, on_alarm=on_alarm, **options)
+            os.replace(path + ".tmp", path)
+            progress.finish()
+        except (OSError, InterruptedError) as e:
+            error = str(e)
+            written = 0
+            try:
+                os.unlink(path + ".tmp")
+            except OSError:
+                pass
+        if on_done is not None:
+            self.post(on_done, {"exported": written, "error": error})
@@ -0,0 +1,98 @@
+"""
+Замер времени импорта модулей в формате `python -X importtime`.
+
+Включается флагом --import-profile у main.py: install() вызывается до импорта Kivy,
+а отчёт печатается после первого кадра. Время считается по exec_module загрузчика,
+поэтому уже импортированные модули отчёт не раздувают.
+"""
+import sys
+import threading
+import time
+from importlib.abc import MetaPathFinder
+
+
+class _TimedLoader:
+    def __init__(self, loader, profiler, name):
+        self._loader = loader
+        self._profiler = profiler
+        self._name = name
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        self._profiler._enter()
+        start = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler._exit(self._name, start)
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+
+class ImportProfiler(MetaPathFinder):
+    def __init__(self):
+        self.records = []  # (вложенность, модуль, собственное время, суммарное время) в микросекундах
+        self._local = threading.local()  # у каждого потока свой стек вложенных импортов
+
+    def find_spec(self, fullname, path, target=None):
+        if getattr(self._local, "finding", False):
+            return None
+        self._local.finding = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                        spec.loader = _TimedLoader(spec.loader, self, fullname)
+                    return spec
+            return None
+        finally:
+            self._local.finding = False
+
+    def _stack(self):
+        # Время вложенных импортов для каждого открытого уровня
+        if not hasattr(self._local, "children"):
+            self._local.children = []
+        return self._local.children
+
+    def _enter(self):
+        self._stack().append(0.0)
+
+    def _exit(self, name, start):
+        elapsed = time.perf_counter() - start
+        stack = self._stack()
+        children = stack.pop()
+        if stack:
+            stack[-1] += elapsed
+        self.records.append((len(stack), name, int((elapsed - children) * 1e6), int(elapsed * 1e6)))
+
+    def format_report(self, top=None):
+        """Отчёт как у -X importtime; при top – только top самых долгих модулей верхнего уровня."""
+        lines = ["import time: self [us] | cumulative | imported package"]
+        records = self.records
+        if top is not None:
+            records = sorted((r for r in records if r[0] == 0), key=lambda r: r[3], reverse=True)[:top]
+        for depth, name, self_us, cumulative_us in records:
+            lines.append(f"import time: {self_us:>9} | {cumulative_us:>10} | {'  ' * depth}{name}")
+        return "\n".join(lines)
+
+
+_profiler = None
+
+
+def install():
+    global _profiler
+    if _profiler is None:
+        _profiler = ImportProfiler()
+        sys.meta_path.insert(0, _profiler)
+    return _profiler
+
+
+def report(file=None, top=None):
+    if _profiler is not None:
+        print(_profiler.format_report(top), file=file if file is not None else sys.stderr)
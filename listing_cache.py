@@ -0,0 +1,61 @@
+"""
+Кэш содержимого каталогов для окна выбора файла.
+
+Каталог перечитывается только если изменилось его время модификации; признак
+"каталог или файл" берётся из того же os.scandir, без отдельного stat на каждый файл.
+Модуль импортирует Kivy (kivy.uix.filechooser), поэтому подключается при первом открытии окна.
+"""
+import os
+from collections import OrderedDict
+
+from kivy.uix.filechooser import FileSystemLocal
+
+# Сколько каталогов держать в кэше
+DEFAULT_MAX_DIRECTORIES = 32
+
+
+class CachedFileSystem(FileSystemLocal):
+    def __init__(self, maxsize=DEFAULT_MAX_DIRECTORIES):
+        self.maxsize = maxsize
+        self._listings = OrderedDict()  # каталог -> (st_mtime_ns, имена, имена подкаталогов)
+
+    def _mtime(self, path):
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def is_stale(self, path):
+        """True, если каталог ещё не читался или изменился после последнего чтения."""
+        path = os.path.normpath(path)
+        cached = self._listings.get(path)
+        return cached is None or cached[0] != self._mtime(path)
+
+    def listdir(self, fn):
+        path = os.path.normpath(fn)
+        mtime = self._mtime(path)
+        cached = self._listings.get(path)
+        if cached is not None and cached[0] == mtime:
+            self._listings.move_to_end(path)
+            return list(cached[1])
+        names = []
+        dirs = set()
+        with os.scandir(path) as entries:
+            for entry in entries:
+                names.append(entry.name)
+                try:
+                    if entry.is_dir():
+                        dirs.add(entry.name)
+                except OSError:
+                    pass
+        self._listings[path] = (mtime, names, dirs)
+        while len(self._listings) > self.maxsize:
+            self._listings.popitem(last=False)
+        return list(names)
+
+    def is_dir(self, fn):
+        parent, name = os.path.split(os.path.normpath(fn))
+        cached = self._listings.get(parent)
+        if cached is not None and name in cached[1]:
+            return name in cached[2]
+        return super().is_dir(fn)
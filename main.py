@@ -1,71 +1,86 @@
+import sys
+import time
+
+STARTUP_STARTED = time.perf_counter()
+
+# Флаги приложения убираются из argv до импорта Kivy, который разбирает argv сам
+IMPORT_PROFILE = "--import-profile" in sys.argv  # отчёт о времени импортов в формате -X importtime
+STARTUP_BENCHMARK = "--startup-benchmark" in sys.argv  # замер времени до первого кадра и выход
+COLLECT_METRICS = "--metrics" in sys.argv  # сбор метрик с самого запуска (иначе включается на экране диагностики)
+sys.argv = [arg for arg in sys.argv if arg not in ("--import-profile", "--startup-benchmark", "--metrics")]
+if IMPORT_PROFILE:
+    import importprofile
+    importprofile.install()
+
 import datetime
+import json
+import os
+import threading
 from kivy.clock import Clock
-from kivy.properties import ListProperty, NumericProperty, BooleanProperty
+from kivy.properties import ListProperty, NumericProperty, BooleanProperty, ObjectProperty, StringProperty
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.button import Button
 from kivy.uix.checkbox import CheckBox
 from kivy.uix.label import Label
 from kivy.uix.popup import Popup
+from kivy.uix.recycleboxlayout import RecycleBoxLayout
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
 from kivy.uix.screenmanager import Screen, ScreenManager
-from kivy.uix.scrollview import ScrollView
-from plyer import notification
-from parser import fetch_week_parity
+from alarm_core import Alarm, DAYS_OF_WEEK, parity_offset_for, week_type_on
+from alarm_index import AlarmIndex, parse_query
+from clocks import SystemClock
+from daemon import SOCKET_NAME, DaemonClient, DaemonError, fired_message
+from metrics import Metrics, format_snapshot
+from parity_cache import ParityCache
+from parity_worker import ParityFetcher
+from parser import DEFAULT_GROUP
+from timetable import DEFAULT_LEAD_MINUTES, TimetableCache, generate_alarms
+from scheduler import AlarmScheduler
+from sounds import SoundCache
+from storage import AlarmStore
 
 from kivymd.app import MDApp
 from kivymd.uix.button import MDFloatingActionButton, MDIconButton
 from kivymd.uix.card import MDCard
 from kivymd.uix.label import MDLabel
-from kivymd.uix.pickers import MDTimePicker
 from kivymd.uix.toolbar import MDTopAppBar
 from kivymd.uix.menu import MDDropdownMenu
 from kivymd.uix.selectioncontrol import MDCheckbox
-from kivy.uix.filechooser import FileChooserListView
-from kivy.uix.modalview import ModalView
 from kivymd.uix.button import MDRaisedButton
 from kivy.uix.spinner import Spinner, SpinnerOption
-from kivy.core.audio import SoundLoader
+# Окно выбора времени, выбор файла, звук, уведомления и сеть (requests, bs4) импортируются при первом использовании
 
-# Список дней недели (на русском)
-DAYS_OF_WEEK = ["Понедельник", "Вторник", "Среда", "Четверг", "Пятница", "Суббота", "Воскресенье"]
+STARTUP_IMPORTED = time.perf_counter()
 
 # Предустановленные звуки (название и путь к файлу)
 AVAILABLE_SOUNDS = [
-    {"name": "Beep", "file": "sounds/beep.mp3"},
-    {"name": "Chime", "file": "sounds/chime.mp3"},
-    {"name": "Melody", "file": "sounds/melody.mp3"},
+    {"name": "Beep", "file": "Sounds/Beep.mp3"},
+    {"name": "Chime", "file": "Sounds/Chime.mp3"},
+    {"name": "Melody", "file": "Sounds/Melody.mp3"},
 ]
 
-# Класс будильника
-class Alarm:
-    def __init__(self, schedule=None, week_type="любая", active=True, sound="sounds/beep.mp3", sound_name="Beep"):
-        """
-        :param schedule: словарь, где ключ – день недели (str), а значение – объект datetime.time
-        :param week_type: "любая", "чётная" или "нечётная"
-        :param active: активен ли будильник
-        :param sound: путь к звуковому файлу
-        :param sound_name: отображаемое название звука
-        """
-        self.schedule = schedule if schedule is not None else {}
-        self.week_type = week_type
-        self.active = active
-        self.last_triggered = None  # время последнего срабатывания
-        self.sound = sound
-        self.sound_name = sound_name
-
-    def __str__(self):
-        if not self.schedule:
-            schedule_str = "Нет дней"
-        else:
-            schedule_str = ", ".join([f"{day}: {time.strftime('%H:%M')}" for day, time in self.schedule.items()])
-        return f"{schedule_str} (Неделя: {self.week_type}, Звук: {self.sound_name})"
+# Представления списка будильников на главном экране
+ALARM_VIEWS = ["Все", "Сегодня", "Эта неделя", "Ближайшие 24 ч"]
+DAY_ABBREVIATIONS = ["Пн", "Вт", "Ср", "Чт", "Пт", "Сб", "Вс"]
+FILTER_DELAY = 0.2  # пауза после ввода в строке поиска перед обновлением списка, с
 
-# Для справки: определение чётности недели по системной дате
-def is_even_week():
-    week_number = datetime.date.today().isocalendar()[1]
-    return week_number % 2 == 0
+def load_sound(path):
+    # Аудиоподсистема Kivy инициализируется только при первой загрузке звука
+    from kivy.core.audio import SoundLoader
+    return SoundLoader.load(path)
 
-def current_week_type():
-    return "чётная" if is_even_week() else "нечётная"
+# Максимальный интервал между проверками: страхует от перевода системных часов и сна устройства
+MAX_ALARM_SLEEP = 300
+# Общий сервис чётности (parity_service.py), например http://192.168.0.10:8765; пусто – напрямую с сайта
+PARITY_SERVICE_URL = os.environ.get("ALARMCLOCK_PARITY_SERVICE", "")
+# Сервер синхронизации между устройствами (sync.py), например http://192.168.0.10:8766; пусто – без синхронизации
+SYNC_SERVER_URL = os.environ.get("ALARMCLOCK_SYNC_SERVER", "")
+# Как часто синхронизироваться и через сколько секунд после изменения (правки подряд уходят одним запросом)
+SYNC_INTERVAL = 60
+SYNC_DELAY = 2
+# За сколько секунд до срабатывания загружать звук ближайшего будильника
+SOUND_PRELOAD_AHEAD = 60
 
 class SmallSpinnerOption(SpinnerOption):
     def __init__(self, **kwargs):
@@ -73,6 +88,195 @@ class SmallSpinnerOption(SpinnerOption):
         self.height = 30  # меньшая высота
         self.font_size = "16sp"
 
+# Строка списка будильников: виджеты создаются только для видимых строк и переиспользуются RecycleView
+class AlarmRow(RecycleDataViewBehavior, BoxLayout):
+    text = StringProperty("")
+    alarm = ObjectProperty(None, allownone=True)
+
+    def __init__(self, **kwargs):
+        super(AlarmRow, self).__init__(orientation='horizontal', spacing=10, **kwargs)
+        self.index = 0
+        self.label = Label(size_hint=(0.6, 1))
+        self.bind(text=self.label.setter("text"))
+        edit_btn = Button(text="Редактировать", size_hint=(0.2, 1))
+        edit_btn.bind(on_release=lambda instance: MDApp.get_running_app().main_screen.edit_alarm(self.index))
+        del_btn = Button(text="Удалить", size_hint=(0.2, 1))
+        del_btn.bind(on_release=lambda instance: MDApp.get_running_app().main_screen.delete_alarm(self.index))
+        self.add_widget(self.label)
+        self.add_widget(edit_btn)
+        self.add_widget(del_btn)
+
+    def refresh_view_attrs(self, rv, index, data):
+        self.index = index
+        return super(AlarmRow, self).refresh_view_attrs(rv, index, data)
+
+# Менеджер экранов, который строит экран при первом переходе на него
+class LazyScreenManager(ScreenManager):
+    def __init__(self, **kwargs):
+        super(LazyScreenManager, self).__init__(**kwargs)
+        self._factories = {}  # имя экрана -> функция, создающая экран
+
+    def register(self, name, factory):
+        self._factories[name] = factory
+
+    def get_screen(self, name):
+        factory = self._factories.pop(name, None)
+        if factory is not None:
+            self.add_widget(factory(name=name))
+        return super(LazyScreenManager, self).get_screen(name)
+
+    def has_screen(self, name):
+        return name in self._factories or super(LazyScreenManager, self).has_screen(name)
+
+# Закрытые окна не уничтожаются, а возвращаются в пул; при следующем показе меняется только содержимое
+class PopupPool:
+    def __init__(self):
+        self._free = {}  # функция, создающая окно -> закрытые окна
+
+    def acquire(self, factory):
+        free = self._free.setdefault(factory, [])
+        if free:
+            return free.pop()
+        popup = factory()
+        popup.bind(on_dismiss=lambda instance: self._release(factory, instance))
+        return popup
+
+    def _release(self, factory, popup):
+        free = self._free[factory]
+        if popup not in free:
+            free.append(popup)
+
+class ErrorPopup(Popup):
+    def __init__(self, **kwargs):
+        self.message = Label()
+        super(ErrorPopup, self).__init__(title="Ошибка", content=self.message, size_hint=(0.8, 0.3), **kwargs)
+
+# Строка окна сработавших будильников
+class FiredAlarmRow(RecycleDataViewBehavior, BoxLayout):
+    text = StringProperty("")
+
+    def __init__(self, **kwargs):
+        super(FiredAlarmRow, self).__init__(orientation='horizontal', spacing=10, **kwargs)
+        self.index = 0
+        self.popup = None
+        self.label = Label(size_hint=(0.6, 1))
+        self.bind(text=self.label.setter("text"))
+        snooze_btn = Button(text="Отложить", size_hint=(0.2, 1))
+        snooze_btn.bind(on_release=lambda instance: self.popup.choose(self.index, self.popup.snooze_action))
+        dismiss_btn = Button(text="Отключить", size_hint=(0.2, 1))
+        dismiss_btn.bind(on_release=lambda instance: self.popup.choose(self.index, self.popup.dismiss_action))
+        self.add_widget(self.label)
+        self.add_widget(snooze_btn)
+        self.add_widget(dismiss_btn)
+
+    def refresh_view_attrs(self, rv, index, data):
+        self.index = index
+        self.popup = rv.popup
+        return super(FiredAlarmRow, self).refresh_view_attrs(rv, index, data)
+
+# Окно сработавших будильников: все, что наступили вместе или пока окно открыто, – одним списком.
+# snooze_action(alarms) и dismiss_action(alarms) задаются при показе; on_empty – когда список опустел
+class AlarmPopup(Popup):
+    def __init__(self, **kwargs):
+        content = BoxLayout(orientation='vertical', spacing=10, padding=10)
+        self.message = Label(text="Будильник сработал!", size_hint=(1, None), height=30)
+        content.add_widget(self.message)
+        # Строк может быть сотни (все будильники группы на одно время) – виджеты только для видимых
+        self.alarm_list = RecycleView(size_hint=(1, 1))
+        alarm_list_layout = RecycleBoxLayout(orientation='vertical', spacing=5, size_hint_y=None,
+                                             default_size=(None, 40), default_size_hint=(1, None))
+        alarm_list_layout.bind(minimum_height=alarm_list_layout.setter("height"))
+        self.alarm_list.add_widget(alarm_list_layout)
+        self.alarm_list.viewclass = FiredAlarmRow
+        self.alarm_list.popup = self
+        content.add_widget(self.alarm_list)
+        button_layout = BoxLayout(orientation='horizontal', spacing=10, size_hint=(1, None), height=40)
+        snooze_button = Button(text="Отложить все")
+        dismiss_button = Button(text="Отключить все")
+        button_layout.add_widget(snooze_button)
+        button_layout.add_widget(dismiss_button)
+        content.add_widget(button_layout)
+        super(AlarmPopup, self).__init__(title="Будильник", content=content, size_hint=(0.9, 0.7),
+                                         auto_dismiss=False, **kwargs)
+        self.alarms = []
+        self.snooze_action = None
+        self.dismiss_action = None
+        self.on_empty = None
+        snooze_button.bind(on_release=lambda instance: self.choose_all(self.snooze_action))
+        dismiss_button.bind(on_release=lambda instance: self.choose_all(self.dismiss_action))
+
+    def add(self, alarms):
+        listed = set(self.alarms)
+        new = [alarm for alarm in alarms if alarm not in listed]
+        self.alarms.extend(new)
+        self.alarm_list.data.extend({"text": str(alarm)} for alarm in new)
+        self._update_message()
+
+    def _update_message(self):
+        count = len(self.alarms)
+        self.message.text = "Будильник сработал!" if count == 1 else f"Сработало будильников: {count}"
+
+    def choose(self, index, action):
+        alarm = self.alarms.pop(index)
+        del self.alarm_list.data[index]
+        self._update_message()
+        if not self.alarms:
+            self._close()
+        if action is not None:
+            action([alarm])
+
+    def choose_all(self, action):
+        alarms, self.alarms = self.alarms, []
+        self.alarm_list.data = []
+        self._close()
+        if action is not None and alarms:
+            action(alarms)
+
+    def _close(self):
+        on_empty = self.on_empty
+        self.snooze_action = self.dismiss_action = self.on_empty = None
+        self.dismiss()
+        if on_empty is not None:
+            on_empty()
+
+# Ход долгой фоновой операции (импорт, экспорт); cancel_action вызывается кнопкой "Отмена"
+class ProgressPopup(Popup):
+    def __init__(self, **kwargs):
+        from kivy.uix.progressbar import ProgressBar
+        content = BoxLayout(orientation='vertical', spacing=10, padding=10)
+        self.message = Label()
+        self.progress = ProgressBar(max=1, size_hint=(1, None), height=30)
+        self.button = Button(text="Отмена", size_hint=(1, None), height=40)
+        self.button.bind(on_release=self._on_button)
+        content.add_widget(self.message)
+        content.add_widget(self.progress)
+        content.add_widget(self.button)
+        super(ProgressPopup, self).__init__(content=content, size_hint=(0.8, 0.4), auto_dismiss=False, **kwargs)
+        self.cancel_action = None
+
+    def start(self, title, message, cancel_action):
+        self.title = title
+        self.message.text = message
+        self.progress.value = 0
+        self.button.text = "Отмена"
+        self.cancel_action = cancel_action
+        self.open()
+
+    def set_progress(self, fraction):
+        self.progress.value = fraction
+
+    def finish(self, message):
+        self.message.text = message
+        self.progress.value = 1
+        self.button.text = "Закрыть"
+        self.cancel_action = None
+
+    def _on_button(self, instance):
+        if self.cancel_action is not None:
+            self.cancel_action()
+        self.cancel_action = None
+        self.dismiss()
+
 # Экран со списком будильников с современным интерфейсом
 class MainScreen(Screen):
     def __init__(self, **kwargs):
@@ -87,7 +291,7 @@ class MainScreen(Screen):
         self.layout.add_widget(self.toolbar)
 
         # Надпись с информацией о текущей неделе
-        self.week_label = MDLabel(text=f"Сейчас идёт {current_week_type()} неделя",
+        self.week_label = MDLabel(text="Чётность недели уточняется…",
                                    halign="center", font_style="H6",
                                    size_hint=(1, None), height=40)
         self.layout.add_widget(self.week_label)
@@ -98,12 +302,29 @@ class MainScreen(Screen):
                                    size_hint=(1, None), height=30)
         self.layout.add_widget(self.empty_label)
 
-        # Контейнер для списка будильников в ScrollView
-        self.alarm_list_scroll = ScrollView(size_hint=(1, 1))
-        self.alarm_list_box = BoxLayout(orientation='vertical', spacing=10, size_hint_y=None)
-        self.alarm_list_box.bind(minimum_height=self.alarm_list_box.setter("height"))
-        self.alarm_list_scroll.add_widget(self.alarm_list_box)
-        self.layout.add_widget(self.alarm_list_scroll)
+        # Строка поиска и выбор представления: список строится по индексу будильников (alarm_index.py)
+        from kivy.uix.textinput import TextInput
+        filter_bar = BoxLayout(orientation='horizontal', size_hint=(1, None), height=40, spacing=10)
+        self.search_input = TextInput(hint_text="Поиск: пн 7:00-9:00 чётная вкл звук:beep", multiline=False,
+                                      size_hint=(0.65, 1))
+        self.view_spinner = Spinner(text=ALARM_VIEWS[0], values=ALARM_VIEWS, size_hint=(0.35, 1),
+                                    option_cls=SmallSpinnerOption)
+        self._filter_trigger = Clock.create_trigger(lambda dt: self.update_alarm_list(), FILTER_DELAY)
+        self.search_input.bind(text=lambda instance, text: self._filter_trigger())
+        self.view_spinner.bind(text=lambda instance, text: self.update_alarm_list())
+        filter_bar.add_widget(self.search_input)
+        filter_bar.add_widget(self.view_spinner)
+        self.layout.add_widget(filter_bar)
+
+        # Список будильников: RecycleView по модели данных rv.data (по словарю {"text", "alarm"} на строку)
+        self.alarm_list = RecycleView(size_hint=(1, 1))
+        alarm_list_layout = RecycleBoxLayout(orientation='vertical', spacing=10, size_hint_y=None,
+                                             default_size=(None, 40), default_size_hint=(1, None))
+        alarm_list_layout.bind(minimum_height=alarm_list_layout.setter("height"))
+        self.alarm_list.add_widget(alarm_list_layout)
+        # viewclass задаётся после добавления layout: до этого RecycleView его не сохраняет
+        self.alarm_list.viewclass = AlarmRow
+        self.layout.add_widget(self.alarm_list)
 
         # Нижняя панель с полупрозрачным фоном и плавающей кнопкой "+"
         self.bottom_container = MDCard(size_hint=(1, None), height=80, radius=[20, 20, 20, 20],
@@ -120,10 +341,10 @@ class MainScreen(Screen):
         # Инициализация выпадающего меню
         self.menu_items = [{
             "viewclass": "OneLineListItem",
-            "text": "Настройки",
+            "text": text,
             "height": 56,
-            "on_release": lambda: self.menu_callback("Настройки")
-        }]
+            "on_release": lambda text=text: self.menu_callback(text)
+        } for text in ("Настройки", "Диагностика", "Импорт .ics", "Экспорт .ics")]
         self.menu = MDDropdownMenu(caller=self.toolbar.ids.right_actions, items=self.menu_items, width_mult=4)
 
     def open_menu(self, instance):
@@ -134,6 +355,12 @@ class MainScreen(Screen):
         self.menu.dismiss()
         if text_item == "Настройки":
             MDApp.get_running_app().sm.current = "settings"
+        elif text_item == "Диагностика":
+            MDApp.get_running_app().sm.current = "diagnostics"
+        elif text_item == "Импорт .ics":
+            MDApp.get_running_app().open_calendar_import()
+        elif text_item == "Экспорт .ics":
+            MDApp.get_running_app().export_calendar()
 
     def go_to_add_alarm(self, instance):
         app = MDApp.get_running_app()
@@ -141,35 +368,104 @@ class MainScreen(Screen):
         edit_screen.alarm_index = None
         app.sm.current = "edit"
 
+    @property
+    def filtered(self):
+        # Без фильтра строки списка совпадают с app.alarms по порядку и обновляются по одной
+        return bool(self.search_input.text.strip()) or self.view_spinner.text != ALARM_VIEWS[0]
+
+    def rows(self):
+        """Строки списка для текущего запроса и представления – из индекса, без перебора всех будильников."""
+        app = MDApp.get_running_app()
+        index = app.alarm_index
+        criteria = parse_query(self.search_input.text)
+        view = self.view_spinner.text
+        if view == ALARM_VIEWS[0]:
+            return [{"text": index.text(alarm), "alarm": alarm} for alarm in index.query(**criteria)]
+        within = index.select(**criteria) if criteria else None
+        parity_offset = app.scheduler.parity_offset
+        if view == ALARM_VIEWS[1]:
+            return [{"text": f"{minute // 60:02d}:{minute % 60:02d} · {index.text(alarm)}", "alarm": alarm}
+                    for minute, alarm in index.today(app.clock.today(), parity_offset, within)]
+        if view == ALARM_VIEWS[2]:
+            return [{"text": index.text(alarm), "alarm": alarm}
+                    for alarm in index.this_parity(app.clock.today(), parity_offset, within)]
+        upcoming = index.next_hours(app.clock.now(), parity_offset, pending=app.scheduler.pending_once(),
+                                    within=within)
+        return [{"text": f"{DAY_ABBREVIATIONS[at.weekday()]} {at:%H:%M} · {index.text(alarm)}", "alarm": alarm}
+                for at, alarm in upcoming]
+
     def update_alarm_list(self):
-        self.alarm_list_box.clear_widgets()
+        # Полная перестройка модели данных – после загрузки, массовых изменений и смены фильтра
         app = MDApp.get_running_app()
-        self.week_label.text = f"Сейчас идёт {app.current_week} неделя"
-        if not app.alarms:
-            self.empty_label.opacity = 1
-        else:
-            self.empty_label.opacity = 0
-            for idx, alarm in enumerate(app.alarms):
-                box = BoxLayout(orientation='horizontal', size_hint_y=None, height=40, spacing=10)
-                box.add_widget(Label(text=str(alarm), size_hint=(0.6, 1)))
-                edit_btn = Button(text="Редактировать", size_hint=(0.2, 1))
-                edit_btn.bind(on_release=lambda instance, i=idx: self.edit_alarm(i))
-                del_btn = Button(text="Удалить", size_hint=(0.2, 1))
-                del_btn.bind(on_release=lambda instance, i=idx: self.delete_alarm(i))
-                box.add_widget(edit_btn)
-                box.add_widget(del_btn)
-                self.alarm_list_box.add_widget(box)
+        started = time.perf_counter()
+        self.week_label.text = app.week_label_text()
+        self.alarm_list.data = self.rows()
+        self.update_empty_label()
+        if app.metrics.enabled:
+            # Обычно строки перестраиваются перед следующим кадром; при замере – сразу, чтобы учесть и их
+            self.alarm_list.refresh_views()
+            app.metrics.since("update_alarm_list_ms", started)
+
+    def update_empty_label(self):
+        self.empty_label.text = "Ничего не найдено" if self.filtered else "Добавьте свой первый будильник!"
+        self.empty_label.opacity = 0 if self.alarm_list.data else 1
+
+    def schedule_changed(self):
+        # Представления по времени зависят от часов, чётности и отложенных звонков
+        if self.view_spinner.text != ALARM_VIEWS[0]:
+            self.update_alarm_list()
+
+    def alarm_added(self, alarm):
+        if self.filtered:
+            self.update_alarm_list()
+            return
+        self.alarm_list.data.append({"text": MDApp.get_running_app().alarm_index.text(alarm), "alarm": alarm})
+        self.update_empty_label()
+
+    def alarms_added(self, alarms):
+        if self.filtered:
+            self.update_alarm_list()
+            return
+        index = MDApp.get_running_app().alarm_index
+        self.alarm_list.data.extend({"text": index.text(alarm), "alarm": alarm} for alarm in alarms)
+        self.update_empty_label()
+
+    def alarm_changed(self, alarm):
+        app = MDApp.get_running_app()
+        if self.filtered:
+            # Изменённый будильник мог попасть под фильтр или выйти из-под него
+            self.update_alarm_list()
+            return
+        # Обновляется только строка изменённого будильника
+        try:
+            index = app.alarms.index(alarm)
+        except ValueError:  # будильник уже удалён
+            return
+        self.alarm_list.data[index] = {"text": app.alarm_index.text(alarm), "alarm": alarm}
+
+    def alarm_removed(self, index):
+        if self.filtered:
+            # В представлениях по времени у будильника может быть несколько строк (звонок и отложенный звонок)
+            self.update_alarm_list()
+            return
+        del self.alarm_list.data[index]
+        self.update_empty_label()
 
     def edit_alarm(self, index):
         app = MDApp.get_running_app()
         edit_screen = app.sm.get_screen("edit")
-        edit_screen.alarm_index = index
+        edit_screen.alarm_index = app.alarms.index(self.alarm_list.data[index]["alarm"])
         app.sm.current = "edit"
 
     def delete_alarm(self, index):
         app = MDApp.get_running_app()
-        del app.alarms[index]
-        self.update_alarm_list()
+        alarm = self.alarm_list.data[index]["alarm"]
+        app.unschedule_alarm(alarm)
+        app.store.delete(alarm)
+        app.alarms.remove(alarm)
+        app.alarm_index.remove(alarm)
+        self.alarm_removed(index)
+        app.request_sync()
 
 # Экран редактирования будильника
 class AlarmEditScreen(Screen):
@@ -239,7 +535,7 @@ class AlarmEditScreen(Screen):
         sound_layout.add_widget(self.sound_button)
         self.layout.add_widget(sound_layout)
         # По умолчанию выбран "Beep"
-        self.selected_sound = "sounds/beep.mp3"
+        self.selected_sound = "Sounds/Beep.mp3"
         self.selected_sound_name = "Beep"
 
         # Нижняя панель для сохранения – MDCard с круглой кнопкой "check"
@@ -257,6 +553,7 @@ class AlarmEditScreen(Screen):
         self.add_widget(self.layout)
 
     def open_time_picker(self, day):
+        from kivymd.uix.pickers import MDTimePicker
         time_picker = MDTimePicker()
         checkbox, time_btn = self.day_inputs[day]
         try:
@@ -272,6 +569,10 @@ class AlarmEditScreen(Screen):
         time_btn.text = time_value.strftime("%H:%M")
 
     def open_sound_picker(self, *args):
+        self.sound_picker_popup = MDApp.get_running_app().popups.acquire(self._build_sound_picker)
+        self.sound_picker_popup.open()
+
+    def _build_sound_picker(self):
         # Основной Popup с вариантами выбора
         content = BoxLayout(orientation='vertical', spacing=10, padding=10)
         for sound in AVAILABLE_SOUNDS:
@@ -282,8 +583,7 @@ class AlarmEditScreen(Screen):
         upload_btn = MDRaisedButton(text="Загрузить свой файл", size_hint_y=None, height=40)
         upload_btn.bind(on_release=lambda inst: self.open_file_chooser())
         content.add_widget(upload_btn)
-        self.sound_picker_popup = Popup(title="Выберите звуковой сигнал", content=content, size_hint=(0.8, 0.5))
-        self.sound_picker_popup.open()
+        return Popup(title="Выберите звуковой сигнал", content=content, size_hint=(0.8, 0.5))
 
     def select_sound(self, sound):
         # Выбираем стандартный звук
@@ -297,33 +597,46 @@ class AlarmEditScreen(Screen):
         # Закрываем предыдущий popup
         if hasattr(self, "sound_picker_popup"):
             self.sound_picker_popup.dismiss()
-        # Создаем ModalView с FileChooserListView
-        file_chooser = FileChooserListView(filters=['*.mp3', '*.wav'], size_hint=(1, 1))
+        self.file_popup = MDApp.get_running_app().popups.acquire(self._build_file_popup)
+        file_chooser = self.file_popup.file_chooser
+        file_chooser.selection = []
+        # Список файлов перестраивается, только если каталог изменился с прошлого открытия
+        if file_chooser.file_system.is_stale(file_chooser.path):
+            file_chooser._trigger_update()
+        self.file_popup.open()
+
+    def _build_file_popup(self):
+        # ModalView с FileChooserListView; содержимое каталогов кэшируется
+        from kivy.uix.filechooser import FileChooserListView
+        from kivy.uix.modalview import ModalView
+        from listing_cache import CachedFileSystem
+        file_chooser = FileChooserListView(filters=['*.mp3', '*.wav'], size_hint=(1, 1),
+                                           file_system=CachedFileSystem())
         choose_btn = MDRaisedButton(text="Выбрать", size_hint=(1, None), height=40)
+        choose_btn.bind(on_release=self.file_chosen)
         layout = BoxLayout(orientation='vertical', spacing=10, padding=10)
         layout.add_widget(file_chooser)
         layout.add_widget(choose_btn)
-        self.file_popup = ModalView(size_hint=(0.9, 0.9))
-        self.file_popup.add_widget(layout)
-
-        def file_chosen(instance):
-            selection = file_chooser.selection
-            if selection:
-                chosen_file = selection[0]
-                # Извлекаем имя файла
-                import os
-                name = os.path.basename(chosen_file)
-                self.selected_sound = chosen_file
-                self.selected_sound_name = name
-                self.sound_button.text = name
-                self.file_popup.dismiss()
-            else:
-                # Если ничего не выбрано, можно показать предупреждение
-                popup = Popup(title="Ошибка", content=Label(text="Файл не выбран!"), size_hint=(0.8, 0.3))
-                popup.open()
+        file_popup = ModalView(size_hint=(0.9, 0.9))
+        file_popup.add_widget(layout)
+        file_popup.file_chooser = file_chooser
+        return file_popup
 
-        choose_btn.bind(on_release=file_chosen)
-        self.file_popup.open()
+    def file_chosen(self, instance):
+        selection = self.file_popup.file_chooser.selection
+        if selection:
+            # Файл копируется в библиотеку звуков приложения в фоне; будильник ссылается на копию
+            self.file_popup.dismiss()
+            MDApp.get_running_app().import_sounds(selection[:1], self.sound_imported)
+        else:
+            # Если ничего не выбрано, можно показать предупреждение
+            MDApp.get_running_app().show_error("Файл не выбран!")
+
+    def sound_imported(self, source, asset):
+        name = os.path.basename(source)
+        self.selected_sound = asset
+        self.selected_sound_name = name
+        self.sound_button.text = name
 
     def on_pre_enter(self, *args):
         if self.alarm_index is not None:
@@ -339,7 +652,7 @@ class AlarmEditScreen(Screen):
             self.active_checkbox.active = alarm.active
             # Если у будильника задан звук, отображаем его, иначе по умолчанию
             self.sound_button.text = alarm.sound_name if hasattr(alarm, "sound_name") else "Beep"
-            self.selected_sound = alarm.sound if hasattr(alarm, "sound") else "sounds/beep.mp3"
+            self.selected_sound = alarm.sound if hasattr(alarm, "sound") else "Sounds/Beep.mp3"
             self.selected_sound_name = alarm.sound_name if hasattr(alarm, "sound_name") else "Beep"
         else:
             for day, (checkbox, time_btn) in self.day_inputs.items():
@@ -348,7 +661,7 @@ class AlarmEditScreen(Screen):
             self.week_spinner.text = "любая"
             self.active_checkbox.active = True
             self.sound_button.text = "Beep"
-            self.selected_sound = "sounds/beep.mp3"
+            self.selected_sound = "Sounds/Beep.mp3"
             self.selected_sound_name = "Beep"
 
     def save_alarm(self, instance):
@@ -357,23 +670,16 @@ class AlarmEditScreen(Screen):
             if checkbox.active:
                 time_str = time_btn.text.strip()
                 if time_str == "Выбрать время":
-                    popup = Popup(title="Ошибка",
-                                  content=Label(text=f"Для дня {day} выберите время!"),
-                                  size_hint=(0.8, 0.3))
-                    popup.open()
+                    MDApp.get_running_app().show_error(f"Для дня {day} выберите время!")
                     return
                 try:
                     day_time = datetime.datetime.strptime(time_str, "%H:%M").time()
                     schedule[day] = day_time
                 except ValueError:
-                    popup = Popup(title="Ошибка",
-                                  content=Label(text=f"Неверный формат времени для {day}. Используйте HH:MM"),
-                                  size_hint=(0.8, 0.3))
-                    popup.open()
+                    MDApp.get_running_app().show_error(f"Неверный формат времени для {day}. Используйте HH:MM")
                     return
         week_type = self.week_spinner.text
         active = self.active_checkbox.active
-        from __main__ import Alarm  # Используем класс Alarm из главного модуля
         if self.alarm_index is not None:
             # Обновляем существующий будильник
             alarm = MDApp.get_running_app().alarms[self.alarm_index]
@@ -382,10 +688,17 @@ class AlarmEditScreen(Screen):
             alarm.active = active
             alarm.sound = self.selected_sound
             alarm.sound_name = self.selected_sound_name
+            MDApp.get_running_app().alarm_index.update(alarm)
+            MDApp.get_running_app().main_screen.alarm_changed(alarm)
         else:
-            MDApp.get_running_app().alarms.append(Alarm(schedule=schedule, week_type=week_type, active=active,
-                                                         sound=self.selected_sound, sound_name=self.selected_sound_name))
-        MDApp.get_running_app().update_alarm_list()
+            alarm = Alarm(schedule=schedule, week_type=week_type, active=active,
+                          sound=self.selected_sound, sound_name=self.selected_sound_name)
+            MDApp.get_running_app().alarms.append(alarm)
+            MDApp.get_running_app().alarm_index.add(alarm)
+            MDApp.get_running_app().main_screen.alarm_added(alarm)
+        MDApp.get_running_app().store.save(alarm)
+        MDApp.get_running_app().reschedule_alarm(alarm)
+        MDApp.get_running_app().request_sync()
         MDApp.get_running_app().sm.current = "main"
 
     def cancel(self, instance):
@@ -407,6 +720,24 @@ class SettingsScreen(Screen):
         checkbox_layout.add_widget(Label(text="Включить уведомления", size_hint=(0.8, 1), color=(1,1,1,1)))
         checkbox_layout.add_widget(self.notifications_checkbox)
         self.layout.add_widget(checkbox_layout)
+        # Будильники по расписанию группы
+        self.layout.add_widget(Label(text="Группа:", color=(1,1,1,1)))
+        self.group_input = TextInput(text=DEFAULT_GROUP, multiline=False, size_hint=(1, None), height=40)
+        self.layout.add_widget(self.group_input)
+        self.layout.add_widget(Label(text="За сколько минут до первой пары:", color=(1,1,1,1)))
+        self.lead_input = TextInput(text=str(DEFAULT_LEAD_MINUTES), multiline=False, size_hint=(1, None), height=40)
+        self.layout.add_widget(self.lead_input)
+        self.layout.add_widget(Label(text="Сервис чётности (необязательно):", color=(1,1,1,1)))
+        self.service_input = TextInput(text="", hint_text="http://адрес:8765", multiline=False,
+                                       size_hint=(1, None), height=40)
+        self.layout.add_widget(self.service_input)
+        self.layout.add_widget(Label(text="Сервер синхронизации (необязательно):", color=(1,1,1,1)))
+        self.sync_input = TextInput(text="", hint_text="http://адрес:8766", multiline=False,
+                                    size_hint=(1, None), height=40)
+        self.layout.add_widget(self.sync_input)
+        generate_button = Button(text="Создать будильники по расписанию", size_hint=(1, None), height=40)
+        generate_button.bind(on_release=self.generate_alarms)
+        self.layout.add_widget(generate_button)
         button_layout = BoxLayout(orientation="horizontal", spacing=10, size_hint=(1, None), height=40)
         save_button = Button(text="Сохранить")
         save_button.bind(on_release=self.save_settings)
@@ -421,125 +752,654 @@ class SettingsScreen(Screen):
         app = MDApp.get_running_app()
         self.snooze_input.text = str(app.snooze_duration)
         self.notifications_checkbox.active = app.enable_notifications
+        self.group_input.text = app.group
+        self.lead_input.text = str(app.lead_minutes)
+        self.service_input.text = app.parity_service
+        self.sync_input.text = app.sync_server
 
     def save_settings(self, instance):
         app = MDApp.get_running_app()
         try:
             app.snooze_duration = int(self.snooze_input.text)
+            app.lead_minutes = int(self.lead_input.text)
         except ValueError:
-            popup = Popup(title="Ошибка",
-                          content=Label(text="Неверное значение длительности"),
-                          size_hint=(0.8, 0.3))
-            popup.open()
+            MDApp.get_running_app().show_error("Неверное значение длительности")
             return
         app.enable_notifications = self.notifications_checkbox.active
+        app.group = self.group_input.text.strip() or DEFAULT_GROUP
+        if self.service_input.text.strip() != app.parity_service:
+            app.use_parity_service(self.service_input.text)
+            app.update_current_week(0)
+        if self.sync_input.text.strip() != app.sync_server:
+            app.use_sync_server(self.sync_input.text)
         app.sm.current = "main"
 
+    def generate_alarms(self, instance):
+        self.save_settings(instance)
+        MDApp.get_running_app().generate_timetable_alarms()
+
     def cancel(self, instance):
         MDApp.get_running_app().sm.current = "main"
 
+# Экран диагностики: метрики работы приложения
+class DiagnosticsScreen(Screen):
+    def __init__(self, **kwargs):
+        super(DiagnosticsScreen, self).__init__(**kwargs)
+        self.layout = BoxLayout(orientation="vertical", padding=10, spacing=10)
+        self.layout.add_widget(Label(text="Диагностика", font_size=24, size_hint=(1, None), height=40,
+                                     color=(1,1,1,1)))
+        checkbox_layout = BoxLayout(orientation='horizontal', size_hint=(1, None), height=40)
+        self.enabled_checkbox = CheckBox()
+        self.enabled_checkbox.bind(active=self.set_enabled)
+        checkbox_layout.add_widget(Label(text="Собирать метрики", size_hint=(0.8, 1), color=(1,1,1,1)))
+        checkbox_layout.add_widget(self.enabled_checkbox)
+        self.layout.add_widget(checkbox_layout)
+        self.summary = Label(text="", color=(1,1,1,1), halign="left", valign="top")
+        self.summary.bind(size=self.summary.setter("text_size"))
+        self.layout.add_widget(self.summary)
+        self.status = Label(text="", color=(1,1,1,1), size_hint=(1, None), height=30)
+        self.layout.add_widget(self.status)
+        button_layout = BoxLayout(orientation="horizontal", spacing=10, size_hint=(1, None), height=40)
+        for text, callback in (("Обновить", self.refresh), ("Сохранить JSON", self.dump),
+                               ("Сбросить", self.reset), ("Назад", self.back)):
+            button = Button(text=text)
+            button.bind(on_release=callback)
+            button_layout.add_widget(button)
+        self.layout.add_widget(button_layout)
+        self.add_widget(self.layout)
+
+    def on_pre_enter(self, *args):
+        self.enabled_checkbox.active = MDApp.get_running_app().metrics.enabled
+        self.status.text = ""
+        self.refresh()
+
+    def set_enabled(self, checkbox, value):
+        MDApp.get_running_app().metrics.enabled = value
+
+    def refresh(self, *args):
+        self.summary.text = format_snapshot(MDApp.get_running_app().metrics.snapshot())
+
+    def dump(self, instance):
+        app = MDApp.get_running_app()
+        path = os.path.join(app.user_data_dir, time.strftime("metrics-%Y%m%d-%H%M%S.json"))
+        try:
+            app.metrics.dump(path)
+        except OSError as e:
+            app.show_error(f"Не удалось сохранить метрики: {e}")
+            return
+        self.status.text = f"Сохранено: {path}"
+
+    def reset(self, instance):
+        MDApp.get_running_app().metrics.reset()
+        self.refresh()
+
+    def back(self, instance):
+        MDApp.get_running_app().sm.current = "main"
+
 # Главное приложение
 class AlarmClockApp(MDApp):
     alarms = ListProperty([])
     snooze_duration = NumericProperty(5)
     enable_notifications = BooleanProperty(True)
+    group = StringProperty(DEFAULT_GROUP)
+    lead_minutes = NumericProperty(DEFAULT_LEAD_MINUTES)
+    parity_service = StringProperty(PARITY_SERVICE_URL)
+    sync_server = StringProperty(SYNC_SERVER_URL)
+
+    def __init__(self, clock=None, **kwargs):
+        """:param clock: источник времени – SystemClock (по умолчанию) или clocks.SimulatedClock"""
+        super(AlarmClockApp, self).__init__(**kwargs)
+        self.clock = clock if clock is not None else SystemClock()
+        if hasattr(self.clock, "subscribe"):
+            self.clock.subscribe(self.on_clock_advanced)
 
     def build(self):
+        self.build_started = time.perf_counter()
+        self.metrics = Metrics(enabled=COLLECT_METRICS)
         self.title = "Продвинутый будильник"
         self.theme_cls.theme_style = "Dark"
         self.theme_cls.primary_palette = "DeepPurple"
-        self.sm = ScreenManager()
+        self.sm = LazyScreenManager()
         self.main_screen = MainScreen(name="main")
         self.sm.add_widget(self.main_screen)
-        self.edit_screen = AlarmEditScreen(name="edit")
-        self.sm.add_widget(self.edit_screen)
-        self.settings_screen = SettingsScreen(name="settings")
-        self.sm.add_widget(self.settings_screen)
+        # Экраны редактирования и настроек строятся при первом переходе на них
+        self.sm.register("edit", AlarmEditScreen)
+        self.sm.register("settings", SettingsScreen)
+        self.sm.register("diagnostics", DiagnosticsScreen)
+        self.popups = PopupPool()
         self.current_week = "любая"
+        self.parity_state = "pending"  # "pending" – ждём ответа, "fresh" – получено, "stale" – не удалось обновить
+        self.scheduler = AlarmScheduler(now=self.clock.now())
+        self.alarm_index = AlarmIndex()
+        self._alarm_event = None
+        self._preload_event = None
+        self._calendar_worker = None
+        self._sound_importer = None
+        self._sync_client = None
+        self._syncing = False  # обмен с сервером синхронизации идёт в фоне
+        self._sync_again = False
+        self._sync_trigger = Clock.create_trigger(lambda dt: self.sync_now(), SYNC_DELAY)
+        self._alarm_popup = None  # открытое окно сработавших будильников
+        self._ringing_sound = None  # его звук; False – звук не загрузился
+        # Если запущен демон (daemon.py), расписанием владеет он: будильники читаются и меняются через сокет,
+        # а звонит демон. Иначе приложение само хранит будильники и звонит, пока открыто.
+        self.daemon = DaemonClient.connect(os.path.join(self.user_data_dir, SOCKET_NAME))
+        if self.daemon is not None:
+            self.store = self.daemon
+            self.listen_daemon()
+        else:
+            self.store = AlarmStore(os.path.join(self.user_data_dir, "alarms.db"))
+        self.sound_cache = SoundCache(load_sound, os.path.join(self.user_data_dir, "sounds"))
+        # Чётность берётся из кэша на диске; сеть нужна примерно раз в семестр
+        self.use_parity_service(PARITY_SERVICE_URL)
+        cached_parity = self.parity_cache.week_parity(self.clock.today())
+        if cached_parity is not None:
+            self.on_week_parity(cached_parity)
+        self.parity_fetcher = ParityFetcher(
+            self.fetch_week_parity, self.on_week_parity,
+            post=lambda fn, *args: Clock.schedule_once(lambda dt: fn(*args)),
+            call_later=lambda delay, fn: Clock.schedule_once(lambda dt: fn(), delay))
         self.update_current_week(0)
-        Clock.schedule_interval(self.check_alarms, 1)
+        # Будильники читаются после первого кадра, чтобы не задерживать появление окна
+        Clock.schedule_once(self.load_alarms)
+        self.arm_alarm_clock()
         Clock.schedule_interval(self.update_current_week, 3600)
+        Clock.schedule_interval(lambda dt: self.sync_now(), SYNC_INTERVAL)
+        if IMPORT_PROFILE or STARTUP_BENCHMARK:
+            from kivy.core.window import Window
+            Window.bind(on_flip=self.on_first_frame)
+        self.build_finished = time.perf_counter()
         return self.sm
 
+    def on_first_frame(self, window):
+        from kivy.core.window import Window
+        Window.unbind(on_flip=self.on_first_frame)
+        first_frame = time.perf_counter()
+        if IMPORT_PROFILE:
+            importprofile.report()
+        if STARTUP_BENCHMARK:
+            # Время от начала выполнения main.py, мс
+            print("STARTUP " + json.dumps({
+                "imports_ms": (STARTUP_IMPORTED - STARTUP_STARTED) * 1000,
+                "build_ms": (self.build_finished - self.build_started) * 1000,
+                "first_frame_ms": (first_frame - STARTUP_STARTED) * 1000,
+            }))
+            self.stop()
+
     def update_alarm_list(self):
         self.main_screen.update_alarm_list()
 
+    def load_alarms(self, dt):
+        self.alarms = self.store.load()
+        self.alarm_index.rebuild(self.alarms)
+        self.scheduler.reindex_all(self.alarms)
+        self.arm_alarm_clock()
+        self.update_alarm_list()
+        self.sync_now()
+
+    def reschedule_alarm(self, alarm):
+        self.scheduler.reindex(alarm, self.clock.now())
+        self.arm_alarm_clock()
+
+    def unschedule_alarm(self, alarm):
+        self.scheduler.remove(alarm)
+        self.arm_alarm_clock()
+
+    def arm_alarm_clock(self):
+        if self.daemon is not None:
+            return  # срабатываниями управляет демон
+        # Один отложенный вызов на ближайший срок вместо опроса каждую секунду
+        if self._alarm_event is not None:
+            self._alarm_event.cancel()
+        if self._preload_event is not None:
+            self._preload_event.cancel()
+            self._preload_event = None
+        upcoming = self.scheduler.peek()
+        remaining = MAX_ALARM_SLEEP
+        if upcoming is not None:
+            deadline, alarm = upcoming
+            remaining = max((deadline - self.clock.now()).total_seconds(), 0)
+            if remaining - SOUND_PRELOAD_AHEAD < MAX_ALARM_SLEEP:
+                # Звук загружается заранее, чтобы при срабатывании не ждать чтения и декодирования
+                self._preload_event = Clock.schedule_once(lambda dt: self.sound_cache.preload(alarm.sound),
+                                                          max(remaining - SOUND_PRELOAD_AHEAD, 0))
+        # С моделируемыми часами ждать нечего: проверка запускается из on_clock_advanced
+        delay = self.clock.sleep_timeout(remaining, MAX_ALARM_SLEEP)
+        self._alarm_event = Clock.schedule_once(self.check_alarms, delay) if delay is not None else None
+
+    def on_clock_advanced(self):
+        Clock.schedule_once(self.check_alarms)
+
     def check_alarms(self, dt):
-        now = datetime.datetime.now()
-        today = datetime.date.today()
-        current_day = DAYS_OF_WEEK[today.weekday()]
-        for alarm in self.alarms:
-            if alarm.active and current_day in alarm.schedule:
-                scheduled_time = alarm.schedule[current_day]
-                alarm_dt = datetime.datetime.combine(today, scheduled_time)
-                if abs((alarm_dt - now).total_seconds()) < 1:
-                    if alarm.last_triggered is None or (now - alarm.last_triggered).total_seconds() > 60:
-                        if alarm.week_type == "любая" or alarm.week_type == self.current_week:
-                            print("Будильник сработал!")
-                            if self.enable_notifications:
-                                try:
-                                    notification.notify(title="Будильник", message="Время просыпаться!", timeout=10)
-                                except NotImplementedError:
-                                    print("Уведомления не поддерживаются на этой платформе.")
-                            alarm.last_triggered = now
-                            self.show_alarm_popup(alarm)
-                            break
-
-    def show_alarm_popup(self, alarm):
-        content = BoxLayout(orientation='vertical', spacing=10, padding=10)
-        content.add_widget(Label(text="Будильник сработал!"))
-        button_layout = BoxLayout(orientation='horizontal', spacing=10, size_hint=(1, None), height=40)
-        snooze_button = Button(text="Отложить")
-        dismiss_button = Button(text="Отключить")
-        button_layout.add_widget(snooze_button)
-        button_layout.add_widget(dismiss_button)
-        content.add_widget(button_layout)
-        popup = Popup(title="Будильник", content=content, size_hint=(0.8, 0.4))
-        
-        # Загружаем и запускаем звуковой сигнал
-        sound = SoundLoader.load(alarm.sound)
-        if sound:
-            sound.loop = True
-            sound.play()
-        
-        # Функция для остановки звука
-        def stop_sound():
-            if sound:
-                sound.stop()
-        
-        def snooze(instance):
-            stop_sound()
-            now_dt = datetime.datetime.now()
-            new_dt = now_dt + datetime.timedelta(minutes=self.snooze_duration)
-            today_name = DAYS_OF_WEEK[datetime.date.today().weekday()]
-            if today_name in alarm.schedule:
-                alarm.schedule[today_name] = new_dt.time()
-            popup.dismiss()
-            self.update_alarm_list()
-        
-        def dismiss(instance):
-            stop_sound()
+        if self.daemon is not None:
+            return  # на сдвиг моделируемых часов отвечает демон, иначе будильник сработал бы дважды
+        started = time.perf_counter()
+        now = self.clock.now()
+        due = self.scheduler.pop_due(now)
+        if due:
+            self.fire_alarms(due, now)
+        self.arm_alarm_clock()
+        self.metrics.since("check_alarms_ms", started)
+
+    def generate_timetable_alarms(self):
+        # Загрузка и разбор расписания идут в фоне; повторная генерация берёт расписание из кэша
+        group, lead_minutes = self.group, self.lead_minutes
+
+        def work():
+            lessons = self.timetable_cache.get(group)
+            Clock.schedule_once(lambda dt: self.apply_timetable_alarms(group, lead_minutes, lessons))
+
+        threading.Thread(target=work, daemon=True).start()
+
+    def apply_timetable_alarms(self, group, lead_minutes, lessons):
+        if not lessons:
+            MDApp.get_running_app().show_error(f"Не удалось получить расписание группы {group}")
+            return
+        # Заменяем будильники, созданные ранее по расписанию этой группы
+        source = f"timetable:{group}"
+        previous = [alarm for alarm in self.alarms if alarm.source == source]
+        for alarm in previous:
+            self.scheduler.remove(alarm)
+        self.remove_from_list(set(previous))
+        self.alarm_index.remove_many(previous)
+        self.store.delete_many(previous)
+        generated = generate_alarms(lessons, lead_minutes, source=source)
+        self.store.save_many(generated)
+        self.alarm_index.add_many(generated)
+        for alarm in generated:
+            self.alarms.append(alarm)
+            self.scheduler.reindex(alarm, self.clock.now())
+        self.arm_alarm_clock()
+        self.update_alarm_list()
+        self.request_sync()
+
+    def fire_alarms(self, due, now):
+        # Всё, что наступило к этой проверке, срабатывает одной пачкой: одно уведомление, одно окно, один звук
+        fired_at = time.perf_counter()
+        alarms = [alarm for alarm, fire_dt in due]
+        moments = [fire_dt for alarm, fire_dt in due if fire_dt is not None]
+        # Плановое время (самого раннего) в шкале perf_counter – от него считается опоздание звука и окна
+        scheduled_at = fired_at - max((now - min(moments)).total_seconds(), 0) if moments else None
+        print("Будильник сработал!", fired_message(alarms))
+        if self.enable_notifications:
+            try:
+                from plyer import notification
+                notification.notify(title="Будильник", message=fired_message(alarms), timeout=10)
+            except NotImplementedError:
+                print("Уведомления не поддерживаются на этой платформе.")
+        for alarm in alarms:
+            alarm.last_triggered = now
+        self.store.update_states(alarms)
+        self.show_alarm_popup(alarms, fired_at, scheduled_at)
+        self.main_screen.schedule_changed()
+
+    def show_alarm_popup(self, alarms, fired_at=None, scheduled_at=None):
+        # Звук один на всё окно: будильники, сработавшие, пока оно открыто, только добавляются в список
+        if self._ringing_sound is None:
+            self._ringing_sound = self.sound_cache.play(alarms[0].sound, fired_at) or False
+            if scheduled_at is not None:
+                self.metrics.since("lateness_sound_ms", scheduled_at)
+        self.open_alarm_popup(alarms, self.snooze_alarms, self.dismiss_alarms)
+        if scheduled_at is not None:
+            self.metrics.since("lateness_popup_ms", scheduled_at)
+
+    def open_alarm_popup(self, alarms, snooze_action, dismiss_action):
+        popup = self._alarm_popup
+        if popup is None:
+            popup = self._alarm_popup = self.popups.acquire(AlarmPopup)
+            popup.snooze_action = snooze_action
+            popup.dismiss_action = dismiss_action
+            popup.on_empty = self.stop_ringing
+            popup.open()
+        popup.add(alarms)
+
+    def stop_ringing(self):
+        if self._ringing_sound:
+            self._ringing_sound.stop()
+        self._ringing_sound = None
+        self._alarm_popup = None
+
+    def snooze_alarms(self, alarms):
+        # Повторный звонок – разовый таймер; недельное расписание будильника не меняется
+        new_dt = self.clock.now() + datetime.timedelta(minutes=self.snooze_duration)
+        for alarm in alarms:
+            self.scheduler.schedule_once(alarm, new_dt)
+        self.arm_alarm_clock()
+        self.main_screen.schedule_changed()
+
+    def dismiss_alarms(self, alarms):
+        for alarm in alarms:
             alarm.active = False
-            popup.dismiss()
-            self.update_alarm_list()
-        
-        snooze_button.bind(on_release=snooze)
-        dismiss_button.bind(on_release=dismiss)
+            self.scheduler.remove(alarm)
+            self.alarm_index.update(alarm)
+        self.store.update_states(alarms)
+        self.arm_alarm_clock()
+        self.request_sync()
+        if len(alarms) == 1:
+            self.main_screen.alarm_changed(alarms[0])
+        else:
+            self.main_screen.update_alarm_list()
+
+    def show_error(self, text):
+        popup = self.popups.acquire(ErrorPopup)
+        popup.message.text = text
         popup.open()
 
-    def update_current_week(self, dt):
-        week_parity = fetch_week_parity()
-        if week_parity is not None:
-            if week_parity == "even":
-                self.current_week = "чётная"
-            elif week_parity == "odd":
-                self.current_week = "нечётная"
+    def listen_daemon(self):
+        # События демона читаются в отдельном потоке по второму подключению
+        events = DaemonClient.connect(self.daemon.path)
+        if events is None:
+            return
+
+        def work():
+            try:
+                for event in events.events():
+                    Clock.schedule_once(lambda dt, event=event: self.on_daemon_event(event))
+            except (OSError, ValueError, DaemonError) as e:
+                print("Соединение с демоном потеряно:", e)
+
+        threading.Thread(target=work, daemon=True).start()
+
+    def on_daemon_event(self, event):
+        if event.get("event") == "synced":
+            self.load_alarms(0)  # демон принял изменения с другого устройства
+            return
+        if event.get("event") != "fired":
+            return
+        ids = {item["id"] for item in event["alarms"]}
+        alarms = [alarm for alarm in self.alarms if alarm.id in ids]
+        if not alarms:
+            return
+        at = datetime.datetime.fromisoformat(event["at"])
+        for alarm in alarms:
+            alarm.last_triggered = at
+        # Звук уже играет в демоне; окно только передаёт ему выбор пользователя
+        self.open_alarm_popup(alarms, self.daemon_snooze, self.daemon_dismiss)
+
+    def daemon_snooze(self, alarms):
+        self.daemon.snooze([alarm.id for alarm in alarms], self.snooze_duration)
+
+    def daemon_dismiss(self, alarms):
+        self.daemon.dismiss([alarm.id for alarm in alarms])
+        for alarm in alarms:
+            alarm.active = False
+            self.alarm_index.update(alarm)
+        if len(alarms) == 1:
+            self.main_screen.alarm_changed(alarms[0])
+        else:
+            self.main_screen.update_alarm_list()
+
+    def on_stop(self):
+        self.parity_fetcher.shutdown()
+        if self._calendar_worker is not None:
+            self._calendar_worker.shutdown()
+        if self._sound_importer is not None:
+            self._sound_importer.shutdown()
+        self.store.close()
+
+    @property
+    def sound_importer(self):
+        if self._sound_importer is None:
+            from sound_store import SoundImporter, SoundStore
+            store = SoundStore(os.path.join(self.user_data_dir, "sounds", "library"))
+            self._sound_importer = SoundImporter(store,
+                                                 post=lambda fn, *args: Clock.schedule_once(lambda dt: fn(*args)))
+        return self._sound_importer
+
+    def import_sounds(self, paths, on_imported):
+        # on_imported(исходный путь, путь в библиотеке) – для каждого успешно импортированного файла
+        popup = self.popups.acquire(ProgressPopup)
+        popup.start("Импорт звука", ", ".join(os.path.basename(path) for path in paths), self.sound_importer.cancel)
+
+        def done(results):
+            errors = []
+            for source, asset, error in results:
+                if asset is not None:
+                    on_imported(source, asset)
+                else:
+                    errors.append(f"{os.path.basename(source)}: {error}")
+            if errors:
+                popup.finish("Не удалось импортировать:\n" + "\n".join(errors))
+            else:
+                popup.cancel_action = None
+                popup.dismiss()
+
+        self.sound_importer.import_files(paths, done, popup.set_progress)
+
+    @property
+    def calendar_worker(self):
+        if self._calendar_worker is None:
+            from ics import CalendarWorker
+            self._calendar_worker = CalendarWorker(post=lambda fn, *args: Clock.schedule_once(lambda dt: fn(*args)))
+        return self._calendar_worker
+
+    def open_calendar_import(self):
+        self.calendar_popup = self.popups.acquire(self._build_calendar_chooser)
+        file_chooser = self.calendar_popup.file_chooser
+        file_chooser.selection = []
+        if file_chooser.file_system.is_stale(file_chooser.path):
+            file_chooser._trigger_update()
+        self.calendar_popup.open()
+
+    def _build_calendar_chooser(self):
+        from kivy.uix.filechooser import FileChooserListView
+        from kivy.uix.modalview import ModalView
+        from listing_cache import CachedFileSystem
+        file_chooser = FileChooserListView(filters=['*.ics'], size_hint=(1, 1), file_system=CachedFileSystem())
+        choose_btn = MDRaisedButton(text="Импортировать", size_hint=(1, None), height=40)
+        choose_btn.bind(on_release=self.calendar_chosen)
+        layout = BoxLayout(orientation='vertical', spacing=10, padding=10)
+        layout.add_widget(file_chooser)
+        layout.add_widget(choose_btn)
+        popup = ModalView(size_hint=(0.9, 0.9))
+        popup.add_widget(layout)
+        popup.file_chooser = file_chooser
+        return popup
+
+    def calendar_chosen(self, instance):
+        selection = self.calendar_popup.file_chooser.selection
+        if not selection:
+            self.show_error("Файл не выбран!")
+            return
+        self.calendar_popup.dismiss()
+        self.import_calendar(selection[0])
+
+    def import_calendar(self, path):
+        # Файл разбирается в фоне; будильники приходят пачками и сохраняются в главном потоке
+        popup = self.popups.acquire(ProgressPopup)
+        popup.start("Импорт календаря", os.path.basename(path), self.calendar_worker.cancel)
+
+        def done(stats):
+            message = f"Импортировано будильников: {stats['imported']}, пропущено событий: {stats['skipped']}"
+            popup.finish(message if stats["error"] is None else f"{message}\nОшибка: {stats['error']}")
+            self.update_alarm_list()
+
+        self.calendar_worker.import_file(path, self.add_alarms, popup.set_progress, done,
+                                         parity_offset=self.scheduler.parity_offset, now=self.clock.now(),
+                                         source="ics:" + os.path.basename(path))
+
+    def add_alarms(self, alarms):
+        self.store.save_many(alarms)
+        self.alarms.extend(alarms)
+        self.alarm_index.add_many(alarms)
+        now = self.clock.now()
+        for alarm in alarms:
+            self.scheduler.reindex(alarm, now)
+        self.arm_alarm_clock()
+        self.main_screen.alarms_added(alarms)
+        self.request_sync()
+
+    def export_calendar(self, path=None):
+        path = path or os.path.join(self.user_data_dir, "alarms.ics")
+        popup = self.popups.acquire(ProgressPopup)
+        popup.start("Экспорт календаря", path, self.calendar_worker.cancel)
+
+        def done(stats):
+            if stats["error"] is not None:
+                popup.finish(f"Ошибка: {stats['error']}")
+            else:
+                popup.finish(f"Экспортировано будильников: {stats['exported']}\n{path}")
+
+        self.calendar_worker.export_file(path, self.alarms, popup.set_progress, done,
+                                         parity_offset=self.scheduler.parity_offset, reference=self.clock.today())
+
+    def use_parity_service(self, url):
+        # С адресом сервиса чётность и страницы расписания берутся у него, без адреса – с сайта
+        from functools import partial
+        url = url.strip()
+        fetch_page = None
+        if url:
+            from parity_service import service_fetch
+            from parser import fetch_timetable_page
+            fetch = service_fetch(url)
+            fetch_page = partial(fetch_timetable_page, base_url=url.rstrip("/") + "/timetable")
+        else:
+            from parser import fetch_week_parity_conditional as fetch
+        self.parity_service = url
+        self.parity_cache = ParityCache(os.path.join(self.user_data_dir, "parity_cache.json"),
+                                        fetch=partial(self.timed_parity_request, fetch))
+        self.timetable_cache = TimetableCache(os.path.join(self.user_data_dir, "timetables"), fetch_page=fetch_page)
+
+    @property
+    def sync_client(self):
+        # При запущенном демоне хранилищем владеет он и синхронизируется сам (daemon.py --sync-server)
+        if self._sync_client is None and self.sync_server and self.daemon is None:
+            from sync import SyncClient
+            self._sync_client = SyncClient(self.store, self.sync_server)
+        return self._sync_client
+
+    def use_sync_server(self, url):
+        self.sync_server = url.strip()
+        self._sync_client = None
+        self.sync_now()
+
+    def request_sync(self):
+        self._sync_trigger()
+
+    def sync_now(self):
+        # Записи читаются и пишутся в главном потоке (SQLite), обмен по сети – в фоне
+        client = self.sync_client
+        if client is None:
+            return
+        if self._syncing:
+            self._sync_again = True
+            return
+        body, sent = client.prepare()
+        self._syncing = True
+
+        def work():
+            import requests
+
+            try:
+                reply, _ = self.metrics.call("sync", client.exchange, body)
+            except (requests.RequestException, ValueError) as e:
+                print("Синхронизация не удалась:", e)
+                reply = None
+            Clock.schedule_once(lambda dt: self.on_synced(client, sent, reply))
+
+        threading.Thread(target=work, daemon=True).start()
+
+    def on_synced(self, client, sent, reply):
+        self._syncing = False
+        more = False
+        if reply is not None and client is self._sync_client:
+            changed, more = client.finish(sent, reply)
+            self.apply_synced(changed)
+        if more or self._sync_again:
+            self._sync_again = False
+            self.sync_now()
+
+    def apply_synced(self, changed):
+        # Изменения с других устройств уже в хранилище; здесь обновляются список, индекс и расписание
+        if not changed:
+            return
+        from sync import update_alarm
+        by_uid = {alarm.uid: alarm for alarm in self.alarms}
+        now = self.clock.now()
+        added, removed = [], set()
+        for uid, alarm in changed:
+            previous = by_uid.get(uid)
+            if alarm is None:
+                if previous is not None:
+                    removed.add(by_uid.pop(uid))
+                    self.unschedule_alarm(previous)
+                    self.alarm_index.remove(previous)
+                continue
+            if previous is not None:
+                update_alarm(previous, alarm)
+                alarm = previous
+                self.alarm_index.update(alarm)
             else:
-                self.current_week = "любая"
+                by_uid[uid] = alarm
+                added.append(alarm)
+                self.alarm_index.add(alarm)
+            self.scheduler.reindex(alarm, now)
+        self.alarms.extend(added)
+        if removed:
+            self.remove_from_list(removed)
+        self.arm_alarm_clock()
+        self.update_alarm_list()
+
+    def remove_from_list(self, removed):
+        """Убирает множество будильников removed из self.alarms (хранилище, индекс и расписание – отдельно)."""
+        # Экран редактирования держит номер будильника в списке – после удаления он сдвигается
+        edit_screen = self.sm.get_screen("edit") if self.sm.current == "edit" else None
+        edited = None
+        if edit_screen is not None and edit_screen.alarm_index is not None:
+            edited = self.alarms[edit_screen.alarm_index]
+        self.alarms = [alarm for alarm in self.alarms if alarm not in removed]
+        if edited is not None:
+            edit_screen.alarm_index = self.alarms.index(edited) if edited not in removed else None
+
+    def update_current_week(self, dt):
+        # Запрос выполняется в фоне, результат придёт в on_week_parity
+        self.parity_fetcher.request()
+        if dt:
+            self.main_screen.schedule_changed()
+
+    def fetch_week_parity(self, timeout=5):
+        # Вызывается в потоке ParityFetcher; ответы из свежего кэша не замеряются, сеть – в timed_parity_request
+        return self.parity_cache.fetch(timeout=timeout, now=self.clock.now())
+
+    def timed_parity_request(self, fetch, **kwargs):
+        """Условный запрос чётности (fetch ParityCache) с замером длительности и исхода fetch_week_parity."""
+        started = time.perf_counter()
+        status = "error"
+        try:
+            result = fetch(**kwargs)
+            status = result[0]
+            return result
+        finally:
+            self.metrics.since("fetch_week_parity_ms", started)
+            self.metrics.outcome("fetch_week_parity", status != "error")
+
+    def on_week_parity(self, week_parity):
+        today = self.clock.today()
+        if week_parity == "even":
+            parity_offset = parity_offset_for("чётная", today)
+            self.parity_state = "fresh"
+        elif week_parity == "odd":
+            parity_offset = parity_offset_for("нечётная", today)
+            self.parity_state = "fresh"
         else:
-            self.current_week = "любая"
-        if hasattr(self, "main_screen"):
-            self.main_screen.week_label.text = f"Сейчас идёт {self.current_week} неделя"
+            # Сохраняем последнюю известную чётность: она продолжает чередоваться по неделям
+            parity_offset = self.scheduler.parity_offset
+            self.parity_state = "stale" if parity_offset is not None else "pending"
+        self.current_week = week_type_on(today, parity_offset)
+        if parity_offset != self.scheduler.parity_offset:
+            # Сменилась чётность – пересчитываем сроки всех будильников
+            self.scheduler.parity_offset = parity_offset
+            self.scheduler.reindex_all(self.alarms)
+            self.arm_alarm_clock()
+            self.main_screen.schedule_changed()
+        self.main_screen.week_label.text = self.week_label_text()
+
+    def week_label_text(self):
+        if self.parity_state == "pending":
+            return "Чётность недели уточняется…"
+        if self.parity_state == "stale":
+            return f"Сейчас идёт {self.current_week} неделя (не обновлено)"
+        return f"Сейчас идёт {self.current_week} неделя"
 
 if __name__ == '__main__':
     AlarmClockApp().run()
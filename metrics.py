@@ -0,0 +1,143 @@
+"""
+Метрики работы приложения: гистограммы длительностей и доля неудачных вызовов.
+
+Сбор включается явно (Metrics.enabled, флаг --metrics у main.py); выключенный
+Metrics почти ничего не стоит – замеры не выполняются. Значения хранятся
+в корзинах с границами ~1-2.5-5 по степеням десяти, поэтому память не растёт
+с числом замеров, а процентили оцениваются по верхней границе корзины.
+Замеры приходят и из фоновых потоков (получение чётности), поэтому запись идёт под блокировкой.
+"""
+import json
+import threading
+import time
+
+# Верхние границы корзин, мс; последняя корзина – всё, что больше
+BUCKET_BOUNDS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500,
+                    1000, 2500, 5000, 10000, 25000, 60000)
+
+
+class Histogram:
+    def __init__(self, bounds=BUCKET_BOUNDS_MS):
+        self.bounds = bounds
+        self.buckets = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        index = 0
+        while index < len(self.bounds) and value > self.bounds[index]:
+            index += 1
+        self.buckets[index] += 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, fraction):
+        """Оценка процентиля: верхняя граница корзины (для последней корзины – максимум)."""
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for index, bucket in enumerate(self.buckets):
+            seen += bucket
+            if seen >= rank and bucket:
+                return min(self.bounds[index], self.max) if index < len(self.bounds) else self.max
+        return self.max
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else None,
+            "min": self.min,
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+            "max": self.max,
+            "buckets": {("<=%g" % bound if index < len(self.bounds) else ">%g" % self.bounds[-1]): bucket
+                        for index, (bound, bucket) in enumerate(zip(self.bounds + (None,), self.buckets))
+                        if bucket},
+        }
+
+
+class Metrics:
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.started = time.time()
+        self._histograms = {}
+        self._outcomes = {}  # имя -> [успешных, неудачных]
+        self._lock = threading.Lock()
+
+    def observe(self, name, value_ms):
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            histogram.observe(value_ms)
+
+    def outcome(self, name, ok):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._outcomes.setdefault(name, [0, 0])[0 if ok else 1] += 1
+
+    def since(self, name, started):
+        """Записывает время от started (time.perf_counter()) до текущего момента."""
+        if self.enabled:
+            self.observe(name, (time.perf_counter() - started) * 1000)
+
+    def call(self, name, fn, *args, **kwargs):
+        """
+        Вызывает fn, записывая длительность в гистограмму name_ms и исход в name.
+        Неудача – исключение или результат None.
+        """
+        if not self.enabled:
+            return fn(*args, **kwargs)
+        started = time.perf_counter()
+        result = None
+        try:
+            result = fn(*args, **kwargs)
+            return result
+        finally:
+            self.since(name + "_ms", started)
+            self.outcome(name, result is not None)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._outcomes.clear()
+            self.started = time.time()
+
+    def snapshot(self):
+        with self._lock:
+            outcomes = {}
+            for name, (ok, failed) in self._outcomes.items():
+                outcomes[name] = {"ok": ok, "failed": failed, "failure_rate": failed / (ok + failed)}
+            return {
+                "started": self.started,
+                "collected": time.time(),
+                "histograms_ms": {name: histogram.to_dict() for name, histogram in sorted(self._histograms.items())},
+                "outcomes": outcomes,
+            }
+
+    def dump(self, path):
+        """Сохраняет снимок метрик в JSON для разбора вне приложения."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
+        return path
+
+
+def format_snapshot(snapshot):
+    """Текстовая сводка для экрана диагностики."""
+    lines = []
+    for name, histogram in snapshot["histograms_ms"].items():
+        lines.append(f"{name}: n={histogram['count']} сред.={histogram['mean']:.2f} "
+                     f"p50≤{histogram['p50']:.2f} p95≤{histogram['p95']:.2f} макс.={histogram['max']:.2f}")
+    for name, outcome in snapshot["outcomes"].items():
+        lines.append(f"{name}: успешно {outcome['ok']}, ошибок {outcome['failed']} "
+                     f"({outcome['failure_rate']:.0%})")
+    return "\n".join(lines) if lines else "Замеров пока нет"
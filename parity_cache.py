@@ -0,0 +1,114 @@
+"""
+Кэш чётности недели на диске.
+
+Чётность меняется раз в неделю и в пределах семестра чередуется строго,
+поэтому достаточно один раз узнать сдвиг между номером недели (alarm_core.week_index)
+и чётностью на сайте – дальше чётность любой даты семестра вычисляется локально.
+Сеть нужна только по истечении TTL или с началом нового семестра, причём
+повторная проверка идёт условным запросом (ETag / Last-Modified).
+"""
+import datetime
+import json
+import os
+
+from alarm_core import parity_offset_for, week_type_on
+
+# Срок, после которого кэш перепроверяется по сети (в любом случае не дольше семестра)
+DEFAULT_TTL = datetime.timedelta(days=120)
+
+PARITY_BY_WEEK_TYPE = {"чётная": "even", "нечётная": "odd"}
+WEEK_TYPE_BY_PARITY = {"even": "чётная", "odd": "нечётная"}
+
+
+def semester_of(date):
+    """Осенний семестр – с сентября по январь, весенний – с февраля по август."""
+    if date.month >= 9:
+        return f"{date.year}-осень"
+    if date.month == 1:
+        return f"{date.year - 1}-осень"
+    return f"{date.year}-весна"
+
+
+class ParityCache:
+    def __init__(self, path, ttl=DEFAULT_TTL, fetch=None):
+        """
+        :param path: путь к JSON-файлу кэша
+        :param ttl: datetime.timedelta – как долго доверять кэшу без перепроверки
+        :param fetch: функция условного запроса (по умолчанию parser.fetch_week_parity_conditional)
+        """
+        self.path = path
+        self.ttl = ttl
+        if fetch is None:
+            from parser import fetch_week_parity_conditional as fetch
+        self._fetch = fetch
+        self.data = self.load()
+
+    def load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print("Не удалось сохранить кэш чётности:", e)
+
+    def parity_offset(self, date):
+        """Сдвиг чётности для даты или None, если для её семестра чётность ещё не известна."""
+        if self.data.get("semester") != semester_of(date):
+            return None
+        return self.data.get("parity_offset")
+
+    def week_parity(self, date):
+        """Чётность ("even"/"odd") даты, вычисленная без сети, или None."""
+        parity_offset = self.parity_offset(date)
+        if parity_offset is None:
+            return None
+        return PARITY_BY_WEEK_TYPE[week_type_on(date, parity_offset)]
+
+    def is_fresh(self, now):
+        if self.parity_offset(now.date()) is None:
+            return False
+        try:
+            checked_at = datetime.datetime.fromisoformat(self.data["checked_at"])
+        except (KeyError, ValueError):
+            return False
+        return now - checked_at < self.ttl
+
+    def fetch(self, timeout=5, now=None):
+        """
+        Чётность текущей недели: из кэша, если он свежий, иначе с сайта условным запросом.
+        Совместима с ParityFetcher. При ошибке сети возвращает вычисленное по кэшу значение (если есть).
+        """
+        now = now if now is not None else datetime.datetime.now()
+        today = now.date()
+        if self.is_fresh(now):
+            return self.week_parity(today)
+
+        known = self.parity_offset(today) is not None
+        status, parity, etag, last_modified = self._fetch(
+            etag=self.data.get("etag") if known else None,
+            last_modified=self.data.get("last_modified") if known else None,
+            timeout=timeout)
+        if status == "not_modified" or (status == "ok" and parity is None and known):
+            self.data["checked_at"] = now.isoformat()
+            self.save()
+        elif status == "ok" and parity in WEEK_TYPE_BY_PARITY:
+            self.data = {
+                "semester": semester_of(today),
+                "parity_offset": parity_offset_for(WEEK_TYPE_BY_PARITY[parity], today),
+                "checked_at": now.isoformat(),
+                "etag": etag,
+                "last_modified": last_modified,
+            }
+            self.save()
+        return self.week_parity(today)
@@ -0,0 +1,318 @@
+"""
+Общий локальный сервис чётности недели и страниц расписания.
+
+Когда в одной сети работает много копий будильника (киоски, компьютерный класс), каждая
+из них сама ходит на edu.sfu-kras.ru. Сервис делает это за всех: держит один пул соединений
+(requests.Session), объединяет одновременные запросы одной группы в один запрос к сайту
+(single-flight) и хранит ответы в памяти TTL секунд. Если сайт недоступен, отдаётся последний
+известный ответ, а неудача запоминается на ERROR_TTL, чтобы не нагружать сайт повторами.
+
+    GET /parity?group=...     -> {"group": "...", "parity": "even", "age": 12.5}  (ETag, 304)
+    GET /timetable?group=...  -> HTML страницы, как на сайте (ETag, 304)
+    GET /stats                -> счётчики запросов, попаданий в кэш и обращений к сайту
+
+Приложение и демон подключаются к сервису через service_fetch (вместо условного запроса к сайту),
+а /timetable подходит как base_url для функций parser.py.
+
+Запуск: python parity_service.py [--host 0.0.0.0] [--port 8765] [--upstream URL] [--ttl 600]
+"""
+import argparse
+import collections
+import hashlib
+import json
+import threading
+import time
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+from http_service import BackgroundHTTPServer, ServiceHandler
+from parser import DEFAULT_GROUP, TIMETABLE_BASE_URL, fetch_timetable_page, fetch_week_parity_conditional
+
+DEFAULT_PORT = 8765
+# Сколько секунд ответ сайта считается свежим
+DEFAULT_TTL = 600
+# Сколько секунд после неудачи не обращаться к сайту повторно
+ERROR_TTL = 30
+# Размер пула соединений с сайтом (одновременных запросов разных групп)
+POOL_SIZE = 8
+MAX_ENTRIES = 1024
+
+
+def make_session(pool_size=POOL_SIZE):
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class SingleFlight:
+    """Одновременные вызовы с одним ключом выполняют fn один раз, остальные ждут его результат."""
+
+    class _Call:
+        def __init__(self):
+            self.done = threading.Event()
+            self.result = None
+            self.error = None
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        """Возвращает (результат fn(), shared) – shared=True, если результат получен чужим вызовом."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = self._Call()
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+
+class TTLCache:
+    """Ответы в памяти: ключ -> (значение, время получения, срок). Устаревшие не удаляются, а помечаются."""
+
+    def __init__(self, clock=time.monotonic, max_entries=MAX_ENTRIES):
+        self.clock = clock
+        self.max_entries = max_entries
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """(значение, возраст в секундах, свежее ли) или None, если ключа нет."""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, stored_at, ttl = entry
+        age = self.clock() - stored_at
+        return value, age, age < ttl
+
+    def put(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (value, self.clock(), ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def touch(self, key, ttl):
+        """Продлевает срок записи (сайт ответил 304)."""
+        entry = self.get(key)
+        if entry is not None:
+            self.put(key, entry[0], ttl)
+
+    def extend(self, key, ttl):
+        """Оставляет запись свежей ещё ttl секунд, не меняя её возраст; если записи нет, запоминается None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._entries[key] = (None, self.clock(), ttl)
+            else:
+                value, stored_at, _ = entry
+                self._entries[key] = (value, stored_at, self.clock() - stored_at + ttl)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class ParityService:
+    def __init__(self, upstream=TIMETABLE_BASE_URL, ttl=DEFAULT_TTL, error_ttl=ERROR_TTL, timeout=5,
+                 session=None, clock=time.monotonic):
+        """
+        :param upstream: адрес страницы расписания (сайт или fixture_server для проверок)
+        :param ttl: сколько секунд ответ сайта считается свежим
+        :param error_ttl: сколько секунд после неудачи отдавать последний известный ответ без повторного запроса
+        :param session: requests.Session; по умолчанию создаётся с пулом на POOL_SIZE соединений
+        """
+        self.upstream = upstream
+        self.ttl = ttl
+        self.error_ttl = error_ttl
+        self.timeout = timeout
+        self.session = session if session is not None else make_session()
+        self.cache = TTLCache(clock)
+        self.stats = collections.Counter()
+        self._stats_lock = threading.Lock()
+        self._flight = SingleFlight()
+        self._etags = {}  # группа -> ETag страницы на сайте, для условной перепроверки
+
+    def count(self, name):
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def _lookup(self, key, fetch):
+        """Общий путь для чётности и страниц: кэш, затем один запрос к сайту на всех ожидающих."""
+        self.count("requests")
+        cached = self.cache.get(key)
+        if cached is not None and cached[2]:
+            self.count("hits")
+            return cached[0], cached[1]
+
+        def load():
+            # Между проверкой выше и этой точкой ответ мог принести только что завершившийся запрос
+            entry = self.cache.get(key)
+            if entry is None or not entry[2]:
+                self.count("upstream")
+                fetch()
+                entry = self.cache.get(key)
+            return entry
+
+        entry, shared = self._flight.do(key, load)
+        if shared:
+            self.count("coalesced")
+        if entry is None:
+            return None, None
+        return entry[0], entry[1]
+
+    def week_parity(self, group=DEFAULT_GROUP):
+        """(чётность "even"/"odd" или None, возраст ответа в секундах)."""
+        return self._lookup(("parity", group), lambda: self._fetch_parity(group))
+
+    def _fetch_parity(self, group):
+        key = ("parity", group)
+        cached = self.cache.get(key)
+        known = cached is not None and cached[0] is not None
+        status, parity, etag, _ = fetch_week_parity_conditional(
+            etag=self._etags.get(group) if known else None, timeout=self.timeout, group=group,
+            base_url=self.upstream, session=self.session)
+        if status == "not_modified" and known:
+            self.cache.touch(key, self.ttl)
+        elif status == "ok" and parity is not None:
+            self._etags[group] = etag
+            self.cache.put(key, parity, self.ttl)
+        else:
+            # Сайт недоступен или без баннера: прежний ответ (если был) отдаётся ещё error_ttl секунд
+            self.count("errors")
+            self.cache.extend(key, self.error_ttl)
+
+    def timetable_page(self, group=DEFAULT_GROUP):
+        """(HTML страницы расписания в байтах или None, возраст ответа в секундах)."""
+        return self._lookup(("timetable", group), lambda: self._fetch_page(group))
+
+    def _fetch_page(self, group):
+        key = ("timetable", group)
+        page = fetch_timetable_page(group, timeout=self.timeout, base_url=self.upstream, session=self.session)
+        if page:
+            self.cache.put(key, page.encode("utf-8"), self.ttl)
+        else:
+            self.count("errors")
+            self.cache.extend(key, self.error_ttl)
+
+    def snapshot(self):
+        with self._stats_lock:
+            stats = dict(self.stats)
+        stats["entries"] = len(self.cache)
+        return stats
+
+    def close(self):
+        self.session.close()
+
+
+# HTTP
+
+def _etag(body):
+    return '"%s"' % hashlib.sha1(body).hexdigest()
+
+
+class _Handler(ServiceHandler):
+    def do_GET(self):
+        service = self.server.service
+        url = urlsplit(self.path)
+        group = parse_qs(url.query).get("group", [DEFAULT_GROUP])[0]
+        path = url.path.rstrip("/")
+        if path == "/parity":
+            parity, age = service.week_parity(group)
+            body = json.dumps({"group": group, "parity": parity, "age": age}, ensure_ascii=False).encode("utf-8")
+            # ETag – от самого ответа без возраста, чтобы условный запрос получал 304, пока чётность та же
+            etag = _etag(f"{group}:{parity}".encode("utf-8")) if parity is not None else None
+            self._reply(200 if parity is not None else 502, body, "application/json; charset=utf-8", etag)
+        elif path == "/timetable":
+            page, age = service.timetable_page(group)
+            if page is None:
+                self._reply(502, "Сайт расписания недоступен".encode("utf-8"), "text/plain; charset=utf-8")
+            else:
+                self._reply(200, page, "text/html; charset=utf-8", _etag(page))
+        elif path == "/stats":
+            self._reply(200, json.dumps(service.snapshot()).encode("utf-8"), "application/json")
+        else:
+            self.send_error(404)
+
+    def handle_one_request(self):
+        try:
+            super().handle_one_request()
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True  # потоковый клиент закрывает соединение, как только нашёл баннер
+
+
+class ParityServer(BackgroundHTTPServer):
+    """HTTP-обёртка ParityService; как и benchmarks/fixture_server.py, работает в фоновом потоке."""
+
+    def __init__(self, service, host="127.0.0.1", port=DEFAULT_PORT):
+        super().__init__(service, _Handler, host, port)
+
+    def stop(self):
+        super().stop()
+        self.service.close()
+
+
+# Клиент
+
+def service_fetch(service_url, group=DEFAULT_GROUP, session=None):
+    """
+    Функция условного запроса чётности у сервиса – замена parser.fetch_week_parity_conditional
+    для ParityCache: fetch(etag=None, last_modified=None, timeout=5) -> (status, parity, etag, last_modified).
+    """
+    url = service_url.rstrip("/") + "/parity?" + urlencode({"group": group})
+
+    def fetch(etag=None, last_modified=None, timeout=5):
+        import requests
+
+        try:
+            response = (session or requests).get(url, headers={"If-None-Match": etag} if etag else {},
+                                                 timeout=timeout)
+            if response.status_code == 304:
+                return "not_modified", None, etag, last_modified
+            response.raise_for_status()
+            parity = response.json().get("parity")
+        except (requests.RequestException, ValueError) as e:
+            print("Ошибка при обращении к сервису чётности:", e)
+            return "error", None, etag, last_modified
+        return "ok", parity, response.headers.get("ETag"), None
+
+    return fetch
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Общий сервис чётности недели и страниц расписания")
+    parser.add_argument("--host", default="127.0.0.1", help="0.0.0.0 – принимать запросы из сети")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--upstream", default=TIMETABLE_BASE_URL, help="адрес страницы расписания")
+    parser.add_argument("--ttl", type=float, default=DEFAULT_TTL, help="сколько секунд ответ сайта свежий")
+    args = parser.parse_args(argv)
+
+    server = ParityServer(ParityService(args.upstream, ttl=args.ttl), args.host, args.port)
+    print("Сервис чётности:", server.url)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
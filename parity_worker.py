@@ -0,0 +1,92 @@
+import threading
+
+from background import BackgroundWorker
+
+
+class ParityFetcher(BackgroundWorker):
+    """
+    Запрашивает чётность недели в фоновом потоке, чтобы сеть не блокировала интерфейс.
+
+    Результат передаётся в on_result через post (см. background.py). После неудачи запрос
+    повторяется через call_later с экспоненциально растущей паузой.
+    """
+
+    def __init__(self, fetch, on_result, post=None, call_later=None, timeout=5,
+                 initial_backoff=30, max_backoff=3600):
+        """
+        :param fetch: функция получения чётности, принимает timeout и возвращает "even", "odd" или None
+        :param on_result: обработчик результата (вызывается в главном цикле)
+        :param post: post(fn, *args) – вызвать fn в главном цикле; по умолчанию вызывается сразу
+        :param call_later: call_later(delay, fn) – отложенный вызов, возвращает объект с методом cancel()
+        :param timeout: таймаут сетевого запроса, сек
+        :param initial_backoff: пауза перед первым повтором, сек
+        :param max_backoff: максимальная пауза между повторами, сек
+        """
+        super().__init__(post, name="parity")
+        self.fetch = fetch
+        self.on_result = on_result
+        self.call_later = call_later
+        self.timeout = timeout
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.backoff = initial_backoff
+        self._lock = threading.Lock()
+        self._generation = 0  # увеличивается при отмене, чтобы отбросить устаревшие результаты
+        self._future = None
+        self._retry = None
+
+    @property
+    def in_flight(self):
+        return self._future is not None and not self._future.done()
+
+    def request(self):
+        """Запускает получение чётности, если оно ещё не выполняется."""
+        with self._lock:
+            if self.in_flight:
+                return False
+            self._cancel_retry()
+            generation = self._generation
+            self._future = self._executor.submit(self._run, generation)
+        return True
+
+    def cancel(self):
+        """Отменяет текущий запрос и запланированный повтор; пришедший позже результат будет отброшен."""
+        with self._lock:
+            self._generation += 1
+            self._cancel_retry()
+            if self._future is not None:
+                self._future.cancel()
+                self._future = None
+
+    def _cancel_retry(self):
+        if self._retry is not None:
+            self._retry.cancel()
+            self._retry = None
+
+    def _run(self, generation):
+        try:
+            result = self.fetch(timeout=self.timeout)
+        except Exception as e:
+            print("Ошибка при получении чётности недели:", e)
+            result = None
+        self.post(self._deliver, generation, result)
+
+    def _deliver(self, generation, result):
+        delay = None
+        with self._lock:
+            if generation != self._generation:
+                return
+            if result is None:
+                delay = self.backoff
+                self.backoff = min(self.backoff * 2, self.max_backoff)
+            else:
+                self.backoff = self.initial_backoff
+        if delay is not None and self.call_later is not None:
+            # Повтор планируется без замка: call_later может вызвать request сразу и в этом же потоке
+            retry = self.call_later(delay, self.request)
+            with self._lock:
+                if generation == self._generation:
+                    self._retry = retry
+                elif retry is not None:
+                    retry.cancel()
+        self.on_result(result)
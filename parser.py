@@ -1,28 +1,180 @@
-import requests
-from bs4 import BeautifulSoup
+# requests и bs4 импортируются внутри функций: они нужны раз в семестр, а их загрузка заметно замедляет старт
+import codecs
+import html
 import re
+from urllib.parse import urlencode
 
-def fetch_week_parity():
-    url = "https://edu.sfu-kras.ru/timetable?group=КИ23-16%2F1б+%282+подгруппа%29"
+TIMETABLE_BASE_URL = "https://edu.sfu-kras.ru/timetable"
+DEFAULT_GROUP = "КИ23-16/1б (2 подгруппа)"
+
+
+def timetable_url(group=DEFAULT_GROUP, base_url=TIMETABLE_BASE_URL):
+    """base_url можно заменить, например на локальный сервер с сохранёнными страницами."""
+    return base_url + "?" + urlencode({"group": group})
+
+
+TIMETABLE_URL = timetable_url()
+
+# Регулярное выражение ищет строки вида "Идёт чётная неделя" или "Идёт нечётная неделя"
+PARITY_PATTERN = re.compile(r'Идёт\s+(ч[её]тная|неч[её]тная)\s+неделя', re.IGNORECASE)
+TAG_PATTERN = re.compile(r'<[^>]*>')
+PARTIAL_ENTITY_PATTERN = re.compile(r'&#?\w{0,31}$')
+
+# Размер порции при потоковом чтении страницы
+CHUNK_SIZE = 8192
+# Сколько символов текста переносится между порциями, чтобы не потерять баннер на их стыке
+SCAN_OVERLAP = 64
+
+
+def _parity_from_match(match):
+    word = match.group(1).lower()
+    if "неч" in word:
+        return "odd"
+    elif "чёт" in word or "чет" in word:
+        return "even"
+    return None
+
+
+def parse_week_parity(page):
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(page, 'html.parser')
+    for text in soup.stripped_strings:
+        match = PARITY_PATTERN.search(text)
+        if match:
+            return _parity_from_match(match)
+    return None
+
+
+class ParityScanner:
+    """Инкрементальный поиск баннера чётности в HTML: теги вырезаются на лету, дерево не строится."""
+
+    def __init__(self):
+        self._pending = ""  # незакрытый тег в конце предыдущей порции
+        self._tail = ""  # хвост текста предыдущей порции
+
+    def feed(self, text):
+        text = self._pending + text
+        cut = text.rfind("<")
+        if cut != -1 and text.find(">", cut) == -1:
+            text, self._pending = text[:cut], text[cut:]
+        else:
+            # Незаконченная ссылка на символ (&nb…) ждёт следующей порции, иначе unescape её не раскроет
+            entity = PARTIAL_ENTITY_PATTERN.search(text)
+            self._pending = entity.group() if entity else ""
+            if entity:
+                text = text[:entity.start()]
+        window = self._tail + html.unescape(TAG_PATTERN.sub(" ", text))
+        match = PARITY_PATTERN.search(window)
+        if match:
+            return _parity_from_match(match)
+        self._tail = window[-SCAN_OVERLAP:]
+        return None
+
+
+def scan_week_parity(chunks, encoding="utf-8"):
+    """
+    Ищет баннер чётности в потоке байтов и прекращает чтение, как только нашёл его.
+
+    :param chunks: итерируемые порции байтов (например, response.iter_content())
+    :return: кортеж (parity, body), где body – все прочитанные байты, если баннер не найден, иначе None
+    """
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    scanner = ParityScanner()
+    received = []
+    for chunk in chunks:
+        received.append(chunk)
+        parity = scanner.feed(decoder.decode(chunk))
+        if parity is not None:
+            return parity, None
+    return None, b"".join(received)
+
+
+def _response_encoding(response):
+    # Для text/html без charset requests подставляет ISO-8859-1, хотя сайт отдаёт UTF-8
+    if response.encoding and response.encoding.lower() != "iso-8859-1":
+        return response.encoding
+    return "utf-8"
+
+
+def _check_status(response):
+    """raise_for_status, который закрывает ответ с ошибкой: иначе потоковый ответ держит соединение пула."""
     try:
-        response = requests.get(url, timeout=5)
         response.raise_for_status()
+    except BaseException:
+        response.close()
+        raise
+
+
+def read_week_parity(response):
+    """Потоковое чтение ответа (requests.get(..., stream=True)) с досрочным закрытием соединения."""
+    encoding = _response_encoding(response)
+    try:
+        parity, body = scan_week_parity(response.iter_content(CHUNK_SIZE), encoding)
+    finally:
+        response.close()
+    if parity is None and body:
+        # Баннер не найден при потоковом просмотре – пробуем полный разбор
+        parity = parse_week_parity(body.decode(encoding, errors="replace"))
+    return parity
+
+
+def fetch_week_parity(timeout=5, stream=True, group=DEFAULT_GROUP, base_url=TIMETABLE_BASE_URL, session=None):
+    """session – requests.Session для повторного использования соединений (по умолчанию без пула)."""
+    import requests
+
+    try:
+        response = (session or requests).get(timetable_url(group, base_url), timeout=timeout, stream=stream)
+        _check_status(response)
+        if stream:
+            return read_week_parity(response)
     except requests.RequestException as e:
         print("Ошибка при получении страницы:", e)
         return None
+    return parse_week_parity(response.text)
+
+
+def fetch_week_parity_conditional(etag=None, last_modified=None, timeout=5, group=DEFAULT_GROUP,
+                                  base_url=TIMETABLE_BASE_URL, session=None):
+    """
+    Условный запрос страницы расписания (If-None-Match / If-Modified-Since).
+
+    :return: кортеж (status, parity, etag, last_modified), где status – "ok", "not_modified" или "error"
+    """
+    import requests
+
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    try:
+        response = (session or requests).get(timetable_url(group, base_url), headers=headers, timeout=timeout,
+                                             stream=True)
+        if response.status_code == 304:
+            response.close()
+            return "not_modified", None, etag, last_modified
+        _check_status(response)
+        parity = read_week_parity(response)
+    except requests.RequestException as e:
+        print("Ошибка при получении страницы:", e)
+        return "error", None, etag, last_modified
+    return "ok", parity, response.headers.get("ETag"), response.headers.get("Last-Modified")
+
+
+def fetch_timetable_page(group=DEFAULT_GROUP, timeout=10, base_url=TIMETABLE_BASE_URL, session=None):
+    """HTML страницы расписания группы целиком или None при ошибке."""
+    import requests
+
+    try:
+        response = (session or requests).get(timetable_url(group, base_url), timeout=timeout)
+        response.raise_for_status()
+    except requests.RequestException as e:
+        print("Ошибка при получении страницы:", e)
+        return None
+    response.encoding = _response_encoding(response)
+    return response.text
 
-    soup = BeautifulSoup(response.text, 'html.parser')
-    # Регулярное выражение ищет строки вида "Идёт чётная неделя" или "Идёт нечётная неделя"
-    pattern = re.compile(r'Идёт\s+(ч[её]тная|неч[её]тная)\s+неделя', re.IGNORECASE)
-    for text in soup.stripped_strings:
-        match = pattern.search(text)
-        if match:
-            word = match.group(1).lower()
-            if "неч" in word:
-                return "odd"
-            elif "чёт" in word:
-                return "even"
-    return None
 
 if __name__ == "__main__":
     parity = fetch_week_parity()
@@ -0,0 +1,112 @@
+import datetime
+import heapq
+import itertools
+
+from alarm_core import next_occurrence
+from timer_wheel import TimerWheel
+
+
+class AlarmScheduler:
+    """
+    Очередь ближайших срабатываний будильников (heapq).
+
+    Каждый будильник представлен в куче одной записью [время, порядковый номер, будильник].
+    При изменении будильника старая запись помечается удалённой и добавляется новая,
+    поэтому пересчитывается только изменённый будильник.
+
+    Разовые срабатывания (отложенный звонок) лежат отдельно в колесе таймеров и не меняют
+    недельное расписание будильника.
+    """
+
+    def __init__(self, parity_offset=None, now=None):
+        self.parity_offset = parity_offset  # см. alarm_core.parity_offset_for
+        self._heap = []
+        self._entries = {}  # будильник -> запись в куче
+        self._counter = itertools.count()
+        self.last_check = now if now is not None else datetime.datetime.now()
+        self.timers = TimerWheel(self.last_check)
+        self._once = {}  # будильник -> Timer разового срабатывания
+
+    def __len__(self):
+        return len(self._entries)
+
+    def reindex(self, alarm, after=None):
+        """Пересчитывает ближайшее срабатывание одного будильника (после добавления или изменения)."""
+        self._discard(alarm)
+        fire_dt = next_occurrence(alarm, after if after is not None else self.last_check, self.parity_offset)
+        if fire_dt is None:
+            return None
+        entry = [fire_dt, next(self._counter), alarm]
+        self._entries[alarm] = entry
+        heapq.heappush(self._heap, entry)
+        return fire_dt
+
+    def remove(self, alarm):
+        """Убирает будильник из очереди вместе с разовым срабатыванием."""
+        self._discard(alarm)
+        self.cancel_once(alarm)
+
+    def _discard(self, alarm):
+        entry = self._entries.pop(alarm, None)
+        if entry is not None:
+            entry[-1] = None
+
+    def schedule_once(self, alarm, when):
+        """Разовое срабатывание будильника в момент when (заменяет прежнее разовое)."""
+        self.cancel_once(alarm)
+        self._once[alarm] = self.timers.schedule(when, alarm)
+        return when
+
+    def cancel_once(self, alarm):
+        timer = self._once.pop(alarm, None)
+        if timer is not None:
+            self.timers.cancel(timer)
+
+    def pending_once(self):
+        """Ожидающие разовые срабатывания: список (будильник, время)."""
+        return [(alarm, timer.when) for alarm, timer in self._once.items()]
+
+    def reindex_all(self, alarms):
+        """Полный пересчёт, например после смены чётности недели. Разовые срабатывания сохраняются."""
+        self._heap = []
+        self._entries = {}
+        for alarm in alarms:
+            self.reindex(alarm)
+
+    def peek(self):
+        """Ближайшее срабатывание: (время, будильник) или None."""
+        while self._heap and self._heap[0][-1] is None:
+            heapq.heappop(self._heap)
+        upcoming = (self._heap[0][0], self._heap[0][-1]) if self._heap else None
+        timer = self.timers.peek()
+        if timer is not None:
+            deadline = self.timers.next_deadline()
+            if upcoming is None or deadline < upcoming[0]:
+                upcoming = deadline, timer.payload
+        return upcoming
+
+    def next_deadline(self):
+        upcoming = self.peek()
+        return upcoming[0] if upcoming is not None else None
+
+    def pop_due(self, now):
+        """
+        Возвращает будильники, срок которых наступил с момента прошлой проверки.
+        Каждый будильник возвращается один раз, даже если за время простоя пропущено несколько срабатываний.
+        """
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            fire_dt, _, alarm = heapq.heappop(self._heap)
+            if alarm is None:
+                continue
+            del self._entries[alarm]
+            due.append((alarm, fire_dt))
+        self.last_check = now
+        for alarm, _ in due:
+            self.reindex(alarm, now)
+        fired = {alarm for alarm, _ in due}
+        for timer in self.timers.advance(now):
+            del self._once[timer.payload]
+            if timer.payload not in fired:  # отложенный звонок совпал с плановым
+                due.append((timer.payload, timer.when))
+        return due
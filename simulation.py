@@ -0,0 +1,222 @@
+"""
+Моделирование работы будильников на недели и месяцы вперёд без Kivy и без ожидания.
+
+Время идёт по SimulatedClock и перескакивает сразу к ближайшему сроку планировщика
+или запланированного события (смена чётности, действие пользователя). Каждое срабатывание
+и ответ на него записываются в trace – список TraceEvent, по которому удобно проверять
+сценарии. Если пользователь не отвечает на звонки (respond=None) и отложенных звонков нет,
+отрезки между событиями считаются пакетно (alarm_core.occurrences_between), без обхода
+срабатываний по одному:
+
+    simulation = Simulation(alarms, start=datetime.datetime(2024, 9, 2), week_type="нечётная",
+                            respond=snooze_then_dismiss(2))
+    simulation.set_week_type(datetime.datetime(2025, 2, 10), "чётная")  # новый семестр
+    simulation.downtime(datetime.datetime(2024, 12, 30), datetime.datetime(2025, 1, 9))  # телефон выключен
+    simulation.run_until(datetime.datetime(2025, 6, 30))
+    fired = [event for event in simulation.trace if event.kind == FIRED]
+
+Запуск для сохранённых будильников: python simulation.py --weeks 18 --week-type чётная
+"""
+import argparse
+import collections
+import datetime
+import heapq
+import itertools
+import json
+import os
+
+from alarm_core import encode_alarms, from_epoch_minutes, occurrences_between, parity_offset_for, week_type_on
+from clocks import SimulatedClock
+from scheduler import AlarmScheduler
+
+FIRED = "fired"
+SNOOZED = "snoozed"
+DISMISSED = "dismissed"
+PARITY = "parity"
+DEFAULT_SNOOZE_MINUTES = 5
+_JUST_BEFORE = datetime.timedelta(microseconds=1)
+
+# at – момент события; scheduled – плановое время срабатывания (для FIRED), иначе None;
+# detail – время повторного звонка (SNOOZED) или новая чётность (PARITY)
+TraceEvent = collections.namedtuple("TraceEvent", "at kind alarm_id scheduled detail")
+
+
+def snooze_then_dismiss(snoozes):
+    """Ответ пользователя: отложить snoozes раз подряд, затем выключить будильник."""
+    def respond(alarm, at, snoozed):
+        return SNOOZED if snoozed < snoozes else DISMISSED
+    return respond
+
+
+def snooze_times(snoozes):
+    """Ответ пользователя: отложить snoozes раз подряд, затем просто проснуться (будильник остаётся включённым)."""
+    def respond(alarm, at, snoozed):
+        return SNOOZED if snoozed < snoozes else None
+    return respond
+
+
+class Simulation:
+    def __init__(self, alarms, start, week_type=None, respond=None, snooze_minutes=DEFAULT_SNOOZE_MINUTES,
+                 clock=None, keep_trace=True):
+        """
+        :param alarms: будильники (изменяются так же, как в приложении: last_triggered, active)
+        :param start: datetime.datetime – начало моделирования
+        :param week_type: "чётная"/"нечётная" – чётность недели start; None – неизвестна
+        :param respond: respond(alarm, at, snoozed) -> SNOOZED, DISMISSED или None (будильник просто отзвонил);
+                        snoozed – сколько раз подряд его уже отложили
+        :param clock: SimulatedClock; по умолчанию создаётся новый на момент start
+        :param keep_trace: False – только счётчики (для длинных прогонов)
+        """
+        self.clock = clock if clock is not None else SimulatedClock(start)
+        self.respond = respond
+        self.snooze = datetime.timedelta(minutes=snooze_minutes)
+        self.keep_trace = keep_trace
+        self.trace = []
+        self.counts = collections.Counter()
+        self.alarms = list(alarms)
+        self.scheduler = AlarmScheduler(parity_offset_for(week_type, start.date()), now=self.clock.now())
+        self.scheduler.reindex_all(self.alarms)
+        self._snoozed = {}  # будильник -> сколько раз подряд отложен
+        self._events = []  # куча (время, порядковый номер, fn)
+        self._counter = itertools.count()
+        self._off_until = None  # устройство выключено до этого момента (downtime)
+
+    def at(self, when, fn):
+        """Выполнить fn() в момент when модельного времени (например, изменить будильник)."""
+        heapq.heappush(self._events, (when, next(self._counter), fn))
+
+    def set_week_type(self, when, week_type):
+        """С момента when неделя считается week_type (новый семестр, исправление на сайте)."""
+        self.at(when, lambda: self._apply_week_type(week_type))
+
+    def downtime(self, start, end):
+        """
+        Устройство выключено с start до end. Пропущенные звонки срабатывают при включении,
+        каждый будильник один раз (TraceEvent.scheduled – первое пропущенное время), как у демона после сна.
+        """
+        self.at(start, lambda: setattr(self, "_off_until", end))
+        self.at(end, lambda: setattr(self, "_off_until", None))
+
+    def _apply_week_type(self, week_type):
+        now = self.clock.now()
+        parity_offset = parity_offset_for(week_type, now.date())
+        self._record(now, PARITY, None, None, week_type)
+        if parity_offset != self.scheduler.parity_offset:
+            self.scheduler.parity_offset = parity_offset
+            self.scheduler.last_check = now
+            self.scheduler.reindex_all(self.alarms)
+
+    def week_type(self):
+        return week_type_on(self.clock.today(), self.scheduler.parity_offset)
+
+    def run_until(self, end):
+        """Проходит модельное время до end включительно; возвращает число срабатываний."""
+        scheduler, events, clock = self.scheduler, self._events, self.clock
+        fired = self.counts[FIRED]
+        while True:
+            deadline = scheduler.next_deadline() if self._off_until is None else None
+            if events and (deadline is None or events[0][0] <= deadline):
+                deadline = events[0][0]
+            if deadline is None or deadline > end:
+                break
+            if self.respond is None and not len(scheduler.timers) and self._off_until is None:
+                # Срабатывания до ближайшего события ни на что не влияют – считаем их пакетом
+                batch_end = min(end, events[0][0] - _JUST_BEFORE) if events else end
+                if batch_end > clock.current:
+                    self._fire_batch(batch_end)
+                    continue
+            if deadline > clock.current:
+                clock.set(deadline)
+            while events and events[0][0] <= deadline:
+                heapq.heappop(events)[2]()
+            if self._off_until is not None:
+                continue
+            for alarm, fire_dt in scheduler.pop_due(deadline):
+                self._fire(alarm, fire_dt, deadline)
+        if end > clock.current:
+            clock.set(end)
+        return self.counts[FIRED] - fired
+
+    def run_for(self, delta=None, **kwargs):
+        return self.run_until(self.clock.now() + (delta if delta is not None else datetime.timedelta(**kwargs)))
+
+    def _fire_batch(self, until):
+        """Все срабатывания в (сейчас, until] без ответа пользователя; часы переводятся на until."""
+        indices, moments = occurrences_between(encode_alarms(self.alarms), self.clock.now(), until,
+                                               self.scheduler.parity_offset)
+        if hasattr(indices, "tolist"):  # numpy.ndarray – в списки, чтобы обход шёл по обычным int
+            indices, moments = indices.tolist(), moments.tolist()
+        self.counts[FIRED] += len(indices)
+        if self.keep_trace:
+            alarms = self.alarms
+            for index, moment in zip(indices, moments):
+                at = from_epoch_minutes(moment)
+                self.trace.append(TraceEvent(at, FIRED, alarms[index].id, at, None))
+        # В dict остаётся последнее (самое позднее) срабатывание каждого будильника
+        for index, moment in dict(zip(indices, moments)).items():
+            self.alarms[index].last_triggered = from_epoch_minutes(moment)
+        self.clock.set(until)
+        self.scheduler.last_check = until
+        self.scheduler.reindex_all(self.alarms)
+
+    def _fire(self, alarm, fire_dt, now):
+        alarm.last_triggered = now
+        self._record(now, FIRED, alarm, fire_dt, None)
+        action = self.respond(alarm, now, self._snoozed.get(alarm, 0)) if self.respond is not None else None
+        if action == SNOOZED:
+            self._snoozed[alarm] = self._snoozed.get(alarm, 0) + 1
+            again = self.scheduler.schedule_once(alarm, now + self.snooze)
+            self._record(now, SNOOZED, alarm, None, again)
+            return
+        self._snoozed.pop(alarm, None)
+        if action == DISMISSED:
+            alarm.active = False
+            self.scheduler.remove(alarm)
+            self._record(now, DISMISSED, alarm, None, None)
+
+    def _record(self, at, kind, alarm, scheduled, detail):
+        self.counts[kind] += 1
+        if self.keep_trace:
+            self.trace.append(TraceEvent(at, kind, alarm.id if alarm is not None else None, scheduled, detail))
+
+
+def trace_to_json(event):
+    return json.dumps({"at": event.at.isoformat(), "kind": event.kind, "alarm_id": event.alarm_id,
+                       "scheduled": event.scheduled.isoformat() if event.scheduled is not None else None,
+                       "detail": event.detail.isoformat() if isinstance(event.detail, datetime.datetime)
+                       else event.detail}, ensure_ascii=False)
+
+
+def main():
+    from daemon import DEFAULT_DATA_DIR
+    from storage import AlarmStore
+
+    parser = argparse.ArgumentParser(description="Моделирование срабатываний сохранённых будильников")
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR, help="каталог с alarms.db")
+    parser.add_argument("--start", type=datetime.datetime.fromisoformat, help="начало, ISO (по умолчанию – сейчас)")
+    parser.add_argument("--weeks", type=int, default=18)
+    parser.add_argument("--week-type", choices=["чётная", "нечётная"], help="чётность недели начала")
+    parser.add_argument("--snoozes", type=int, default=0, help="сколько раз откладывать каждый звонок")
+    parser.add_argument("--trace", help="записать события в файл (JSON по строке)")
+    args = parser.parse_args()
+
+    store = AlarmStore(os.path.join(args.data_dir, "alarms.db"))
+    alarms = store.load()
+    store.close()
+    start = args.start or datetime.datetime.now()
+    simulation = Simulation(alarms, start, args.week_type,
+                            respond=snooze_times(args.snoozes) if args.snoozes else None)
+    per_week = collections.Counter()
+    for week in range(args.weeks):
+        per_week[week] = simulation.run_for(weeks=1)
+    for week, fired in sorted(per_week.items()):
+        print(f"неделя {week + 1:>3}: {fired} срабатываний")
+    print(dict(simulation.counts))
+    if args.trace:
+        with open(args.trace, "w", encoding="utf-8") as f:
+            for event in simulation.trace:
+                f.write(trace_to_json(event) + "\n")
+
+
+if __name__ == "__main__":
+    main()
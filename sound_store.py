@@ -0,0 +1,228 @@
+"""
+Библиотека звуков пользователя: копии выбранных файлов в каталоге приложения.
+
+Выбранный при редактировании будильника файл не используется с того места, где он лежит:
+он копируется в библиотеку и приводится к виду, который быстро запускается, – WAV, моно,
+22 050 Гц, 16 бит, без тишины в начале и в конце и не длиннее MAX_SECONDS. Имя копии –
+SHA-256 содержимого исходного файла, поэтому файл, выбранный для многих будильников
+(или под разными именами), хранится один раз.
+
+Перекодирует ffmpeg, если он установлен. Без него 16-битный WAV обрезается средствами
+стандартной библиотеки, а остальные форматы копируются как есть. Файл, в котором одна
+тишина, не импортируется (ValueError): будильник с таким звуком молчал бы.
+
+SoundImporter выполняет импорт в пуле потоков (background.BackgroundWorker).
+"""
+import array
+import hashlib
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import wave
+
+from background import BackgroundWorker
+
+MAX_SECONDS = 60  # длина звука в библиотеке (будильник всё равно играет его по кругу)
+MAX_SOURCE_SECONDS = 600  # дальше этого исходный файл не читается
+TARGET_RATE = 22050
+SILENCE_DB = -50
+SILENCE_LEVEL = 100  # порог тишины для 16-битных отсчётов, примерно -50 дБ
+HASH_CHUNK = 1 << 20
+DEFAULT_WORKERS = 2
+SILENT_MESSAGE = "в звуке одна тишина"
+
+
+def file_digest(path, on_chunk=None):
+    """SHA-256 содержимого файла; on_chunk(число байт) вызывается после каждой прочитанной порции."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            digest.update(chunk)
+            if on_chunk is not None:
+                on_chunk(len(chunk))
+    return digest.hexdigest()
+
+
+def ffmpeg_command(source, target, ffmpeg="ffmpeg"):
+    # Тишина в конце срезается тем же фильтром на развёрнутом звуке
+    trim = f"silenceremove=start_periods=1:start_threshold={SILENCE_DB}dB"
+    return [ffmpeg, "-v", "error", "-y", "-t", str(MAX_SOURCE_SECONDS), "-i", source, "-vn",
+            "-af", f"{trim},areverse,{trim},areverse", "-t", str(MAX_SECONDS),
+            "-ac", "1", "-ar", str(TARGET_RATE), "-c:a", "pcm_s16le", "-f", "wav", target]
+
+
+def _loud(samples, indices):
+    return next((i for i in indices if samples[i] > SILENCE_LEVEL or samples[i] < -SILENCE_LEVEL), None)
+
+
+def normalize_wav(source, target):
+    """
+    Обрезает тишину по краям и длину 16-битного WAV без ffmpeg (частота и число каналов не меняются).
+    Возвращает False, если формат не подходит (другая разрядность, сжатый WAV).
+    ValueError – если в файле одна тишина: такой будильник ничего бы не сыграл.
+    """
+    try:
+        with wave.open(source, "rb") as f:
+            channels, width, rate = f.getnchannels(), f.getsampwidth(), f.getframerate()
+            if width != 2:
+                return False
+            frames = f.readframes(min(f.getnframes(), rate * MAX_SOURCE_SECONDS))
+    except (wave.Error, EOFError):
+        return False
+    samples = array.array("h", frames)
+    if sys.byteorder == "big":
+        samples.byteswap()
+    first = _loud(samples, range(len(samples)))
+    if first is None:
+        raise ValueError(SILENT_MESSAGE)
+    last = _loud(samples, range(len(samples) - 1, first - 1, -1)) + 1
+    first -= first % channels
+    last += -last % channels
+    last = min(last, first + rate * channels * MAX_SECONDS)
+    with wave.open(target, "wb") as out:
+        out.setnchannels(channels)
+        out.setsampwidth(width)
+        out.setframerate(rate)
+        out.writeframes(frames[first * width:last * width])
+    return True
+
+
+class SoundStore:
+    """Каталог звуков, названных по содержимому исходного файла: <sha256>.wav (или исходное расширение)."""
+
+    def __init__(self, directory, ffmpeg=None):
+        """
+        :param ffmpeg: путь к ffmpeg; по умолчанию ищется в PATH, "" – не перекодировать
+        """
+        self.directory = directory
+        self.ffmpeg = ffmpeg if ffmpeg is not None else (shutil.which("ffmpeg") or "")
+        self._assets = None  # sha256 -> имя файла в каталоге
+        self._lock = threading.Lock()
+        self._digest_locks = {}  # один и тот же файл, выбранный дважды подряд, обрабатывается один раз
+
+    def _index(self):
+        with self._lock:
+            if self._assets is None:
+                self._assets = {}
+                try:
+                    for name in os.listdir(self.directory):
+                        digest, ext = os.path.splitext(name)
+                        if len(digest) == 64 and ext != ".tmp":
+                            self._assets[digest] = name
+                except OSError:
+                    pass
+            return self._assets
+
+    def find(self, digest):
+        name = self._index().get(digest)
+        return os.path.join(self.directory, name) if name is not None else None
+
+    def __len__(self):
+        return len(self._index())
+
+    def add(self, path, on_chunk=None, cancelled=None):
+        """
+        Копирует файл в библиотеку (или находит уже скопированный).
+        :return: (путь в библиотеке, True – если файл добавлен, False – если такой уже был)
+        """
+        digest = file_digest(path, on_chunk)
+        with self._lock:
+            digest_lock = self._digest_locks.setdefault(digest, threading.Lock())
+        with digest_lock:
+            existing = self.find(digest)
+            if existing is not None:
+                return existing, False
+            if cancelled is not None and cancelled.is_set():
+                raise InterruptedError("отменено")
+            os.makedirs(self.directory, exist_ok=True)
+            tmp = os.path.join(self.directory, digest + ".tmp")
+            try:
+                ext = self._normalize(path, tmp)
+            except Exception:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+                raise
+            name = digest + ext
+            os.replace(tmp, os.path.join(self.directory, name))
+            self._index()[digest] = name
+        return os.path.join(self.directory, name), True
+
+    def _normalize(self, source, tmp):
+        """Записывает tmp; возвращает расширение итогового файла. ValueError – звук из одной тишины."""
+        if self.ffmpeg:
+            completed = subprocess.run(ffmpeg_command(source, tmp, self.ffmpeg), stdin=subprocess.DEVNULL,
+                                       capture_output=True, text=True)
+            if completed.returncode == 0:
+                try:
+                    with wave.open(tmp, "rb") as f:
+                        frames = f.getnframes()
+                except (wave.Error, EOFError) as e:
+                    print("ffmpeg записал нечитаемый WAV, звук копируется как есть:", e)
+                else:
+                    # После обрезки тишины от такого файла ничего не остаётся
+                    if not frames:
+                        raise ValueError(SILENT_MESSAGE)
+                    return ".wav"
+            else:
+                print("ffmpeg не смог перекодировать звук:", completed.stderr.strip()[-500:])
+        ext = os.path.splitext(source)[1].lower()
+        if ext == ".wav" and normalize_wav(source, tmp):
+            return ".wav"
+        shutil.copyfile(source, tmp)
+        return ext
+
+
+class SoundImporter(BackgroundWorker):
+    """Импорт звуков в библиотеку в пуле потоков; обработчики вызываются через post (см. background.py)."""
+
+    def __init__(self, store, post=None, workers=DEFAULT_WORKERS):
+        super().__init__(post, workers, "sound-import")
+        self.store = store
+
+    def import_files(self, paths, on_done=None, on_progress=None):
+        """
+        Импортирует файлы параллельно.
+        on_progress(доля 0..1) – по всем файлам вместе (чтение для хэша – первая половина работы);
+        on_done(results) – список (исходный путь, путь в библиотеке или None, ошибка или None) в порядке paths.
+        """
+        self._cancelled.clear()
+        paths = list(paths)
+        sizes = []
+        for path in paths:
+            try:
+                sizes.append(os.path.getsize(path))
+            except OSError:
+                sizes.append(0)
+        progress = self.progress(on_progress, sum(sizes))
+        results = [None] * len(paths)
+        remaining = [len(paths)]
+        lock = threading.Lock()
+
+        def run(number, path, size):
+            def on_chunk(length):
+                if self._cancelled.is_set():
+                    raise InterruptedError("отменено")
+                progress.advance(length / 2)
+
+            try:
+                asset, _ = self.store.add(path, on_chunk, self._cancelled)
+                results[number] = (path, asset, None)
+            except (OSError, ValueError, subprocess.SubprocessError) as e:  # InterruptedError – тоже OSError
+                results[number] = (path, None, str(e))
+            finally:
+                # Даже непредвиденная ошибка не должна оставить окно хода работы открытым навсегда
+                if results[number] is None:
+                    results[number] = (path, None, "не удалось импортировать звук")
+                progress.advance(size / 2)
+                with lock:
+                    remaining[0] -= 1
+                    finished = not remaining[0]
+                if finished and on_done is not None:
+                    self.post(on_done, results)
+
+        if not paths and on_done is not None:
+            self.post(on_done, results)
+        for number, (path, size) in enumerate(zip(paths, sizes)):
+            self._executor.submit(run, number, path, size)
@@ -0,0 +1,135 @@
+"""
+Звуки будильников: поиск файла, кэш загруженных звуков и запасной сигнал.
+
+Звук для ближайшего будильника загружается заранее, поэтому в момент срабатывания
+не тратится время на чтение и декодирование файла. Если файл не найден или не
+загружается, играет сгенерированный запасной сигнал, а не тишина.
+"""
+import math
+import os
+import struct
+import time
+import wave
+from collections import OrderedDict, deque
+
+# Каталог со встроенными звуками
+SOUNDS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Sounds")
+
+# Сколько загруженных звуков держать в памяти
+DEFAULT_CACHE_SIZE = 4
+# Параметры запасного сигнала
+FALLBACK_RATE = 22050
+FALLBACK_FREQUENCY = 880
+FALLBACK_BEEP = 0.25  # длительность гудка и паузы, сек
+
+
+class SoundResolver:
+    """Находит звуковой файл: путь как есть или встроенный звук из Sounds/ без учёта регистра."""
+
+    def __init__(self, directory=SOUNDS_DIR):
+        self.directory = directory
+        self._index = None
+
+    def _bundled(self):
+        # Каталог сканируется один раз
+        if self._index is None:
+            self._index = {}
+            try:
+                for name in os.listdir(self.directory):
+                    self._index[name.lower()] = os.path.join(self.directory, name)
+            except OSError:
+                pass
+        return self._index
+
+    def resolve(self, path):
+        """Абсолютный путь к существующему файлу или None."""
+        if not path:
+            return None
+        if os.path.isfile(path):
+            return os.path.abspath(path)
+        return self._bundled().get(os.path.basename(path).lower())
+
+
+def write_fallback_tone(path):
+    """Записывает WAV с тремя короткими гудками (чистый синус, 16 бит, моно)."""
+    beep = int(FALLBACK_RATE * FALLBACK_BEEP)
+    frames = bytearray()
+    for _ in range(3):
+        for i in range(beep):
+            frames += struct.pack("<h", int(12000 * math.sin(2 * math.pi * FALLBACK_FREQUENCY * i / FALLBACK_RATE)))
+        frames += b"\x00\x00" * beep
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(FALLBACK_RATE)
+        f.writeframes(bytes(frames))
+
+
+class SoundCache:
+    """
+    Ограниченный кэш загруженных звуков (вытесняется давно не использованный).
+    Ключ – путь после SoundResolver, поэтому "sounds/beep.mp3" и "Sounds/Beep.mp3" дают один звук.
+    """
+
+    def __init__(self, loader, fallback_dir, resolver=None, maxsize=DEFAULT_CACHE_SIZE):
+        """
+        :param loader: функция загрузки звука по пути (SoundLoader.load), возвращает объект или None
+        :param fallback_dir: каталог, куда записывается запасной сигнал
+        :param resolver: SoundResolver
+        :param maxsize: сколько звуков держать загруженными
+        """
+        self.loader = loader
+        self.fallback_dir = fallback_dir
+        self.resolver = resolver if resolver is not None else SoundResolver()
+        self.maxsize = maxsize
+        self._sounds = OrderedDict()
+        self.latencies = deque(maxlen=100)  # задержка от срабатывания до запуска звука, сек
+
+    def _load(self, path):
+        if path in self._sounds:
+            self._sounds.move_to_end(path)
+            return self._sounds[path]
+        sound = self.loader(path)
+        if sound is None:
+            return None
+        self._sounds[path] = sound
+        while len(self._sounds) > self.maxsize:
+            old_path, old_sound = next(iter(self._sounds.items()))
+            if getattr(old_sound, "state", None) == "play":
+                break
+            del self._sounds[old_path]
+            old_sound.unload()
+        return sound
+
+    def fallback_path(self):
+        path = os.path.join(self.fallback_dir, "fallback_tone.wav")
+        if not os.path.isfile(path):
+            os.makedirs(self.fallback_dir, exist_ok=True)
+            write_fallback_tone(path)
+        return path
+
+    def get(self, path):
+        """Загруженный звук для пути; запасной сигнал, если файл не найден или не загрузился."""
+        resolved = self.resolver.resolve(path)
+        sound = self._load(resolved) if resolved else None
+        if sound is None:
+            print("Не удалось загрузить звук, используется запасной сигнал:", path)
+            sound = self._load(self.fallback_path())
+        return sound
+
+    def preload(self, path):
+        self.get(path)
+
+    def play(self, path, fired_at=None):
+        """
+        Запускает звук в цикле.
+        :param fired_at: time.perf_counter() в момент срабатывания – для замера задержки до звука
+        """
+        sound = self.get(path)
+        if sound is None:
+            return None
+        sound.loop = True
+        sound.play()
+        if fired_at is not None:
+            self.latencies.append(time.perf_counter() - fired_at)
+        return sound
@@ -0,0 +1,319 @@
+"""
+Хранение будильников в SQLite.
+
+Каждое изменение записывает только одну строку. Расписание хранится компактно:
+7-битная маска дней и по два байта (минуты от полуночи) на каждый выбранный день.
+Секунды в расписании не сохраняются – время выбирается с точностью до минуты.
+
+Для синхронизации между устройствами (sync.py) у каждого будильника есть постоянный uid
+и версия (VersionClock), а изменённые после последней синхронизации записи отмечены dirty.
+Удалённые будильники остаются в таблице deleted, чтобы удаление дошло до других устройств.
+"""
+import datetime
+import sqlite3
+import time
+import uuid
+from array import array
+
+from alarm_core import Alarm, DAYS_OF_WEEK, PARITY_ANY, TIMES, WEEK_TYPE_NAMES
+
+WEEK_TYPES = WEEK_TYPE_NAMES
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS alarms (
+    id INTEGER PRIMARY KEY,
+    days INTEGER NOT NULL,
+    times BLOB NOT NULL,
+    week_type INTEGER NOT NULL,
+    active INTEGER NOT NULL,
+    sound TEXT NOT NULL,
+    sound_name TEXT NOT NULL,
+    source TEXT,
+    last_triggered TEXT,
+    uid TEXT,
+    version INTEGER NOT NULL DEFAULT 0,
+    dirty INTEGER NOT NULL DEFAULT 1
+);
+CREATE TABLE IF NOT EXISTS deleted (
+    uid TEXT PRIMARY KEY,
+    version INTEGER NOT NULL,
+    dirty INTEGER NOT NULL DEFAULT 1
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+)
+"""
+
+# Столбцы синхронизации, которых нет в базах, созданных до неё
+SYNC_COLUMNS = [("uid", "TEXT"), ("version", "INTEGER NOT NULL DEFAULT 0"), ("dirty", "INTEGER NOT NULL DEFAULT 1")]
+
+COLUMNS = "days, times, week_type, active, sound, sound_name, source, last_triggered, uid, version"
+_PLACEHOLDERS = ", ".join("?" * len(COLUMNS.split(", ")))
+# Поля будильника, которые задаёт пользователь (last_triggered у каждого устройства своё)
+_DEFINITION = "days = ?, times = ?, week_type = ?, active = ?, sound = ?, sound_name = ?, source = ?"
+# SQLite ограничивает число параметров одного запроса
+_CHUNK = 500
+
+
+def new_uid():
+    return uuid.uuid4().hex
+
+
+def encode_schedule(schedule):
+    """Словарь {день: datetime.time} -> (маска дней, минуты выбранных дней в байтах)."""
+    days = 0
+    minutes = [None] * 7
+    for day, scheduled_time in schedule.items():
+        weekday = DAYS_OF_WEEK.index(day)
+        days |= 1 << weekday
+        minutes[weekday] = scheduled_time.hour * 60 + scheduled_time.minute
+    return days, array("H", [minute for minute in minutes if minute is not None]).tobytes()
+
+
+def decode_schedule(days, times):
+    minutes = array("H")
+    minutes.frombytes(times)
+    schedule = {}
+    position = 0
+    for weekday in range(7):
+        if days & (1 << weekday):
+            schedule[DAYS_OF_WEEK[weekday]] = TIMES[minutes[position]]
+            position += 1
+    return schedule
+
+
+def _times(alarm):
+    # То же, что encode_schedule, но прямо из маски и минут будильника
+    days = alarm.day_mask
+    return array("H", [minute for weekday, minute in enumerate(alarm.minutes) if days & (1 << weekday)]).tobytes()
+
+
+def _minutes(days, times):
+    stored = array("H")
+    stored.frombytes(times)
+    minutes = [0] * 7
+    position = 0
+    for weekday in range(7):
+        if days & (1 << weekday):
+            minutes[weekday] = stored[position]
+            position += 1
+    return minutes
+
+
+def _definition(alarm):
+    return (alarm.day_mask, _times(alarm), int(alarm.parity), int(bool(alarm.active)),
+            alarm.sound, alarm.sound_name, alarm.source)
+
+
+def _row(alarm):
+    last_triggered = alarm.last_triggered.isoformat() if alarm.last_triggered else None
+    return _definition(alarm) + (last_triggered, alarm.uid, alarm.version)
+
+
+def _alarm(row):
+    alarm_id, days, times, week_type, active, sound, sound_name, source, last_triggered, uid, version = row
+    alarm = Alarm.compact(days, _minutes(days, times), week_type if week_type in WEEK_TYPES else PARITY_ANY,
+                          bool(active), sound, sound_name, source)
+    alarm.id = alarm_id
+    alarm.uid = uid
+    alarm.version = version
+    if last_triggered:
+        alarm.last_triggered = datetime.datetime.fromisoformat(last_triggered)
+    return alarm
+
+
+def _chunks(items):
+    items = list(items)
+    for start in range(0, len(items), _CHUNK):
+        yield items[start:start + _CHUNK]
+
+
+class VersionClock:
+    """
+    Версии записей для синхронизации – гибридные часы: миллисекунды системного времени,
+    но каждая следующая версия больше любой уже выданной или полученной с другого устройства.
+    Поэтому более поздняя правка почти всегда получает большую версию, даже если часы
+    устройств немного расходятся, а версии одного устройства строго растут.
+    """
+
+    def __init__(self, last=0, clock=time.time):
+        self.last = last
+        self.clock = clock
+
+    def next(self):
+        self.last = max(int(self.clock() * 1000), self.last + 1)
+        return self.last
+
+    def observe(self, version):
+        self.last = max(self.last, version)
+
+
+class AlarmStore:
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path)
+        # WAL и synchronous=NORMAL: запись одной строки не ждёт полного сброса файла на диск
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self._migrate()
+        self.conn.commit()
+
+    def _migrate(self):
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(alarms)")}
+        for name, definition in SYNC_COLUMNS:
+            if name not in columns:
+                self.conn.execute(f"ALTER TABLE alarms ADD COLUMN {name} {definition}")
+        self.versions = VersionClock(max(
+            self.conn.execute("SELECT coalesce(max(version), 0) FROM alarms").fetchone()[0],
+            self.conn.execute("SELECT coalesce(max(version), 0) FROM deleted").fetchone()[0]))
+        # Будильникам из базы без синхронизации выдаются uid и версия
+        missing = [row[0] for row in self.conn.execute("SELECT id FROM alarms WHERE uid IS NULL")]
+        self.conn.executemany("UPDATE alarms SET uid = ?, version = ?, dirty = 1 WHERE id = ?",
+                              [(new_uid(), self.versions.next(), alarm_id) for alarm_id in missing])
+        self.conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS alarms_uid ON alarms (uid)")
+
+    def close(self):
+        self.conn.close()
+
+    def load(self):
+        """Все будильники в порядке добавления."""
+        cursor = self.conn.execute(f"SELECT id, {COLUMNS} FROM alarms ORDER BY id")
+        return [_alarm(row) for row in cursor]
+
+    def save(self, alarm):
+        """Добавляет или обновляет один будильник; новому будильнику присваивается alarm.id."""
+        with self.conn:
+            self._save(alarm)
+
+    def save_many(self, alarms):
+        with self.conn:
+            for alarm in alarms:
+                self._save(alarm)
+
+    def _save(self, alarm):
+        # Каждое сохранение – новая версия; запись ждёт отправки на сервер синхронизации
+        if alarm.uid is None:
+            alarm.uid = new_uid()
+        alarm.version = self.versions.next()
+        if alarm.id is None:
+            cursor = self.conn.execute(f"INSERT INTO alarms ({COLUMNS}) VALUES ({_PLACEHOLDERS})", _row(alarm))
+            alarm.id = cursor.lastrowid
+            self.conn.execute("DELETE FROM deleted WHERE uid = ?", (alarm.uid,))
+        else:
+            self.conn.execute(f"UPDATE alarms SET {_DEFINITION}, last_triggered = ?, uid = ?, version = ?, dirty = 1 "
+                              "WHERE id = ?", _row(alarm) + (alarm.id,))
+
+    def update_state(self, alarm):
+        """Записывает только активность и время последнего срабатывания (после звонка, отключения)."""
+        if alarm.id is None:
+            return self.save(alarm)
+        self.update_states([alarm])
+
+    def update_states(self, alarms):
+        """
+        update_state для многих будильников в одной транзакции (сработавшие вместе).
+        Новую версию получают только будильники, у которых изменилась активность: время
+        срабатывания у каждого устройства своё и не синхронизируется.
+        """
+        new = [alarm for alarm in alarms if alarm.id is None]
+        version = self.versions.next()
+        rows = []
+        for alarm in alarms:
+            if alarm.id is not None:
+                active = int(bool(alarm.active))
+                rows.append((active, version, active, active,
+                             alarm.last_triggered.isoformat() if alarm.last_triggered else None, alarm.id))
+        with self.conn:
+            for alarm in new:
+                self._save(alarm)
+            self.conn.executemany(
+                "UPDATE alarms SET version = CASE WHEN active != ? THEN ? ELSE version END, "
+                "dirty = CASE WHEN active != ? THEN 1 ELSE dirty END, active = ?, last_triggered = ? WHERE id = ?",
+                rows)
+
+    def delete(self, alarm):
+        self.delete_many([alarm])
+
+    def delete_many(self, alarms):
+        ids = [(alarm.id,) for alarm in alarms if alarm.id is not None]
+        deleted = [(alarm.uid, self.versions.next()) for alarm in alarms
+                   if alarm.id is not None and alarm.uid is not None]
+        with self.conn:
+            self.conn.executemany("DELETE FROM alarms WHERE id = ?", ids)
+            self.conn.executemany("INSERT OR REPLACE INTO deleted (uid, version, dirty) VALUES (?, ?, 1)", deleted)
+        for alarm in alarms:
+            alarm.id = None
+
+    # Синхронизация (sync.py)
+
+    def changes(self):
+        """Записи, изменённые после последней синхронизации: (будильники, [(uid, версия) удалённых])."""
+        cursor = self.conn.execute(f"SELECT id, {COLUMNS} FROM alarms WHERE dirty = 1 ORDER BY version")
+        alarms = [_alarm(row) for row in cursor]
+        deleted = self.conn.execute("SELECT uid, version FROM deleted WHERE dirty = 1 ORDER BY version").fetchall()
+        return alarms, deleted
+
+    def find(self, uids):
+        """Текущие записи с данными uid: ({uid: будильник}, {uid: версия удаления})."""
+        alarms, deleted = {}, {}
+        for chunk in _chunks(uids):
+            marks = ", ".join("?" * len(chunk))
+            for row in self.conn.execute(f"SELECT id, {COLUMNS} FROM alarms WHERE uid IN ({marks})", chunk):
+                alarm = _alarm(row)
+                alarms[alarm.uid] = alarm
+            deleted.update(self.conn.execute(f"SELECT uid, version FROM deleted WHERE uid IN ({marks})", chunk))
+        return alarms, deleted
+
+    def apply(self, alarms, deleted):
+        """
+        Записывает изменения с других устройств, уже выигравшие сравнение версий (sync.newer),
+        не отмечая их для отправки. Новым будильникам присваивается alarm.id.
+        :param deleted: [(uid, версия)] удалённых будильников
+        """
+        with self.conn:
+            known = self._ids(alarm.uid for alarm in alarms)
+            new = [alarm for alarm in alarms if alarm.uid not in known]
+            self.conn.executemany(f"UPDATE alarms SET {_DEFINITION}, version = ?, dirty = 0 WHERE uid = ?",
+                                  [_definition(alarm) + (alarm.version, alarm.uid)
+                                   for alarm in alarms if alarm.uid in known])
+            self.conn.executemany(f"INSERT INTO alarms ({COLUMNS}, dirty) VALUES ({_PLACEHOLDERS}, 0)",
+                                  [_row(alarm) for alarm in new])
+            self.conn.executemany("DELETE FROM deleted WHERE uid = ?", [(alarm.uid,) for alarm in new])
+            known.update(self._ids(alarm.uid for alarm in new))
+            for alarm in alarms:
+                alarm.id = known[alarm.uid]
+                self.versions.observe(alarm.version)
+            self.conn.executemany("DELETE FROM alarms WHERE uid = ?", [(uid,) for uid, _ in deleted])
+            self.conn.executemany("INSERT OR REPLACE INTO deleted (uid, version, dirty) VALUES (?, ?, 0)", deleted)
+            for _, version in deleted:
+                self.versions.observe(version)
+
+    def _ids(self, uids):
+        ids = {}
+        for chunk in _chunks(uids):
+            ids.update(self.conn.execute(f"SELECT uid, id FROM alarms WHERE uid IN ({', '.join('?' * len(chunk))})",
+                                         chunk))
+        return ids
+
+    def mark_synced(self, alarms, deleted):
+        """Снимает отметку dirty с отправленных записей, если их не изменили, пока шёл обмен."""
+        with self.conn:
+            self.conn.executemany("UPDATE alarms SET dirty = 0 WHERE uid = ? AND version = ?",
+                                  [(alarm.uid, alarm.version) for alarm in alarms])
+            self.conn.executemany("UPDATE deleted SET dirty = 0 WHERE uid = ? AND version = ?", deleted)
+
+    def mark_all_dirty(self):
+        """Все записи будут отправлены заново (сервер синхронизации потерял данные)."""
+        with self.conn:
+            self.conn.execute("UPDATE alarms SET dirty = 1")
+            self.conn.execute("UPDATE deleted SET dirty = 1")
+
+    def get_state(self, key, default=None):
+        row = self.conn.execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row is not None else default
+
+    def set_state(self, **values):
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)",
+                                  [(key, None if value is None else str(value)) for key, value in values.items()])
@@ -0,0 +1,309 @@
+"""
+Синхронизация будильников между устройствами через сервер синхронизации.
+
+Каждая запись – будильник или отметка об удалении – имеет постоянный uid и версию
+(storage.VersionClock). Устройство отправляет только записи, изменённые после прошлой
+синхронизации, и получает только то, что сервер принял после его курсора – номера последнего
+изменения, которое оно уже видело. Конфликт решается по правилу «последняя запись побеждает»
+(newer): больше версия; при равной – удаление, затем сравнение самих записей. Поэтому сервер
+и все устройства приходят к одному результату независимо от порядка обмена.
+
+Обмен – один POST на страницу изменений, тело – JSON, сжатый zlib (Content-Encoding: deflate):
+
+    POST /sync  {"device": "...", "epoch": "...", "cursor": 120, "changes": [...]}
+             -> {"epoch": "...", "cursor": 135, "changes": [...], "more": false, "reset": false}
+    GET /stats  -> число записей, запросов, конфликтов и переданных байтов
+
+Запись будильника: {"u": uid, "v": версия, "m": маска дней, "t": [минуты выбранных дней],
+"p": чётность, "a": 0/1, "s": звук, "n": название звука, "o": источник}; удаление: {"u", "v", "x": 1}.
+Время последнего срабатывания у каждого устройства своё и не передаётся. Путь к звуку передаётся
+как есть: если на другом устройстве такого файла нет, играет встроенный звук с тем же именем
+или запасной сигнал.
+
+Эталонный сервер (SyncService, SyncServer) хранит записи в памяти. После перезапуска у него
+новая эпоха: устройство, пришедшее со старой, получает reset и отправляет ему все записи заново.
+
+Запуск сервера: python sync.py [--host 0.0.0.0] [--port 8766]
+"""
+import argparse
+import collections
+import json
+import threading
+import time
+import uuid
+import zlib
+
+from alarm_core import PARITY_ANY, Alarm, Parity
+from http_service import BackgroundHTTPServer, ServiceHandler
+
+DEFAULT_PORT = 8766
+# Сколько записей отправляется и принимается за один запрос
+PAGE_SIZE = 2000
+# Сколько секунд ждать ответа сервера
+DEFAULT_TIMEOUT = 10
+COMPRESS_LEVEL = 6
+# Поля, которые синхронизация переносит в будильник, уже загруженный в память
+SYNCED_FIELDS = ("day_mask", "minutes", "parity", "active", "sound", "sound_name", "source", "uid", "version", "id")
+_PARITIES = {int(parity) for parity in Parity}
+
+
+# Записи
+
+def to_record(alarm):
+    mask = alarm.day_mask
+    return {"u": alarm.uid, "v": alarm.version, "m": mask,
+            "t": [minute for weekday, minute in enumerate(alarm.minutes) if mask & (1 << weekday)],
+            "p": int(alarm.parity), "a": int(bool(alarm.active)),
+            "s": alarm.sound, "n": alarm.sound_name, "o": alarm.source}
+
+
+def tombstone(uid, version):
+    return {"u": uid, "v": version, "x": 1}
+
+
+def from_record(record):
+    """Будильник из записи; None, если запись – удаление."""
+    if record.get("x"):
+        return None
+    mask = record["m"]
+    selected = iter(record["t"])
+    minutes = [next(selected) if mask & (1 << weekday) else 0 for weekday in range(7)]
+    parity = record["p"] if record["p"] in _PARITIES else PARITY_ANY
+    alarm = Alarm.compact(mask, minutes, parity, bool(record["a"]), record["s"], record["n"], record.get("o"))
+    alarm.uid = record["u"]
+    alarm.version = record["v"]
+    return alarm
+
+
+def _rank(record):
+    return record["v"], bool(record.get("x")), json.dumps(record, sort_keys=True, ensure_ascii=False)
+
+
+def newer(record, other):
+    """Побеждает ли record запись other того же будильника (последняя запись побеждает)."""
+    return _rank(record) > _rank(other)
+
+
+def update_alarm(alarm, other):
+    """Переносит в alarm синхронизируемые поля other, сохраняя сам объект (он уже в планировщике и списке)."""
+    for field in SYNCED_FIELDS:
+        setattr(alarm, field, getattr(other, field))
+
+
+def pack(message):
+    return zlib.compress(json.dumps(message, ensure_ascii=False, separators=(",", ":")).encode("utf-8"),
+                         COMPRESS_LEVEL)
+
+
+def unpack(body):
+    return json.loads(zlib.decompress(body))
+
+
+# Сервер
+
+class SyncService:
+    """Записи всех устройств одного пользователя; курсор – порядковый номер принятого изменения."""
+
+    def __init__(self, page_size=PAGE_SIZE):
+        self.page_size = page_size
+        self.epoch = uuid.uuid4().hex
+        self._records = {}  # uid -> (номер изменения, запись); порядок словаря – порядок номеров
+        self._seq = 0
+        self._lock = threading.Lock()
+        self.stats = collections.Counter()
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self.stats[name] += amount
+
+    def exchange(self, request):
+        """Принимает изменения устройства и возвращает изменения других устройств после его курсора."""
+        cursor = request.get("cursor") or 0
+        reset = bool(cursor) and request.get("epoch") != self.epoch
+        if reset:
+            cursor = 0  # курсор из прошлой эпохи ничего не значит: отдаём всё
+        with self._lock:
+            self.stats["requests"] += 1
+            accepted = set()
+            rejected = {}  # проигравшие изменения: устройству возвращается победившая запись
+            for record in request.get("changes", ()):
+                self.stats["received"] += 1
+                current = self._records.get(record["u"])
+                if current is None or newer(record, current[1]):
+                    self._records.pop(record["u"], None)
+                    self._seq += 1
+                    self._records[record["u"]] = (self._seq, record)
+                    accepted.add(record["u"])
+                elif current[1] != record:
+                    self.stats["conflicts"] += 1
+                    rejected[record["u"]] = current[1]
+            pending = []
+            for seq, record in reversed(self._records.values()):
+                if seq <= cursor:
+                    break
+                pending.append((seq, record))
+            pending.reverse()
+            page = pending[:self.page_size]
+            more = len(pending) > len(page)
+            changes = [record for seq, record in page if record["u"] not in accepted]
+            listed = {record["u"] for record in changes}
+            changes += [record for uid, record in rejected.items() if uid not in listed]
+            self.stats["sent"] += len(changes)
+            return {"epoch": self.epoch, "cursor": page[-1][0] if more else self._seq, "changes": changes,
+                    "more": more, "reset": reset}
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.stats, records=len(self._records), cursor=self._seq, epoch=self.epoch)
+
+
+class _Handler(ServiceHandler):
+    def do_POST(self):
+        if self.path.rstrip("/") != "/sync":
+            self.send_error(404)
+            return
+        service = self.server.service
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        service.count("bytes_in", len(body))
+        try:
+            request = unpack(body) if self.headers.get("Content-Encoding") == "deflate" else json.loads(body)
+            reply = service.exchange(request)
+        except (zlib.error, ValueError, KeyError, TypeError) as e:
+            self._reply(400, json.dumps({"error": str(e)}, ensure_ascii=False).encode("utf-8"))
+            return
+        body = pack(reply)
+        service.count("bytes_out", len(body))
+        self._reply(200, body, encoding="deflate")
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/stats":
+            self._reply(200, json.dumps(self.server.service.snapshot()).encode("utf-8"))
+        else:
+            self.send_error(404)
+
+
+class SyncServer(BackgroundHTTPServer):
+    """HTTP-обёртка SyncService; как и parity_service.ParityServer, работает в фоновом потоке."""
+
+    def __init__(self, service=None, host="127.0.0.1", port=DEFAULT_PORT):
+        super().__init__(service if service is not None else SyncService(), _Handler, host, port)
+
+
+# Клиент
+
+class SyncClient:
+    """
+    Синхронизация одного хранилища (storage.AlarmStore) с сервером.
+
+    SQLite работает только в потоке, где открыто хранилище, поэтому обмен разбит на три шага:
+    prepare и finish – в потоке хранилища, exchange (сеть) – в любом. sync выполняет их подряд.
+    """
+
+    def __init__(self, store, url, session=None, timeout=DEFAULT_TIMEOUT, page_size=PAGE_SIZE):
+        self.store = store
+        self.url = url.rstrip("/") + "/sync"
+        self.session = session
+        self.timeout = timeout
+        self.page_size = page_size
+        self.device = store.get_state("device")
+        if self.device is None:
+            self.device = uuid.uuid4().hex
+            store.set_state(device=self.device)
+
+    def prepare(self):
+        """Тело запроса и отправляемые записи (будильники, [(uid, версия) удалённых], остались ли ещё) – для finish."""
+        alarms, deleted = self.store.changes()
+        remaining = len(alarms) + len(deleted) > self.page_size
+        alarms = alarms[:self.page_size]
+        deleted = deleted[:self.page_size - len(alarms)]
+        request = {"device": self.device, "epoch": self.store.get_state("epoch"),
+                   "cursor": int(self.store.get_state("cursor", 0)),
+                   "changes": [to_record(alarm) for alarm in alarms] + [tombstone(*item) for item in deleted]}
+        return pack(request), (alarms, deleted, remaining)
+
+    def exchange(self, body):
+        """Отправляет запрос: (ответ сервера, байт получено). Ошибки сети – requests.RequestException."""
+        import requests
+
+        response = (self.session or requests).post(
+            self.url, data=body, timeout=self.timeout,
+            headers={"Content-Type": "application/json", "Content-Encoding": "deflate"})
+        response.raise_for_status()
+        # requests сам распаковывает ответ с Content-Encoding: deflate
+        return response.json(), int(response.headers.get("Content-Length", len(response.content)))
+
+    def finish(self, sent, reply):
+        """
+        Применяет ответ сервера.
+        :return: (изменённые будильники [(uid, будильник или None, если удалён)], нужен ли ещё обмен)
+        """
+        alarms, deleted, remaining = sent
+        if reply.get("reset"):
+            self.store.mark_all_dirty()
+        else:
+            self.store.mark_synced(alarms, deleted)
+        incoming = reply.get("changes", [])
+        local, local_deleted = self.store.find([record["u"] for record in incoming])
+        winners, removed, changed = [], [], []
+        for record in incoming:
+            uid = record["u"]
+            if uid in local:
+                current = to_record(local[uid])
+            elif uid in local_deleted:
+                current = tombstone(uid, local_deleted[uid])
+            else:
+                current = None
+            if current is not None and not newer(record, current):
+                continue
+            alarm = from_record(record)
+            if alarm is not None:
+                winners.append(alarm)
+                changed.append((uid, alarm))
+            else:
+                removed.append((uid, record["v"]))
+                if uid in local:
+                    changed.append((uid, None))
+        self.store.apply(winners, removed)
+        self.store.set_state(epoch=reply["epoch"], cursor=reply["cursor"])
+        return changed, bool(reply.get("more") or reply.get("reset") or remaining)
+
+    def sync(self):
+        """
+        Полный обмен в текущем потоке.
+        :return: (изменённые будильники, как у finish; сводка: запросы, записи и байты в обе стороны, мс)
+        """
+        started = time.perf_counter()
+        stats = collections.Counter()
+        changed = []
+        more = True
+        while more:
+            body, sent = self.prepare()
+            reply, received = self.exchange(body)
+            batch, more = self.finish(sent, reply)
+            changed += batch
+            stats["requests"] += 1
+            stats["sent"] += len(sent[0]) + len(sent[1])
+            stats["received"] += len(reply.get("changes", ()))
+            stats["bytes_sent"] += len(body)
+            stats["bytes_received"] += received
+        stats["ms"] = (time.perf_counter() - started) * 1000
+        return changed, dict(stats)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Эталонный сервер синхронизации будильников")
+    parser.add_argument("--host", default="127.0.0.1", help="0.0.0.0 – принимать запросы из сети")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args(argv)
+
+    server = SyncServer(host=args.host, port=args.port)
+    print("Сервер синхронизации:", server.url)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,10 @@
+"""
+Проверки запускаются из корня репозитория: python -m pytest tests
+Модули приложения и benchmarks/ (сохранённые страницы, локальный сервер-заглушка) импортируются без установки.
+"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
@@ -0,0 +1,78 @@
+"""Индекс будильников (alarm_index.py): строка поиска, выборки и ближайшие звонки."""
+import datetime
+
+from alarm_core import PARITY_ODD, Alarm, parity_offset_for
+from alarm_index import AlarmIndex, parse_query
+
+MONDAY = datetime.datetime(2024, 9, 2, 6, 0)
+EVEN_WEEK = parity_offset_for("чётная", MONDAY.date())
+
+
+def alarm(day="Понедельник", hour=7, minute=0, **kwargs):
+    return Alarm(schedule={day: datetime.time(hour, minute)}, **kwargs)
+
+
+def test_parse_query():
+    assert parse_query("Пн вторник 7:00-9:00 нечетная выкл звук:Beep утро") == {
+        "weekdays": {0, 1}, "time_from": 420, "time_to": 540, "parity": PARITY_ODD, "active": False,
+        "sound_name": "beep", "words": ["утро"]}
+    assert parse_query("7:30 вкл") == {"time_from": 450, "time_to": 450, "active": True}
+    # Префикс без названия и неверное время – просто слова
+    assert parse_query("звук: 7:5") == {"words": ["звук:", "7:5"]}
+    assert parse_query("   ") == {}
+
+
+def test_select_time_range_past_midnight():
+    late, early, noon = alarm(hour=23, minute=30), alarm("Вторник", 0, 15), alarm(hour=12)
+    index = AlarmIndex([late, early, noon])
+    assert index.select(time_from=23 * 60, time_to=60) == {late, early}
+    assert index.select(weekdays={0}, time_from=23 * 60, time_to=60) == {late}
+    assert index.query(**parse_query("23:00-1:00")) == [late, early]
+    assert index.select(time_from=23 * 60 + 31, time_to=14) == set()
+
+
+def test_update_moves_alarm_between_keys():
+    moved, other = alarm(sound_name="Beep"), alarm(sound_name="Beep")
+    index = AlarmIndex([moved, other])
+    moved.schedule = {"Среда": datetime.time(8, 0)}
+    moved.sound_name = "Ring"
+    moved.active = False
+    moved.week_type = "нечётная"
+    index.update(moved)
+    assert index.select(weekdays={0}) == {other}
+    assert index.select(weekdays={2}, time_from=480, time_to=480) == {moved}
+    assert index.select(sound_name="beep") == {other} and index.select(sound_name="RING") == {moved}
+    assert index.select(active=False) == {moved} and index.select(active=True) == {other}
+    assert index.select(parity=PARITY_ODD) == {moved}
+    assert index.select(words=["нечётная"]) == {moved}  # подпись пересчитана
+    index.remove(other)
+    assert index._slots[0] == {} and index._minutes[0] == [] and "beep" not in index._sounds
+
+
+def test_next_hours_merges_pending_snoozes():
+    seven, half_past, odd_week = alarm(), alarm(hour=6, minute=30), alarm(hour=6, minute=45, week_type="нечётная")
+    removed = alarm(hour=9)
+    index = AlarmIndex([seven, half_past, odd_week])
+    at = MONDAY.replace
+    pending = [(seven, at(minute=10)), (half_past, at(hour=5)), (removed, at(minute=20)), (half_past, at(hour=9))]
+    assert index.next_hours(MONDAY, EVEN_WEEK, hours=2, pending=pending) == [
+        (at(minute=10), seven), (at(minute=30), half_past), (at(hour=7), seven)]
+    assert index.next_hours(MONDAY, EVEN_WEEK, hours=2, pending=pending, within={seven}) == [
+        (at(minute=10), seven), (at(hour=7), seven)]
+    # Звонок ровно в now не считается, конец окна – включительно
+    assert index.next_hours(at(minute=30), EVEN_WEEK, hours=0.5) == [(at(hour=7), seven)]
+
+
+def test_order_after_remove_and_readd():
+    alarms = [alarm(hour=hour) for hour in range(10)]
+    index = AlarmIndex(alarms)
+    index.remove(alarms[0])
+    index.add(alarms[0])
+    index.update(alarms[5])  # изменение не двигает будильник в списке
+    expected = alarms[1:] + alarms[:1]
+    assert index.query() == expected
+    assert index.query(weekdays={0}) == expected
+    # Маленькая выборка сортируется по номеру, большая – фильтруется проходом по списку
+    assert index.ordered({alarms[0], alarms[3]}) == [alarms[3], alarms[0]]
+    assert index.ordered(set(alarms[:8])) == alarms[1:8] + alarms[:1]
+    assert [minute for minute, _ in index.today(MONDAY.date(), EVEN_WEEK)] == [hour * 60 for hour in range(10)]
@@ -0,0 +1,103 @@
+"""Компактная модель будильника (alarm_core.py): прежний интерфейс поверх маски и минут, AlarmArray и SQLite."""
+import datetime
+
+import pytest
+
+from alarm_core import (DAYS_OF_WEEK, PARITY_EVEN, PARITY_ODD, Alarm, AlarmArray, Parity, alarm_from_dict,
+                        alarm_to_dict, encode_alarms, next_occurrence)
+from storage import AlarmStore, decode_schedule, encode_schedule
+
+SCHEDULE = {"Понедельник": datetime.time(7, 0), "Среда": datetime.time(23, 59), "Воскресенье": datetime.time(0, 0)}
+
+
+def make(schedule=SCHEDULE, **kwargs):
+    return Alarm(schedule=dict(schedule), **kwargs)
+
+
+def fields(alarm):
+    return (dict(alarm.schedule), alarm.week_type, alarm.active, alarm.id, alarm.last_triggered,
+            alarm.sound, alarm.sound_name, alarm.source, alarm.uid, alarm.version)
+
+
+def test_old_interface_maps_to_mask_and_minutes():
+    alarm = make(week_type="нечётная")
+    assert alarm.day_mask == 0b1000101
+    assert [alarm.minutes[weekday] for weekday in (0, 2, 6)] == [7 * 60, 23 * 60 + 59, 0]
+    assert alarm.parity is PARITY_ODD and alarm.week_type == "нечётная"
+    # Дни перечисляются с понедельника, а не в порядке добавления
+    assert list(make({"Пятница": datetime.time(9, 0), "Вторник": datetime.time(8, 0)}).schedule) == \
+        ["Вторник", "Пятница"]
+    assert make().schedule == SCHEDULE
+
+
+def test_schedule_view_writes_through():
+    alarm = make()
+    alarm.schedule["Вторник"] = datetime.time(6, 30, 59)  # секунды не хранятся
+    del alarm.schedule["Понедельник"]
+    assert alarm.day_mask == 0b1000110
+    assert alarm.schedule["Вторник"] == datetime.time(6, 30)
+    assert "Понедельник" not in alarm.schedule and len(alarm.schedule) == 3
+    with pytest.raises(KeyError):
+        alarm.schedule["Понедельник"]
+    alarm.schedule = {}
+    assert alarm.day_mask == 0 and str(alarm).startswith("Нет дней")
+
+
+def test_unknown_strings_are_rejected():
+    with pytest.raises(ValueError):
+        make({"Funday": datetime.time(7, 0)})
+    with pytest.raises(ValueError):
+        make(week_type="каждая")
+    alarm = make()
+    alarm.week_type = Parity.EVEN
+    assert alarm.week_type == "чётная"
+
+
+def test_compact_matches_constructor():
+    alarm = Alarm.compact(0b1000101, [420, 0, 1439, 0, 0, 0, 0], PARITY_EVEN, False, "a.mp3", "A", "timetable:X")
+    assert fields(alarm) == (SCHEDULE, "чётная", False, None, None, "a.mp3", "A", "timetable:X", None, 0)
+    assert next_occurrence(alarm, datetime.datetime(2024, 9, 2), 0) is None  # выключен
+    alarm.active = True
+    assert next_occurrence(alarm, datetime.datetime(2024, 9, 2), 0) == datetime.datetime(2024, 9, 2, 7, 0)
+
+
+def test_dict_round_trip():
+    alarm = make(week_type="чётная", active=False, sound="Sounds/Ring.mp3", sound_name="Ring", source="ics:1")
+    alarm.id = 5
+    alarm.uid, alarm.version = "0b1a2f3e4d5c6b7a8f9e0d1c2b3a4f5e", 3
+    alarm.last_triggered = datetime.datetime(2024, 9, 2, 7, 0, 1, 250)
+    assert fields(alarm_from_dict(alarm_to_dict(alarm))) == fields(alarm)
+
+
+def test_alarm_array_is_lossless():
+    alarms = [make(), make(week_type="нечётная", active=False, source="timetable:КИ23-16"), Alarm()]
+    alarms[0].id = 1
+    alarms[0].uid, alarms[0].version = "4f1c2a7e9b3d4e0f8a6b5c4d3e2f1a0b", 12
+    alarms[1].last_triggered = datetime.datetime(2024, 9, 2, 7, 0, 0, 999999)
+    alarms[2].sound, alarms[2].sound_name = "Sounds/Звонок.mp3", "Звонок"
+    packed = AlarmArray(alarms)
+    assert len(packed) == 3 and packed.nbytes == 3 * 49  # запись фиксированного размера
+    assert [fields(alarm) for alarm in packed] == [fields(alarm) for alarm in alarms]
+    assert fields(packed[-1]) == fields(alarms[2])
+
+    packed[0] = alarms[1]
+    assert fields(packed[0]) == fields(alarms[1])
+    with pytest.raises(IndexError):
+        packed[3]
+
+    table, expected = packed.table(), encode_alarms(packed.to_alarms())
+    for name in ("day_mask", "minutes", "parity", "active"):
+        assert [list(row) if hasattr(row, "__len__") else row for row in getattr(table, name)] == \
+            [list(row) if hasattr(row, "__len__") else row for row in getattr(expected, name)]
+
+
+def test_storage_row_round_trip(tmp_path):
+    store = AlarmStore(str(tmp_path / "alarms.db"))
+    alarms = [make(week_type="нечётная"), make({day: datetime.time(12, 34) for day in DAYS_OF_WEEK}), Alarm()]
+    alarms[0].last_triggered = datetime.datetime(2024, 9, 2, 7, 0)
+    store.save_many(alarms)
+    assert [fields(alarm) for alarm in store.load()] == [fields(alarm) for alarm in alarms]
+    store.close()
+    # Прежний формат строки – маска и минуты выбранных дней подряд
+    days, times = encode_schedule(SCHEDULE)
+    assert days == make().day_mask and decode_schedule(days, times) == SCHEDULE
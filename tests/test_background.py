@@ -0,0 +1,32 @@
+"""Общая основа фоновых задач (background.py): прореживание хода работы и отмена."""
+from background import PROGRESS_STEP, BackgroundWorker, ProgressReporter
+
+
+def test_progress_is_throttled_and_completion_reported_once():
+    posted = []
+    progress = ProgressReporter(lambda fn, *args: posted.append(args[0]), lambda fraction: None, total=1000)
+    for _ in range(200):
+        progress.advance(1)
+    assert 19 <= len(posted) <= 20 and posted[-1] <= 0.2
+    assert all(after - before > PROGRESS_STEP - 1e-9 for before, after in zip(posted, posted[1:]))
+    reported = len(posted)
+    progress.set(progress.done + 1)  # прирост меньше шага не сообщается
+    assert len(posted) == reported
+    progress.finish()
+    progress.finish()
+    assert posted[-1] == 1.0 and posted.count(1.0) == 1
+
+
+def test_without_handler_nothing_is_posted():
+    posted = []
+    progress = ProgressReporter(lambda fn, *args: posted.append(args), None)
+    progress.finish()
+    assert posted == []
+
+
+def test_shutdown_cancels_and_default_post_calls_now():
+    worker = BackgroundWorker()
+    calls = []
+    worker.post(calls.append, 1)
+    worker.shutdown()
+    assert calls == [1] and worker._cancelled.is_set()
@@ -0,0 +1,230 @@
+"""
+Демон будильника целиком: Unix-сокет во временном каталоге, SimulatedClock и DaemonClient,
+как у интерфейса. Время идёт только по clock.advance, поэтому сценарий занимает доли секунды.
+"""
+import datetime
+import json
+import os
+import queue
+import threading
+
+import pytest
+
+from alarm_core import Alarm
+from clocks import SimulatedClock
+from daemon import AlarmDaemon, DaemonClient, DaemonError
+from storage import AlarmStore
+
+START = datetime.datetime(2024, 9, 2, 6, 0)  # понедельник
+TIMEOUT = 5
+
+
+class Harness:
+    """Демон в отдельном потоке, клиент запросов и очередь событий подписки."""
+
+    def __init__(self, directory, alarms):
+        self.db_path = os.path.join(directory, "alarms.db")
+        self.socket_path = os.path.join(directory, "daemon.sock")
+        store = AlarmStore(self.db_path)
+        store.save_many(alarms)
+        store.close()
+        self.ids = [alarm.id for alarm in alarms]
+        self.clock = SimulatedClock(START)
+        self.log = []  # ("notify", текст) / ("play", путь) / ("stop",) в порядке вызова
+        self.events = queue.Queue()
+        started = threading.Event()
+
+        def serve():
+            # SQLite используется в том потоке, где открыт, – хранилище открывает поток демона
+            self.daemon = AlarmDaemon(AlarmStore(self.db_path), self.socket_path, clock=self.clock,
+                                      notify=lambda title, message: self.log.append(("notify", message)),
+                                      play=lambda path: self.log.append(("play", path)),
+                                      stop_sound=lambda: self.log.append(("stop",)))
+            started.set()
+            self.daemon.serve_forever()
+
+        self.thread = threading.Thread(target=serve, daemon=True)
+        self.thread.start()
+        assert started.wait(TIMEOUT)
+        self.client = DaemonClient(self.socket_path)
+        # Подписка – до первого advance, поэтому отдельно от чтения событий в фоне (DaemonClient.events)
+        self.subscriber = DaemonClient(self.socket_path)
+        self.subscriber.request("subscribe")
+        self.subscriber.sock.settimeout(None)
+        threading.Thread(target=self._listen, daemon=True).start()
+
+    def _listen(self):
+        try:
+            for line in self.subscriber._file:
+                self.events.put(json.loads(line))
+        except (OSError, ValueError):
+            pass
+
+    def advance(self, **kwargs):
+        self.clock.advance(**kwargs)
+        self.client.status()  # ответ приходит после того, как демон обработал наступившие сроки
+
+    def fired(self):
+        event = self.events.get(timeout=TIMEOUT)
+        assert event["event"] == "fired"
+        return sorted(alarm["id"] for alarm in event["alarms"]), datetime.datetime.fromisoformat(event["at"])
+
+    def stored(self):
+        store = AlarmStore(self.db_path)
+        try:
+            return {alarm.id: alarm for alarm in store.load()}
+        finally:
+            store.close()
+
+    def close(self):
+        self.client.close()
+        self.daemon.stop()
+        self.thread.join(TIMEOUT)
+        self.subscriber.close()
+
+
+def monday(hour, minute=0, **kwargs):
+    return Alarm(schedule={"Понедельник": datetime.time(hour, minute)}, **kwargs)
+
+
+@pytest.fixture
+def harness(tmp_path):
+    harness = Harness(str(tmp_path), [monday(7, sound="Sounds/Beep.mp3"), monday(7),
+                                      Alarm(schedule={"Вторник": datetime.time(8, 30)})])
+    yield harness
+    harness.close()
+
+
+def test_nothing_fires_before_the_deadline(harness):
+    assert datetime.datetime.fromisoformat(harness.client.status()["next"]) == START.replace(hour=7)
+    harness.advance(minutes=59)
+    assert harness.events.empty()
+    assert harness.log == []
+
+
+def test_fire_snooze_dismiss(harness):
+    first, second, tuesday = harness.ids
+    harness.advance(hours=1)
+    assert harness.fired() == ([first, second], START.replace(hour=7))
+    # Одно уведомление и один звук на все будильники, наступившие вместе
+    assert [entry[0] for entry in harness.log] == ["notify", "play"]
+    assert harness.log[1] == ("play", "Sounds/Beep.mp3")
+    stored = harness.stored()
+    assert stored[first].last_triggered == stored[second].last_triggered == START.replace(hour=7)
+    assert stored[tuesday].last_triggered is None
+
+    assert harness.client.snooze([first], 5) == START.replace(hour=7, minute=5)
+    assert dict(harness.stored()[first].schedule) == {"Понедельник": datetime.time(7, 0)}  # расписание не тронуто
+    assert ("stop",) not in harness.log  # второй будильник ещё звонит
+    harness.client.dismiss([second])
+    assert harness.log[-1] == ("stop",)
+    assert harness.stored()[second].active is False
+
+    harness.advance(minutes=4)
+    assert harness.events.empty()
+    harness.advance(minutes=1)
+    assert harness.fired() == ([first], START.replace(hour=7, minute=5))
+    assert harness.log[-1] == ("play", "Sounds/Beep.mp3")
+    harness.client.dismiss([first])
+    assert harness.log[-1] == ("stop",)
+
+    stored = harness.stored()
+    assert stored[first].active is False and stored[second].active is False
+    assert stored[first].last_triggered == START.replace(hour=7, minute=5)
+    assert datetime.datetime.fromisoformat(harness.client.status()["next"]) == START.replace(day=3, hour=8, minute=30)
+
+
+def test_weekly_repeat_and_missed_downtime(harness):
+    first, second, tuesday = harness.ids
+    harness.advance(hours=1)
+    assert harness.fired()[0] == [first, second]
+    harness.client.dismiss([first])
+
+    # Демон «проспал» больше недели: каждый будильник срабатывает один раз, все вместе
+    harness.advance(days=8, hours=3)
+    ids, at = harness.fired()
+    assert ids == [second, tuesday] and at == datetime.datetime(2024, 9, 10, 10, 0)
+    assert harness.events.empty()
+    assert harness.stored()[tuesday].last_triggered == at
+
+
+def test_edit_through_client(harness):
+    first, second, tuesday = harness.ids
+    alarms = {alarm.id: alarm for alarm in harness.client.load()}
+    assert sorted(alarms) == [first, second, tuesday]
+
+    moved = alarms[tuesday]
+    moved.schedule = {"Понедельник": datetime.time(6, 30)}
+    harness.client.save(moved)
+    added = monday(6, 45)
+    harness.client.save(added)
+    harness.client.delete(alarms[second])
+    assert added.id is not None and alarms[second].id is None
+
+    harness.advance(minutes=30)
+    assert harness.fired() == ([tuesday], START.replace(minute=30))
+    harness.advance(minutes=15)
+    assert harness.fired() == ([added.id], START.replace(minute=45))
+    harness.advance(minutes=15)
+    assert harness.fired() == ([first], START.replace(hour=7))
+    assert sorted(harness.stored()) == sorted([first, tuesday, added.id])
+
+
+def test_unknown_alarm_is_an_error(harness):
+    with pytest.raises(DaemonError):
+        harness.client.dismiss([999])
+    with pytest.raises(DaemonError):
+        harness.client.request("reboot")
+    assert harness.client.status()["ok"]
+
+
+def test_fire_states_in_one_request(harness):
+    first, second, tuesday = harness.ids
+    before = harness.stored()
+    alarms = {alarm.id: alarm for alarm in harness.client.load()}
+    requests = []
+    request = harness.client.request
+    harness.client.request = lambda op, **fields: requests.append(op) or request(op, **fields)
+
+    at = START.replace(hour=7)
+    for alarm in alarms.values():
+        alarm.last_triggered = at
+    alarms[second].active = False
+    harness.client.update_states(list(alarms.values()))
+    assert requests == ["states"]
+
+    stored = harness.stored()
+    assert all(alarm.last_triggered == at for alarm in stored.values())
+    assert stored[second].active is False
+    # Время срабатывания не синхронизируется: новую версию получает только выключенный будильник
+    assert stored[first].version == before[first].version and stored[tuesday].version == before[tuesday].version
+    assert stored[second].version > before[second].version
+    harness.advance(hours=1)
+    assert harness.fired() == ([first], at)
+
+
+def test_snooze_and_dismiss_many_in_one_request(harness):
+    first, second, tuesday = harness.ids
+    before = harness.stored()
+    requests = []
+    request = harness.client.request
+    harness.client.request = lambda op, **fields: requests.append(op) or request(op, **fields)
+
+    harness.advance(hours=1)
+    assert harness.fired()[0] == [first, second]
+    assert harness.client.snooze([first, second], 5) == START.replace(hour=7, minute=5)
+    assert harness.log.count(("stop",)) == 1
+    harness.advance(minutes=5)
+    assert harness.fired() == ([first, second], START.replace(hour=7, minute=5))
+    harness.client.dismiss([first, second])
+    assert [op for op in requests if op != "status"] == ["snooze", "dismiss"]
+    assert harness.log.count(("stop",)) == 2
+
+    stored = harness.stored()
+    assert stored[first].active is False and stored[second].active is False
+    # Обе записи – в одной транзакции с одной новой версией
+    assert stored[first].version == stored[second].version > before[first].version
+    # Неизвестный id отклоняет весь запрос
+    with pytest.raises(DaemonError):
+        harness.client.dismiss([tuesday, 999])
+    assert harness.stored()[tuesday].active is True
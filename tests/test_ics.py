@@ -0,0 +1,104 @@
+"""Импорт и экспорт iCalendar (ics.py): обратимость экспорта и разбор повторяющихся событий."""
+import collections
+import datetime
+import io
+
+import pytest
+
+from alarm_core import Alarm, parity_offset_for
+from ics import read_alarms, write_alarms
+
+MONDAY = datetime.date(2024, 9, 2)  # ISO-неделя 36 – чётная по номеру недели
+NOW = datetime.datetime(2024, 9, 1, 12, 0)
+
+
+def calendar(*events):
+    """Текст календаря из событий – списков строк свойств."""
+    lines = ["BEGIN:VCALENDAR", "VERSION:2.0"]
+    for event in events:
+        lines += ["BEGIN:VEVENT", *event, "END:VEVENT"]
+    lines.append("END:VCALENDAR")
+    return io.StringIO("\r\n".join(lines) + "\r\n")
+
+
+def weekly(rule, start="20240902T083000", **extra):
+    return [f"DTSTART:{start}", "RRULE:FREQ=WEEKLY;" + rule,
+            *(f"X-ALARMCLOCK-{name}:{value}" for name, value in extra.items())]
+
+
+def imported(text, stats=None, now=NOW, **options):
+    return list(read_alarms(text, stats=stats, now=now, **options))
+
+
+def fields(alarm):
+    return dict(alarm.schedule), alarm.week_type, alarm.active, alarm.sound, alarm.sound_name, alarm.source
+
+
+def test_export_import_round_trip():
+    alarms = [
+        Alarm(schedule={"Понедельник": datetime.time(7, 0), "Среда": datetime.time(7, 0),
+                        "Пятница": datetime.time(9, 15)}, week_type="нечётная", active=False,
+                        sound="C:\\Звуки\\утро; бодрое, громкое " + "очень " * 20 + ".wav", sound_name="Утро, бодрое"),
+        Alarm(schedule={"Воскресенье": datetime.time(23, 59)}, source="timetable:КИ23-16/1б"),
+        Alarm(schedule={"Вторник": datetime.time(6, 0)}, week_type="чётная"),
+        Alarm(),  # без дней – не экспортируется
+    ]
+    alarms[0].id = 7
+    out = io.StringIO(newline="")
+    assert write_alarms(alarms, out, parity_offset=parity_offset_for("чётная", MONDAY), reference=MONDAY) == 3
+    text = out.getvalue()
+    assert all(len(line.encode("utf-8")) <= 75 for line in text.split("\r\n"))
+    stats = collections.Counter()
+    restored = imported(io.StringIO(text), stats)
+    assert [fields(alarm) for alarm in restored] == [fields(alarm) for alarm in alarms[:3]]
+    assert stats == {"imported": 3}
+
+
+def test_biweekly_parity_from_offset_or_iso_week():
+    event = weekly("INTERVAL=2;BYDAY=MO")
+    assert imported(calendar(event))[0].week_type == "чётная"  # по номеру ISO-недели
+    odd_offset = parity_offset_for("нечётная", MONDAY)
+    assert imported(calendar(event), parity_offset=odd_offset)[0].week_type == "нечётная"
+    assert imported(calendar(weekly("INTERVAL=1;BYDAY=MO")), parity_offset=odd_offset)[0].week_type == "любая"
+    # Явный тип недели из экспорта важнее DTSTART
+    assert imported(calendar(weekly("INTERVAL=2;BYDAY=MO", **{"WEEK-TYPE": "чётная"})),
+                    parity_offset=odd_offset)[0].week_type == "чётная"
+
+
+def test_lead_minutes_move_early_monday_to_sunday():
+    alarm, = imported(calendar(weekly("BYDAY=MO,WE", start="20240902T001000")), lead_minutes=20)
+    assert dict(alarm.schedule) == {"Воскресенье": datetime.time(23, 50), "Вторник": datetime.time(23, 50)}
+
+
+@pytest.mark.parametrize("rule, now, running", [
+    ("UNTIL=20240910", datetime.datetime(2024, 9, 10, 23, 0), True),
+    ("UNTIL=20240910", datetime.datetime(2024, 9, 11, 0, 0), False),
+    ("UNTIL=20240910T083000Z", datetime.datetime(2024, 12, 1), False),
+    # MO,WE, три занятия: 2, 4 и 9 сентября
+    ("COUNT=3;BYDAY=MO,WE", datetime.datetime(2024, 9, 9, 8, 0), True),
+    ("COUNT=3;BYDAY=MO,WE", datetime.datetime(2024, 9, 9, 9, 0), False),
+    ("COUNT=2;INTERVAL=2;BYDAY=MO", datetime.datetime(2024, 9, 16, 8, 0), True),
+    ("COUNT=2;INTERVAL=2;BYDAY=MO", datetime.datetime(2024, 9, 17), False),
+])
+def test_finished_series_are_skipped(rule, now, running):
+    stats = collections.Counter()
+    alarms = imported(calendar(weekly(rule)), stats, now=now)
+    assert (len(alarms), stats["skipped"]) == ((1, 0) if running else (0, 1))
+
+
+def test_consecutive_events_with_same_id_merge():
+    text = calendar(
+        weekly("BYDAY=MO,WE", ID="1"),
+        weekly("BYDAY=FR", start="20240906T091500", ID="1"),
+        weekly("BYDAY=TU", ID="2"),
+        weekly("BYDAY=TH", ID="1"),  # не подряд – отдельный будильник
+        ["DTSTART:20240902T083000", "SUMMARY:разовое"],
+    )
+    stats = collections.Counter()
+    alarms = imported(text, stats)
+    assert [dict(alarm.schedule) for alarm in alarms] == [
+        {"Понедельник": datetime.time(8, 30), "Среда": datetime.time(8, 30), "Пятница": datetime.time(9, 15)},
+        {"Вторник": datetime.time(8, 30)},
+        {"Четверг": datetime.time(8, 30)},
+    ]
+    assert stats == {"imported": 3, "skipped": 1}
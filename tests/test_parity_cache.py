@@ -0,0 +1,117 @@
+"""Кэш чётности (parity_cache.py): семестры, срок жизни, условные запросы и ошибки сети – без сети."""
+import datetime
+import json
+
+import pytest
+
+from parity_cache import ParityCache, semester_of
+
+MONDAY = datetime.datetime(2024, 9, 2, 8, 0)  # чётная неделя на сайте
+TTL = datetime.timedelta(days=3)  # проверки не выходят за неделю MONDAY
+
+
+class FakeFetch:
+    """Условный запрос с заранее заданными ответами; запоминает присланные ETag и Last-Modified."""
+
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.calls = []
+
+    def __call__(self, etag=None, last_modified=None, timeout=5):
+        self.calls.append((etag, last_modified))
+        return self.replies.pop(0)
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "cache" / "parity.json")
+
+
+@pytest.mark.parametrize("date, semester", [
+    (datetime.date(2024, 9, 1), "2024-осень"),
+    (datetime.date(2024, 12, 31), "2024-осень"),
+    (datetime.date(2025, 1, 31), "2024-осень"),
+    (datetime.date(2025, 2, 1), "2025-весна"),
+    (datetime.date(2025, 8, 31), "2025-весна"),
+])
+def test_semester_of(date, semester):
+    assert semester_of(date) == semester
+
+
+def test_first_fetch_is_stored_and_computed_locally(path):
+    fetch = FakeFetch(("ok", "even", '"v1"', "Mon, 02 Sep 2024 06:00:00 GMT"))
+    cache = ParityCache(path, ttl=TTL, fetch=fetch)
+    assert cache.fetch(now=MONDAY) == "even"
+    assert fetch.calls == [(None, None)]
+
+    # Новый процесс читает файл и считает чётность любой недели семестра без сети
+    reloaded = ParityCache(path, ttl=TTL, fetch=FakeFetch())
+    assert reloaded.data["semester"] == "2024-осень" and reloaded.data["etag"] == '"v1"'
+    assert reloaded.week_parity(datetime.date(2024, 9, 8)) == "even"  # воскресенье той же недели
+    assert reloaded.week_parity(datetime.date(2024, 9, 9)) == "odd"
+    assert reloaded.week_parity(datetime.date(2024, 12, 23)) == "even"  # через 16 недель
+    assert reloaded.week_parity(datetime.date(2025, 2, 3)) is None  # весенний семестр ещё не известен
+    assert reloaded.fetch(now=MONDAY + datetime.timedelta(days=2)) == "even"
+
+
+def test_ttl_and_conditional_revalidation(path):
+    fetch = FakeFetch(("ok", "even", '"v1"', "LM1"), ("not_modified", None, '"v1"', "LM1"),
+                      ("ok", "odd", '"v2"', "LM2"))
+    cache = ParityCache(path, ttl=TTL, fetch=fetch)
+    cache.fetch(now=MONDAY)
+    assert cache.fetch(now=MONDAY + TTL - datetime.timedelta(seconds=1)) == "even"
+    assert len(fetch.calls) == 1
+
+    # Срок вышел: запрос с ETag и Last-Modified; 304 продлевает кэш ещё на TTL
+    later = MONDAY + TTL
+    assert cache.fetch(now=later) == "even"
+    assert fetch.calls[1] == ('"v1"', "LM1")
+    assert cache.data["checked_at"] == later.isoformat()
+    assert cache.fetch(now=later + TTL - datetime.timedelta(seconds=1)) is not None
+    assert len(fetch.calls) == 2
+
+    # Сайт объявил другую чётность: сдвиг и валидаторы заменяются
+    assert cache.fetch(now=later + TTL) == "odd"
+    assert cache.data["etag"] == '"v2"'
+    assert cache.week_parity((later + TTL).date()) == "odd"
+
+
+def test_new_semester_asks_without_validators(path):
+    fetch = FakeFetch(("ok", "even", '"v1"', "LM1"), ("ok", "odd", '"v2"', "LM2"))
+    cache = ParityCache(path, ttl=datetime.timedelta(days=365), fetch=fetch)
+    cache.fetch(now=MONDAY)
+    spring = datetime.datetime(2025, 2, 3, 8, 0)
+    assert not cache.is_fresh(spring)
+    assert cache.fetch(now=spring) == "odd"
+    assert fetch.calls[1] == (None, None)  # ETag прошлого семестра не годится
+    assert cache.data["semester"] == "2025-весна"
+
+
+def test_network_error_falls_back_to_cache(path):
+    fetch = FakeFetch(("error", None, None, None), ("ok", "even", '"v1"', None), ("error", None, '"v1"', None))
+    cache = ParityCache(path, ttl=TTL, fetch=fetch)
+    assert cache.fetch(now=MONDAY) is None
+    assert cache.data == {}
+    assert cache.fetch(now=MONDAY) == "even"
+    assert cache.fetch(now=MONDAY + TTL) == "even"
+    # Ошибка не обновляет время проверки: следующий вызов снова спросит сайт
+    assert cache.data["checked_at"] == MONDAY.isoformat()
+
+
+def test_page_without_banner_keeps_known_offset(path):
+    fetch = FakeFetch(("ok", "odd", '"v1"', None), ("ok", None, '"v2"', None))
+    cache = ParityCache(path, ttl=TTL, fetch=fetch)
+    cache.fetch(now=MONDAY)
+    assert cache.fetch(now=MONDAY + TTL) == "odd"
+    assert cache.data["checked_at"] == (MONDAY + TTL).isoformat()
+
+
+def test_broken_cache_file_is_ignored(path, tmp_path):
+    (tmp_path / "cache").mkdir()
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("{не json")
+    cache = ParityCache(path, ttl=TTL, fetch=FakeFetch(("ok", "even", None, None)))
+    assert cache.data == {} and cache.week_parity(MONDAY.date()) is None
+    cache.fetch(now=MONDAY)
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f)["parity_offset"] == cache.data["parity_offset"]
@@ -0,0 +1,181 @@
+"""
+Общий сервис чётности (parity_service.py) без сети: сайт расписания заменяет benchmarks/fixture_server.py.
+Проверяется, что одновременные клиенты вызывают один запрос к сайту, срок жизни кэша и разбор неудач.
+"""
+import threading
+
+import pytest
+import requests
+
+from fixture_server import FixtureServer
+from parity_service import ParityServer, ParityService, SingleFlight, TTLCache
+
+CLIENTS = 16
+DELAY = 0.3  # ответ сайта медленнее, чем успевают прийти все клиенты
+TTL = 600
+ERROR_TTL = 30
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def concurrently(count, fn):
+    """Вызывает fn() из count потоков одновременно; результаты (или исключения) в порядке потоков."""
+    barrier = threading.Barrier(count)
+    results = [None] * count
+
+    def run(number):
+        barrier.wait()
+        try:
+            results[number] = fn()
+        except Exception as e:
+            results[number] = e
+
+    threads = [threading.Thread(target=run, args=(number,)) for number in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    return results
+
+
+@pytest.fixture
+def fixture():
+    with FixtureServer("timetable_even.html") as server:
+        yield server
+
+
+def test_concurrent_clients_share_one_upstream_request(fixture):
+    fixture.delay = DELAY
+    with ParityServer(ParityService(fixture.base_url), port=0) as server:
+        url = server.url + "/parity?group=КИ23-16"
+        replies = concurrently(CLIENTS, lambda: requests.get(url, timeout=10))
+        assert [reply.status_code for reply in replies] == [200] * CLIENTS
+        assert {reply.json()["parity"] for reply in replies} == {"even"}
+        assert fixture.requests == 1 and fixture.groups == ["КИ23-16"]
+        stats = server.service.snapshot()
+        assert stats["requests"] == CLIENTS and stats["upstream"] == 1
+        assert stats["coalesced"] + stats.get("hits", 0) == CLIENTS - 1
+
+        # Уже из кэша: сайт больше не спрашивается
+        assert requests.get(url, timeout=10).json()["parity"] == "even"
+        assert fixture.requests == 1
+
+
+def test_pages_of_different_groups_are_fetched_separately(fixture):
+    fixture.delay = DELAY
+    service = ParityService(fixture.base_url)
+    groups = ["А", "Б"] * (CLIENTS // 2)
+    pages = concurrently(CLIENTS, lambda: service.timetable_page(groups.pop())[0])
+    assert all(page == fixture.page("timetable_even.html") for page in pages)
+    assert fixture.requests == 2 and sorted(fixture.groups) == ["А", "Б"]
+    service.close()
+
+
+def test_ttl_expiry_and_revalidation(fixture):
+    clock = FakeClock()
+    service = ParityService(fixture.base_url, ttl=TTL, clock=clock)
+    assert service.week_parity()[0] == "even"
+    clock.now += TTL - 1
+    assert service.week_parity() == ("even", TTL - 1)
+    assert fixture.requests == 1
+
+    # Срок вышел, страница та же: условный запрос (304) продлевает ответ
+    clock.now += 1
+    assert service.week_parity() == ("even", 0)
+    assert fixture.requests == 2
+
+    # Страница сменилась – после следующего срока приходит новая чётность
+    fixture.fixture = "timetable_odd.html"
+    clock.now += TTL / 2
+    assert service.week_parity()[0] == "even"
+    clock.now += TTL / 2
+    assert service.week_parity()[0] == "odd"
+    assert fixture.requests == 3
+    assert service.snapshot()["upstream"] == 3
+    service.close()
+
+
+def test_upstream_error_reaches_every_waiter(fixture):
+    fixture.fixture = "timetable_no_banner.html"
+    fixture.delay = DELAY
+    service = ParityService(fixture.base_url)
+    assert [parity for parity, _ in concurrently(CLIENTS, service.week_parity)] == [None] * CLIENTS
+    assert fixture.requests == 1
+    assert service.snapshot()["errors"] == 1
+    service.close()
+
+
+def test_unreachable_upstream_over_http(fixture):
+    missing = fixture.base_url.replace("/timetable", "/missing")
+    with ParityServer(ParityService(missing), port=0) as server:
+        replies = concurrently(4, lambda: requests.get(server.url + "/parity", timeout=10))
+        assert [reply.status_code for reply in replies] == [502] * 4
+        assert requests.get(server.url + "/timetable", timeout=10).status_code == 502
+
+
+def test_error_keeps_last_answer_for_error_ttl(fixture):
+    clock = FakeClock()
+    service = ParityService(fixture.base_url, ttl=TTL, error_ttl=ERROR_TTL, clock=clock)
+    assert service.week_parity()[0] == "even"
+    fixture.fixture = "timetable_no_banner.html"
+    clock.now += TTL
+    assert service.week_parity() == ("even", TTL)  # сайт без баннера – отдаётся прежний ответ
+    clock.now += ERROR_TTL - 1
+    assert service.week_parity()[0] == "even"
+    assert fixture.requests == 2  # повторно сайт не спрашивается
+    clock.now += 1
+    fixture.fixture = "timetable_even.html"
+    assert service.week_parity() == ("even", 0)
+    assert fixture.requests == 3
+    service.close()
+
+
+def test_single_flight_shares_result_and_error():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def slow(result):
+        def fn():
+            calls.append(result)
+            release.wait(5)
+            if isinstance(result, Exception):
+                raise result
+            return result
+        return fn
+
+    timer = threading.Timer(DELAY, release.set)
+    timer.start()
+    results = concurrently(CLIENTS, lambda: flight.do("key", slow(42)))
+    assert calls == [42]
+    assert sorted(results, key=lambda item: item[1]) == [(42, False)] + [(42, True)] * (CLIENTS - 1)
+
+    release.clear()
+    timer = threading.Timer(DELAY, release.set)
+    timer.start()
+    error = ConnectionError("сайт недоступен")
+    results = concurrently(CLIENTS, lambda: flight.do("key", slow(error)))
+    assert calls == [42, error]
+    assert all(result is error for result in results)
+
+    # После завершения ключ свободен: следующий вызов выполняется заново
+    assert flight.do("key", lambda: 7) == (7, False)
+
+
+def test_ttl_cache():
+    clock = FakeClock()
+    cache = TTLCache(clock, max_entries=2)
+    cache.put("a", 1, ttl=10)
+    clock.now += 10
+    assert cache.get("a") == (1, 10, False)
+    cache.extend("a", 5)
+    assert cache.get("a") == (1, 10, True)
+    cache.put("b", 2, ttl=10)
+    cache.put("c", 3, ttl=10)
+    assert cache.get("a") is None and len(cache) == 2
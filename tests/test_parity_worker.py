@@ -0,0 +1,100 @@
+"""Фоновое получение чётности (parity_worker.py): повторы с растущей паузой и отмена."""
+import queue
+import threading
+
+from parity_worker import ParityFetcher
+
+TIMEOUT = 5
+
+
+class Timer:
+    """call_later без ожидания: запоминает паузы, fn вызывается вручную или сразу (immediate)."""
+
+    def __init__(self, immediate=0):
+        self.delays = []
+        self.pending = []
+        self.immediate = immediate  # сколько первых повторов выполнить прямо внутри call_later
+
+    def __call__(self, delay, fn):
+        self.delays.append(delay)
+        if self.immediate:
+            self.immediate -= 1
+            fn()
+        else:
+            self.pending.append(fn)
+        return self
+
+    def cancel(self):
+        pass
+
+
+def run_fetcher(fetch, timer, **kwargs):
+    """ParityFetcher и записанные результаты; done – пришла чётность."""
+    results = []
+    done = threading.Event()
+
+    def on_result(result):
+        results.append(result)
+        if result is not None:
+            done.set()
+
+    fetcher = ParityFetcher(fetch, on_result, call_later=timer, **kwargs)
+    return fetcher, results, done
+
+
+def test_retry_from_call_later_in_the_same_thread():
+    answers = iter([None, None, "even"])
+    timer = Timer(immediate=2)
+    posted = queue.Queue()
+    fetcher, results, done = run_fetcher(lambda timeout: next(answers), timer, initial_backoff=30,
+                                         post=lambda fn, *args: posted.put((fn, args)))
+
+    def main_loop():
+        # Как Clock.schedule_once: доставка – в «главном» потоке, когда фоновый запрос уже завершён
+        fetcher.request()
+        while not done.is_set():
+            fn, args = posted.get(timeout=TIMEOUT)
+            fetcher._future.result(TIMEOUT)
+            fn(*args)
+
+    loop = threading.Thread(target=main_loop, daemon=True)
+    loop.start()
+    # Раньше call_later вызывался под замком, и повтор, запущенный сразу, ждал этот же замок вечно
+    loop.join(TIMEOUT)
+    assert not loop.is_alive()
+    assert results == [None, None, "even"]
+    assert timer.delays == [30, 60]
+    assert fetcher.backoff == 30
+    fetcher.shutdown()
+
+
+def test_backoff_grows_to_max_and_resets():
+    answers = iter([None, None, None, "odd"])
+    timer = Timer()
+    fetcher, results, done = run_fetcher(lambda timeout: next(answers), timer, initial_backoff=30, max_backoff=50)
+    fetcher.request()
+    for _ in range(3):
+        fetcher._future.result(TIMEOUT)
+        timer.pending.pop()()
+    assert done.wait(TIMEOUT)
+    assert timer.delays == [30, 50, 50]
+    assert results == [None, None, None, "odd"] and fetcher.backoff == 30
+    fetcher.shutdown()
+
+
+def test_cancel_drops_late_result_and_retry():
+    release = threading.Event()
+    timer = Timer()
+
+    def fetch(timeout):
+        release.wait(TIMEOUT)
+        return None
+
+    fetcher, results, _ = run_fetcher(fetch, timer)
+    fetcher.request()
+    future = fetcher._future
+    fetcher.cancel()
+    release.set()
+    future.result(TIMEOUT)
+    assert results == [] and timer.delays == []
+    fetcher.shutdown()
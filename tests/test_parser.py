@@ -0,0 +1,64 @@
+"""Потоковый поиск баннера чётности (parser.py) и закрытие ответов сайта."""
+import os
+
+import pytest
+import requests
+
+from fixture_server import FIXTURES_DIR, FixtureServer
+from parser import fetch_week_parity, fetch_week_parity_conditional, scan_week_parity
+
+
+def chunks(data, size):
+    return [data[start:start + size] for start in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize("size", [1, 7, 64, 8192])
+def test_banner_split_across_chunks(size):
+    page = "<p>Идёт <b>нечётная</b>&nbsp;неделя</p>".encode("utf-8") + b"<table>" * 1000
+    parity, body = scan_week_parity(chunks(page, size))
+    assert parity == "odd" and body is None
+
+
+def test_page_without_banner_returns_body():
+    with open(os.path.join(FIXTURES_DIR, "timetable_no_banner.html"), "rb") as f:
+        page = f.read()
+    assert scan_week_parity(chunks(page, 100)) == (None, page)
+
+
+def test_fixture_pages_over_http():
+    with FixtureServer("timetable_odd.html") as server:
+        assert fetch_week_parity(base_url=server.base_url) == "odd"
+        assert fetch_week_parity(base_url=server.base_url, stream=False) == "odd"
+        status, parity, etag, _ = fetch_week_parity_conditional(base_url=server.base_url)
+        assert (status, parity) == ("ok", "odd")
+        assert fetch_week_parity_conditional(etag, base_url=server.base_url)[0] == "not_modified"
+
+
+class ErrorResponse:
+    status_code = 503
+
+    def __init__(self):
+        self.closed = False
+
+    def raise_for_status(self):
+        raise requests.HTTPError("503 Server Error")
+
+    def close(self):
+        self.closed = True
+
+
+class Session:
+    def __init__(self):
+        self.responses = []
+
+    def get(self, url, **kwargs):
+        self.responses.append(ErrorResponse())
+        return self.responses[-1]
+
+
+def test_error_response_is_closed():
+    # Потоковый ответ с ошибкой держал бы соединение общего пула до сборки мусора
+    session = Session()
+    assert fetch_week_parity(session=session) is None
+    assert fetch_week_parity_conditional('"v1"', session=session) == ("error", None, '"v1"', None)
+    assert [response.closed for response in session.responses] == [True, True]
@@ -0,0 +1,68 @@
+"""Очередь срабатываний (scheduler.py): недельные сроки в куче и разовые в колесе таймеров."""
+import datetime
+
+from alarm_core import Alarm
+from scheduler import AlarmScheduler
+
+START = datetime.datetime(2024, 9, 2, 6, 0)  # понедельник
+
+
+def at(hour, minute=0, days=0):
+    return START.replace(hour=hour, minute=minute) + datetime.timedelta(days=days)
+
+
+def scheduler_with(*alarms):
+    scheduler = AlarmScheduler(now=START)
+    for alarm in alarms:
+        scheduler.reindex(alarm)
+    return scheduler
+
+
+def test_heap_and_one_shot_timers_merge_in_time_order():
+    weekly = Alarm(schedule={"Понедельник": datetime.time(7, 0)})
+    other = Alarm(schedule={"Вторник": datetime.time(8, 30)})
+    scheduler = scheduler_with(weekly, other)
+    scheduler.schedule_once(other, at(6, 30))
+    assert scheduler.peek() == (at(6, 30), other)
+
+    assert scheduler.pop_due(at(6, 29)) == []
+    assert scheduler.pop_due(at(6, 30)) == [(other, at(6, 30))]
+    assert scheduler.peek() == (at(7), weekly)
+    # Разовое срабатывание позже недельного не заслоняет его
+    scheduler.schedule_once(other, at(7, 10))
+    assert scheduler.pop_due(at(7, 15)) == [(weekly, at(7)), (other, at(7, 10))]
+    assert scheduler.pending_once() == []
+    assert scheduler.peek() == (at(8, 30, days=1), other)
+
+
+def test_one_shot_at_planned_time_fires_once():
+    alarm = Alarm(schedule={"Понедельник": datetime.time(7, 0)})
+    scheduler = scheduler_with(alarm)
+    scheduler.schedule_once(alarm, at(7))
+    assert scheduler.pop_due(at(7)) == [(alarm, at(7))]
+    assert scheduler.pending_once() == []
+
+
+def test_remove_cancels_one_shot_and_reindex_all_keeps_it():
+    first = Alarm(schedule={"Понедельник": datetime.time(7, 0)})
+    second = Alarm(schedule={"Понедельник": datetime.time(9, 0)})
+    scheduler = scheduler_with(first, second)
+    scheduler.schedule_once(first, at(6, 10))
+    scheduler.schedule_once(second, at(6, 20))
+    scheduler.remove(first)
+    scheduler.reindex_all([second])
+    assert scheduler.pending_once() == [(second, at(6, 20))]
+    assert scheduler.pop_due(at(8)) == [(second, at(6, 20))]
+    assert scheduler.peek() == (at(9), second)
+
+
+def test_snooze_leaves_weekly_schedule_unchanged():
+    alarm = Alarm(schedule={"Понедельник": datetime.time(7, 0), "Среда": datetime.time(7, 30)})
+    before = dict(alarm.schedule)
+    scheduler = scheduler_with(alarm)
+    assert scheduler.pop_due(at(7)) == [(alarm, at(7))]
+    scheduler.schedule_once(alarm, at(7, 5))  # отложенный звонок
+    assert dict(alarm.schedule) == before
+    assert scheduler.pop_due(at(7, 5)) == [(alarm, at(7, 5))]
+    assert dict(alarm.schedule) == before
+    assert scheduler.peek() == (at(7, 30, days=2), alarm)
@@ -0,0 +1,121 @@
+"""Трасса моделирования (simulation.py): смена чётности, отложенные и выключенные звонки, простой устройства."""
+import datetime
+
+from alarm_core import Alarm
+from bench_storage import make_alarms
+from simulation import DISMISSED, FIRED, PARITY, SNOOZED, Simulation, TraceEvent, snooze_then_dismiss, snooze_times
+
+START = datetime.datetime(2024, 9, 2)  # понедельник, нечётная неделя
+
+
+def alarm(alarm_id, week_type="любая", **schedule):
+    created = Alarm(schedule={day: datetime.time(*at) for day, at in schedule.items()}, week_type=week_type)
+    created.id = alarm_id
+    return created
+
+
+def fired(alarm_id, at, scheduled=None):
+    return TraceEvent(at, FIRED, alarm_id, scheduled or at, None)
+
+
+def day(number, hour, minute=0):
+    return datetime.datetime(2024, 9, number, hour, minute)
+
+
+def test_parity_flip():
+    alarms = [alarm(1, "нечётная", Понедельник=(7, 0)), alarm(2, "чётная", Понедельник=(8, 0)),
+              alarm(3, Среда=(9, 0))]
+    simulation = Simulation(alarms, START, "нечётная")
+    # С 16 сентября неделя объявлена чётной, хотя по прежнему счёту была бы нечётной
+    simulation.set_week_type(day(16, 0), "чётная")
+    assert simulation.run_until(day(29, 23, 59)) == 8
+    assert simulation.trace == [
+        fired(1, day(2, 7)), fired(3, day(4, 9)),
+        fired(2, day(9, 8)), fired(3, day(11, 9)),
+        TraceEvent(day(16, 0), PARITY, None, None, "чётная"),
+        fired(2, day(16, 8)), fired(3, day(18, 9)),
+        fired(1, day(23, 7)), fired(3, day(25, 9)),
+    ]
+    assert simulation.week_type() == "нечётная"
+    assert [a.last_triggered for a in alarms] == [day(23, 7), day(16, 8), day(25, 9)]
+
+
+def test_snooze_then_dismiss():
+    wake = alarm(1, Понедельник=(7, 0), Вторник=(7, 0))
+    simulation = Simulation([wake], START, respond=snooze_then_dismiss(2))
+    simulation.run_until(day(10, 23))
+    assert simulation.trace == [
+        fired(1, day(2, 7)), TraceEvent(day(2, 7), SNOOZED, 1, None, day(2, 7, 5)),
+        fired(1, day(2, 7, 5)), TraceEvent(day(2, 7, 5), SNOOZED, 1, None, day(2, 7, 10)),
+        fired(1, day(2, 7, 10)), TraceEvent(day(2, 7, 10), DISMISSED, 1, None, None),
+    ]
+    assert wake.active is False and wake.last_triggered == day(2, 7, 10)
+    assert simulation.counts == {FIRED: 3, SNOOZED: 2, DISMISSED: 1}
+
+
+def test_snooze_keeps_weekly_schedule():
+    wake = alarm(1, Понедельник=(7, 0))
+    simulation = Simulation([wake], START, respond=snooze_times(1), snooze_minutes=10)
+    simulation.run_until(day(9, 12))
+    assert [(event.at, event.kind) for event in simulation.trace] == [
+        (day(2, 7), FIRED), (day(2, 7), SNOOZED), (day(2, 7, 10), FIRED),
+        (day(9, 7), FIRED), (day(9, 7), SNOOZED), (day(9, 7, 10), FIRED),
+    ]
+    assert wake.active
+
+
+def test_missed_downtime_replays_each_alarm_once():
+    alarms = [alarm(1, Понедельник=(7, 0)), alarm(2, Понедельник=(7, 30)), alarm(3, Вторник=(7, 0)),
+              alarm(4, Четверг=(7, 0))]
+    simulation = Simulation(alarms, START)
+    simulation.downtime(day(2, 6), day(4, 12))
+    simulation.run_until(day(10, 6))
+    assert simulation.trace == [
+        # Включение в среду: каждый пропущенный будильник – один раз, с первым пропущенным временем
+        fired(1, day(4, 12), day(2, 7)), fired(2, day(4, 12), day(2, 7, 30)), fired(3, day(4, 12), day(3, 7)),
+        fired(4, day(5, 7)),
+        fired(1, day(9, 7)), fired(2, day(9, 7, 30)),
+    ]
+
+
+def test_downtime_longer_than_a_week():
+    wake = alarm(1, Понедельник=(7, 0), Среда=(7, 0))
+    simulation = Simulation([wake], START, respond=snooze_then_dismiss(0))
+    simulation.downtime(day(1, 0), day(20, 9))
+    simulation.run_until(day(30, 0))
+    assert simulation.trace == [fired(1, day(20, 9), day(2, 7)), TraceEvent(day(20, 9), DISMISSED, 1, None, None)]
+
+
+def run_both(alarms_factory, weeks=6):
+    """Одна и та же модель пакетом (respond=None) и по шагам (ответ есть, но ничего не делает)."""
+    traces = []
+    for respond in (None, lambda alarm, at, snoozed: None):
+        alarms = alarms_factory()
+        simulation = Simulation(alarms, START, "нечётная", respond=respond)
+        simulation.set_week_type(START + datetime.timedelta(weeks=3), "нечётная")
+        simulation.run_until(START + datetime.timedelta(weeks=weeks))
+        traces.append((sorted(simulation.trace, key=lambda event: (event.at, event.kind, event.alarm_id or 0)),
+                       [a.last_triggered for a in alarms], dict(simulation.counts)))
+    return traces
+
+
+def test_batch_path_matches_step_path():
+    def alarms_factory():
+        alarms = make_alarms(300)
+        for number, created in enumerate(alarms, 1):
+            created.id = number
+        return alarms
+
+    batch, step = run_both(alarms_factory)
+    assert batch[2][FIRED] > 1000
+    assert batch == step
+
+
+def test_batch_path_matches_step_path_with_parity():
+    def alarms_factory():
+        return [alarm(1, "нечётная", Понедельник=(7, 0)), alarm(2, "чётная", Вторник=(0, 0)),
+                alarm(3, Воскресенье=(23, 59)), alarm(4, Понедельник=(0, 0), Пятница=(18, 30))]
+
+    batch, step = run_both(alarms_factory)
+    assert batch == step
+    assert [event.kind for event in batch[0]].count(PARITY) == 1
@@ -0,0 +1,108 @@
+"""Библиотека звуков (sound_store.py): обрезка WAV без ffmpeg, дедупликация и устойчивость импорта."""
+import array
+import os
+import shutil
+import sys
+import wave
+
+import pytest
+
+from sound_store import MAX_SECONDS, SoundImporter, SoundStore, normalize_wav
+
+RATE = 100  # низкая частота – минутный звук занимает килобайты
+
+
+def write_wav(path, samples, channels=1, rate=RATE, width=2):
+    data = array.array("h", samples)
+    if sys.byteorder == "big":
+        data.byteswap()
+    with wave.open(str(path), "wb") as out:
+        out.setnchannels(channels)
+        out.setsampwidth(width)
+        out.setframerate(rate)
+        out.writeframes(data.tobytes() if width == 2 else bytes(len(samples)))
+    return str(path)
+
+
+def read_wav(path):
+    with wave.open(str(path), "rb") as f:
+        samples = array.array("h", f.readframes(f.getnframes()))
+        return f.getnchannels(), samples
+
+
+def tone(count, level=10000):
+    return [level if index % 2 else -level for index in range(count)]
+
+
+def test_normalize_trims_silence_keeping_frames_whole(tmp_path):
+    # Стерео: первый громкий отсчёт – правый канал, обрезка не должна разорвать кадр
+    samples = [0] * 40 + [0, 5000] + tone(20) + [5000, 0] + [0] * 60
+    source = write_wav(tmp_path / "in.wav", samples, channels=2)
+    assert normalize_wav(source, str(tmp_path / "out.wav"))
+    channels, trimmed = read_wav(tmp_path / "out.wav")
+    assert channels == 2 and list(trimmed) == [0, 5000] + tone(20) + [5000, 0]
+
+
+def test_normalize_caps_length(tmp_path):
+    source = write_wav(tmp_path / "long.wav", [0] * RATE + tone(RATE * (MAX_SECONDS + 30)))
+    assert normalize_wav(source, str(tmp_path / "out.wav"))
+    assert read_wav(tmp_path / "out.wav")[1] == array.array("h", tone(RATE * MAX_SECONDS))
+
+
+def test_normalize_rejects_silence_and_skips_other_formats(tmp_path):
+    with pytest.raises(ValueError):
+        normalize_wav(write_wav(tmp_path / "quiet.wav", [50, -50] * RATE), str(tmp_path / "out.wav"))
+    assert not normalize_wav(write_wav(tmp_path / "8bit.wav", [0] * RATE, width=1), str(tmp_path / "out.wav"))
+    (tmp_path / "broken.wav").write_bytes(b"RIFF")
+    assert not normalize_wav(str(tmp_path / "broken.wav"), str(tmp_path / "out.wav"))
+
+
+def import_files(store, paths, **kwargs):
+    done = []
+    importer = SoundImporter(store, **kwargs)
+    importer.import_files(paths, on_done=done.append)
+    importer._executor.shutdown(wait=True)
+    assert len(done) == 1
+    return done[0]
+
+
+def test_same_file_chosen_twice_is_stored_once(tmp_path):
+    source = write_wav(tmp_path / "beep.wav", tone(RATE))
+    renamed = str(tmp_path / "renamed.wav")
+    shutil.copyfile(source, renamed)
+    store = SoundStore(str(tmp_path / "library"), ffmpeg="")
+    results = import_files(store, [source, source, renamed])
+    assert [error for _, _, error in results] == [None] * 3
+    assert len({asset for _, asset, _ in results}) == 1
+    assert len(store) == 1 and os.listdir(store.directory) == [os.path.basename(results[0][1])]
+    assert store.add(renamed) == (results[0][1], False)
+
+
+def test_silent_file_is_rejected_without_leftovers(tmp_path):
+    store = SoundStore(str(tmp_path / "library"), ffmpeg="")
+    (path, asset, error), = import_files(store, [write_wav(tmp_path / "quiet.wav", [0] * RATE)])
+    assert asset is None and error and os.listdir(store.directory) == []
+
+
+def test_unreadable_ffmpeg_output_falls_back_to_copy(tmp_path):
+    # ffmpeg, который завершается успешно, но пишет вместо WAV мусор
+    ffmpeg = tmp_path / "ffmpeg"
+    ffmpeg.write_text(f"#!{sys.executable}\nimport sys\nopen(sys.argv[-1], 'wb').write(b'RIFF')\n")
+    ffmpeg.chmod(0o755)
+    source = tmp_path / "beep.mp3"
+    source.write_bytes(b"ID3 not really mp3")
+    store = SoundStore(str(tmp_path / "library"), ffmpeg=str(ffmpeg))
+    (_, asset, error), = import_files(store, [str(source)])
+    assert error is None and asset.endswith(".mp3")
+    with open(asset, "rb") as f:
+        assert f.read() == source.read_bytes()
+    assert not any(name.endswith(".tmp") for name in os.listdir(store.directory))
+
+
+def test_unexpected_error_still_reports_done(tmp_path):
+    class BrokenStore:
+        def add(self, path, on_chunk=None, cancelled=None):
+            raise RuntimeError("сбой")
+
+    source = write_wav(tmp_path / "beep.wav", tone(RATE))
+    assert import_files(BrokenStore(), [source]) == [(source, None, "не удалось импортировать звук")]
@@ -0,0 +1,17 @@
+"""Сравнение запусков замеров (benchmarks/suite.py)."""
+from suite import compare, missing_metrics
+
+
+def report(**results):
+    return {"meta": {}, "results": {key.replace("__", "/"): value for key, value in results.items()}}
+
+
+def test_compare_flags_growth_from_zero_and_lists_missing():
+    base = report(ui__open_ms=0.0, ui__scroll_ms=10.0, ui__idle_bytes=0, ui__old_ms=1.0, ui__ok=True)
+    new = report(ui__open_ms=3.0, ui__scroll_ms=10.01, ui__idle_bytes=0, ui__new_ms=1.0, ui__ok=False)
+    rows = {row[0]: row for row in compare(base, new)}
+    assert sorted(rows) == ["ui/idle_bytes", "ui/open_ms", "ui/scroll_ms"]
+    assert rows["ui/open_ms"][4] is True
+    assert rows["ui/idle_bytes"][3:] == (0.0, False)
+    assert rows["ui/scroll_ms"][4] is False
+    assert missing_metrics(base, new) == (["ui/old_ms"], ["ui/new_ms"])
@@ -0,0 +1,259 @@
+"""
+Синхронизация нескольких устройств (sync.py) через эталонный сервер на localhost:
+устройства сходятся к одним и тем же записям при одновременных правках и удалениях.
+"""
+import datetime
+import json
+import os
+import zlib
+
+import pytest
+
+from alarm_core import Alarm
+from storage import AlarmStore
+from sync import SyncClient, SyncServer, SyncService, from_record, newer, pack, to_record, tombstone, unpack
+
+
+class Device:
+    """Хранилище и клиент одного устройства; версии правок задаются явно через часы хранилища."""
+
+    def __init__(self, directory, name, url, page_size=None):
+        self.store = AlarmStore(os.path.join(directory, name + ".db"))
+        self.client = SyncClient(self.store, url, **({"page_size": page_size} if page_size else {}))
+
+    def at(self, seconds):
+        """Следующая правка получит версию не меньше seconds * 1000."""
+        self.store.versions.clock = lambda: seconds
+        return self
+
+    def add(self, hour, minute=0, **kwargs):
+        alarm = Alarm(schedule={"Понедельник": datetime.time(hour, minute)}, **kwargs)
+        self.store.save(alarm)
+        return alarm
+
+    def alarm(self, uid):
+        return next(alarm for alarm in self.store.load() if alarm.uid == uid)
+
+    def sync(self):
+        return self.client.sync()
+
+    def records(self):
+        return sorted(json.dumps(to_record(alarm), sort_keys=True) for alarm in self.store.load())
+
+    def close(self):
+        self.store.close()
+
+
+@pytest.fixture
+def server():
+    with SyncServer(port=0) as server:
+        yield server
+
+
+@pytest.fixture
+def devices(tmp_path, server):
+    created = []
+
+    def make(name, url=None, **kwargs):
+        device = Device(str(tmp_path), name, url or server.url, **kwargs)
+        created.append(device)
+        return device
+
+    yield make
+    for device in created:
+        device.close()
+
+
+def sync_all(*devices):
+    # Два круга: изменения, принятые сервером во втором обмене, доходят до тех, кто синхронизировался раньше
+    for _ in range(2):
+        for device in devices:
+            device.sync()
+
+
+def assert_converged(*devices):
+    expected = devices[0].records()
+    assert all(device.records() == expected for device in devices[1:])
+    # После обмена отправлять нечего
+    assert all(device.store.changes() == ([], []) for device in devices)
+    return expected
+
+
+def test_new_alarms_reach_every_device(server, devices):
+    phone, laptop, tablet = devices("phone"), devices("laptop"), devices("tablet")
+    phone.add(7, sound_name="Phone")
+    laptop.add(8, sound_name="Laptop")
+    laptop.add(9, week_type="чётная")
+    sync_all(phone, laptop, tablet)
+    records = assert_converged(phone, laptop, tablet)
+    assert len(records) == 3
+    assert sorted(alarm.sound_name for alarm in tablet.store.load()) == ["Beep", "Laptop", "Phone"]
+    assert server.service.snapshot()["records"] == 3
+
+
+@pytest.mark.parametrize("first", ["phone", "laptop"])
+def test_concurrent_edits_last_writer_wins(server, devices, first):
+    phone, laptop = devices("phone"), devices("laptop")
+    uid = phone.at(1000).add(7).uid
+    sync_all(phone, laptop)
+
+    # Обе правки сделаны без связи; правка ноутбука позже
+    edited = phone.at(2000).alarm(uid)
+    edited.schedule = {"Понедельник": datetime.time(7, 15)}
+    phone.store.save(edited)
+    edited = laptop.at(3000).alarm(uid)
+    edited.schedule = {"Вторник": datetime.time(8, 0)}
+    edited.active = False
+    laptop.store.save(edited)
+
+    order = (phone, laptop) if first == "phone" else (laptop, phone)
+    order[0].sync()
+    changed, _ = order[1].sync()
+    if first == "laptop":
+        # Проигравшая правка телефона отвергнута, и сервер сразу вернул ему победившую запись
+        assert [changed_uid for changed_uid, _ in changed] == [uid]
+        assert server.service.snapshot()["conflicts"] == 1
+    else:
+        assert changed == [] and server.service.snapshot().get("conflicts", 0) == 0
+    sync_all(phone, laptop)
+    assert_converged(phone, laptop)
+    winner = phone.alarm(uid)
+    assert winner.schedule == {"Вторник": datetime.time(8, 0)} and winner.active is False
+    assert winner.version == 3000 * 1000
+
+
+def test_equal_versions_resolve_the_same_everywhere(server, devices):
+    phone, laptop = devices("phone"), devices("laptop")
+    uid = phone.at(1000).add(7).uid
+    sync_all(phone, laptop)
+    for device, hour in ((phone, 9), (laptop, 6)):
+        edited = device.at(2000).alarm(uid)
+        edited.schedule = {"Среда": datetime.time(hour, 0)}
+        device.store.save(edited)
+    sync_all(laptop, phone)
+    assert_converged(phone, laptop)
+
+
+def test_delete_leaves_tombstone(server, devices):
+    phone, laptop, tablet = devices("phone"), devices("laptop"), devices("tablet")
+    kept, removed = phone.at(1000).add(7), phone.add(8)
+    sync_all(phone, laptop)
+    laptop.at(2000).store.delete(laptop.alarm(removed.uid))
+    assert laptop.store.changes()[1] == [(removed.uid, 2000 * 1000)]
+
+    laptop.sync()
+    changed, _ = phone.sync()
+    assert changed == [(removed.uid, None)]
+    tablet.sync()
+    assert_converged(phone, laptop, tablet)
+    assert [alarm.uid for alarm in tablet.store.load()] == [kept.uid]
+
+    # Старая правка удалённого будильника его не возвращает
+    stale = Alarm(schedule={"Пятница": datetime.time(10, 0)})
+    stale.uid, stale.version = removed.uid, 1500 * 1000
+    reply = server.service.exchange({"cursor": 0, "changes": [to_record(stale)]})
+    assert tombstone(removed.uid, 2000 * 1000) in reply["changes"]
+    sync_all(phone, laptop, tablet)
+    assert [alarm.uid for alarm in phone.store.load()] == [kept.uid]
+
+
+def test_edit_newer_than_delete_restores_alarm(server, devices):
+    phone, laptop = devices("phone"), devices("laptop")
+    uid = phone.at(1000).add(7).uid
+    sync_all(phone, laptop)
+    phone.at(2000).store.delete(phone.alarm(uid))
+    edited = laptop.at(3000).alarm(uid)
+    edited.schedule = {"Понедельник": datetime.time(6, 0)}
+    laptop.store.save(edited)
+    sync_all(phone, laptop)
+    assert_converged(phone, laptop)
+    assert phone.alarm(uid).schedule == {"Понедельник": datetime.time(6, 0)}
+
+
+def test_delta_round_trip_is_compressed(server, devices):
+    phone, laptop = devices("phone"), devices("laptop")
+    for hour in range(24):
+        for minute in range(0, 60, 15):
+            phone.add(hour, minute)
+    phone.sync()
+    _, initial = laptop.sync()
+    full = [to_record(alarm) for alarm in phone.store.load()]
+    assert initial["received"] == len(full) == 96
+
+    edited = phone.alarm(full[10]["u"])
+    edited.schedule = {"Суббота": datetime.time(11, 45)}
+    phone.store.save(edited)
+    body, _ = phone.client.prepare()
+    # Тело – JSON, сжатый zlib; в нём только изменённая запись и курсор прошлого обмена
+    request = json.loads(zlib.decompress(body))
+    assert request == unpack(body)
+    assert request["changes"] == [to_record(edited)]
+    assert request["cursor"] == len(full)
+
+    _, stats = phone.sync()
+    assert stats["sent"] == 1 and stats["received"] == 0
+    changed, stats = laptop.sync()
+    assert stats["received"] == 1 and [uid for uid, _ in changed] == [edited.uid]
+    assert stats["bytes_received"] * 5 < initial["bytes_received"]
+    assert laptop.alarm(edited.uid).schedule == {"Суббота": datetime.time(11, 45)}
+    assert_converged(phone, laptop)
+
+
+def test_records_round_trip():
+    alarm = Alarm(schedule={"Понедельник": datetime.time(7, 0), "Среда": datetime.time(23, 59)},
+                  week_type="нечётная", active=False, sound_name="Звонок")
+    alarm.uid, alarm.version = "abc", 5
+    records = [to_record(alarm), tombstone("abc", 5)]
+    assert unpack(pack(records)) == records
+    restored = from_record(records[0])
+    assert (restored.schedule, restored.week_type, restored.active, restored.sound_name, restored.version) == \
+        (alarm.schedule, "нечётная", False, "Звонок", 5)
+    assert from_record(records[1]) is None
+    # При равной версии удаление побеждает
+    assert newer(records[1], records[0]) and not newer(records[0], records[1])
+    assert not newer(records[1], tombstone("abc", 6))
+
+
+def test_paging(devices):
+    with SyncServer(SyncService(page_size=7), port=0) as server:
+        phone = devices("phone", url=server.url, page_size=5)
+        laptop = devices("laptop", url=server.url, page_size=5)
+        for minute in range(23):
+            phone.add(6, minute)
+        _, stats = phone.sync()
+        assert stats["requests"] == 5 and stats["sent"] == 23
+        _, stats = laptop.sync()
+        assert stats["requests"] == 4 and stats["received"] == 23
+        assert_converged(phone, laptop)
+
+
+def test_state_changes_are_not_synced(server, devices):
+    phone, laptop = devices("phone"), devices("laptop")
+    alarm = phone.add(7)
+    sync_all(phone, laptop)
+    alarm.last_triggered = datetime.datetime(2024, 9, 2, 7, 0)
+    phone.store.update_states([alarm])
+    assert phone.store.changes() == ([], [])
+    alarm.active = False
+    phone.store.update_states([alarm])
+    sync_all(phone, laptop)
+    assert laptop.alarm(alarm.uid).active is False
+    assert laptop.alarm(alarm.uid).last_triggered is None
+
+
+def test_server_restart_resends_everything(devices):
+    phone, laptop = devices("phone"), devices("laptop")
+    kept, removed = phone.add(7), phone.add(8)
+    sync_all(phone, laptop)
+    phone.store.delete(phone.alarm(removed.uid))
+    phone.sync()
+
+    # Новый сервер – новая эпоха без записей. Ноутбук не видел удаления:
+    # после сброса его старая запись не должна вернуть будильник
+    with SyncServer(port=0) as restarted:
+        for device in (phone, laptop):
+            device.client.url = restarted.url + "/sync"
+        sync_all(phone, laptop)
+        assert_converged(phone, laptop)
+        assert [alarm.uid for alarm in laptop.store.load()] == [kept.uid]
+        assert restarted.service.snapshot()["records"] == 2  # будильник и отметка об удалении
@@ -0,0 +1,96 @@
+"""Колесо таймеров (timer_wheel.py) против простой модели – отсортированного списка сроков."""
+import datetime
+import math
+import random
+
+import pytest
+
+from timer_wheel import LEVELS, SLOTS, TimerWheel
+
+START = datetime.datetime(2024, 9, 2, 6, 0)
+SPAN = SLOTS ** LEVELS  # такты дальше этого лежат в overflow
+
+
+def seconds(value):
+    return datetime.timedelta(seconds=value)
+
+
+class Model:
+    """Ожидающие таймеры списком; срабатывает всё, чей такт (ceil) не позже текущего (floor)."""
+
+    def __init__(self):
+        self.timers = []
+
+    def fire(self, now):
+        tick = math.floor((now - START).total_seconds())
+        fired = sorted((timer for timer in self.timers if timer.tick <= tick), key=lambda timer: timer.tick)
+        self.timers = [timer for timer in self.timers if timer.tick > tick]
+        return fired
+
+    def earliest_tick(self):
+        return min((timer.tick for timer in self.timers), default=None)
+
+
+def random_offset(rng):
+    # Сроки на всех уровнях колеса, в overflow и в прошлом, в том числе дробные
+    kind = rng.random()
+    if kind < 0.1:
+        return -rng.uniform(0, 100)
+    if kind < 0.9:
+        return rng.uniform(0, SLOTS ** rng.randint(1, LEVELS))
+    return rng.uniform(SPAN, 3 * SPAN)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_random_operations_match_sorted_list(seed):
+    rng = random.Random(seed)
+    wheel, model = TimerWheel(START), Model()
+    now = START
+    for _ in range(400):
+        action = rng.random()
+        if action < 0.5:
+            timer = wheel.schedule(now + seconds(random_offset(rng)), len(model.timers))
+            model.timers.append(timer)
+        elif action < 0.65 and model.timers:
+            timer = model.timers.pop(rng.randrange(len(model.timers)))
+            wheel.cancel(timer)
+            assert not timer.pending
+            wheel.cancel(timer)  # повторная отмена ничего не меняет
+        else:
+            # Шаги от долей такта до прыжков через несколько уровней (_jump и перекладка ячеек)
+            now += seconds(rng.choice([rng.uniform(0, 2), rng.uniform(0, SLOTS ** rng.randint(1, LEVELS + 1))]))
+            fired = wheel.advance(now)
+            expected = model.fire(now)
+            assert sorted(map(id, fired)) == sorted(map(id, expected))
+            assert [timer.tick for timer in fired] == sorted(timer.tick for timer in fired)
+            assert all(timer.when <= now and not timer.pending for timer in fired)
+        assert len(wheel) == len(model.timers)
+        earliest = wheel.peek()
+        assert (earliest.tick if earliest else None) == model.earliest_tick()
+        if earliest is not None:
+            assert wheel.next_deadline() == START + seconds(earliest.tick) >= earliest.when
+
+
+def test_timer_in_far_slot_cascades_down_without_firing_early():
+    wheel = TimerWheel(START)
+    far = wheel.schedule(START + seconds(SLOTS ** 2 + 5), "far")
+    near = wheel.schedule(START + seconds(SLOTS + 1.5), "near")
+    assert wheel.peek() is near
+    assert wheel.advance(START + seconds(SLOTS + 1)) == []
+    assert wheel.advance(START + seconds(SLOTS + 2)) == [near]
+    # Переход через границу ячейки второго уровня перекладывает far вниз, но не выдаёт его
+    assert wheel.advance(START + seconds(SLOTS ** 2 + 4)) == []
+    assert far.pending and wheel.peek() is far
+    assert wheel.advance(START + seconds(SLOTS ** 2 + 5)) == [far]
+    assert len(wheel) == 0 and wheel.peek() is None and wheel.next_deadline() is None
+
+
+def test_overflow_and_past_timers():
+    wheel = TimerWheel(START)
+    late = wheel.schedule(START + seconds(SPAN + 10), "late")
+    assert wheel.peek() is late
+    past = wheel.schedule(START - seconds(30), "past")
+    assert wheel.peek() is past
+    assert wheel.advance(START) == [past]
+    assert wheel.advance(START + seconds(SPAN + 9)) == []
+    assert wheel.advance(START + seconds(2 * SPAN)) == [late]
@@ -0,0 +1,132 @@
+"""Разбор расписания из сохранённых страниц (benchmarks/fixtures) и будильники по нему."""
+import datetime
+import os
+
+import pytest
+
+from timetable import Lesson, TimetableCache, first_lessons, generate_alarms, parse_timetable
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "fixtures")
+ODD, EVEN = "нечётная", "чётная"
+
+# Расписание, сохранённое в timetable_*.html; страницы отличаются только плашкой текущей недели
+FIXTURE_LESSONS = [
+    Lesson(0, ODD, 2, 615, 710, "Математический анализ"),
+    Lesson(0, EVEN, 2, 615, 710, "Математический анализ"),
+    Lesson(0, ODD, 3, 720, 815, "Алгоритмы и структуры данных"),
+    Lesson(0, EVEN, 3, 720, 815, "Алгоритмы и структуры данных"),
+    Lesson(1, EVEN, 3, 720, 815, "Математический анализ"),
+    Lesson(1, EVEN, 4, 850, 945, "Дискретная математика"),
+    Lesson(2, ODD, 3, 720, 815, "Английский язык"),
+    Lesson(2, EVEN, 3, 720, 815, "Английский язык"),
+    Lesson(2, ODD, 4, 850, 945, "Базы данных"),
+    Lesson(2, EVEN, 4, 850, 945, "Базы данных"),
+    Lesson(3, ODD, 1, 510, 605, "Английский язык"),
+    Lesson(3, ODD, 2, 615, 710, "Алгоритмы и структуры данных"),
+    Lesson(3, EVEN, 2, 615, 710, "Алгоритмы и структуры данных"),
+    Lesson(4, EVEN, 2, 615, 710, "Алгоритмы и структуры данных"),
+    Lesson(4, EVEN, 3, 720, 815, "Алгоритмы и структуры данных"),
+    Lesson(5, ODD, 3, 720, 815, "Базы данных"),
+    Lesson(5, EVEN, 3, 720, 815, "Базы данных"),
+]
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def page(rows, header=("Нечётная неделя", "Чётная неделя")):
+    head = "".join(f"<th>{text}</th>" for text in ("№", "Время") + header)
+    return f'<table class="timetable"><tr>{head}</tr>{"".join(rows)}</table>'
+
+
+def day(name):
+    return f'<tr><th colspan="4">{name}</th></tr>'
+
+
+def row(number, time, *cells):
+    return f"<tr><td>{number}</td><td>{time}</td>" + "".join(f"<td>{cell}</td>" for cell in cells) + "</tr>"
+
+
+@pytest.mark.parametrize("name", ["timetable_even.html", "timetable_odd.html", "timetable_no_banner.html"])
+def test_parse_fixture(name):
+    assert parse_timetable(read_fixture(name)) == FIXTURE_LESSONS
+
+
+def test_first_lessons_per_week_type():
+    # Вторник и пятница – только по чётным неделям, воскресенье пустое в обеих
+    assert first_lessons(FIXTURE_LESSONS, ODD) == {0: 615, 2: 720, 3: 510, 5: 720}
+    assert first_lessons(FIXTURE_LESSONS, EVEN) == {0: 615, 1: 720, 2: 720, 3: 615, 4: 615, 5: 720}
+
+
+def test_generate_alarms_from_fixture():
+    alarms = generate_alarms(parse_timetable(read_fixture("timetable_even.html")), lead_minutes=60, source="g")
+    by_type = {alarm.week_type: alarm for alarm in alarms}
+    assert sorted(by_type) == [ODD, EVEN]
+    assert by_type[ODD].schedule == {"Понедельник": datetime.time(9, 15), "Среда": datetime.time(11, 0),
+                                     "Четверг": datetime.time(7, 30), "Суббота": datetime.time(11, 0)}
+    assert by_type[EVEN].schedule == {"Понедельник": datetime.time(9, 15), "Вторник": datetime.time(11, 0),
+                                      "Среда": datetime.time(11, 0), "Четверг": datetime.time(9, 15),
+                                      "Пятница": datetime.time(9, 15), "Суббота": datetime.time(11, 0)}
+    assert all(alarm.source == "g" and alarm.active for alarm in alarms)
+
+
+def test_same_weeks_give_one_alarm_for_any_week():
+    lessons = [lesson for lesson in FIXTURE_LESSONS if lesson.weekday in (0, 2, 5)]
+    alarms = generate_alarms(lessons, lead_minutes=30)
+    assert len(alarms) == 1
+    assert alarms[0].week_type == "любая"
+    assert alarms[0].schedule == {"Понедельник": datetime.time(9, 45), "Среда": datetime.time(11, 30),
+                                  "Суббота": datetime.time(11, 30)}
+
+
+def test_lead_time_before_midnight_is_clamped():
+    alarms = generate_alarms([Lesson(0, ODD, 1, 30, 120, "Ночная пара"), Lesson(0, EVEN, 1, 30, 120, "Ночная пара")],
+                             lead_minutes=60)
+    assert alarms[0].schedule == {"Понедельник": datetime.time(0, 0)}
+
+
+def test_empty_days_and_cells():
+    html = page([day("Понедельник"),
+                 row(1, "8:30-10:05", "<b>Физика</b> (лекция)", ""),
+                 day("Вторник"),  # день без занятий
+                 day("Среда"),
+                 row(2, "10:15-11:50", "", ""),  # пустая пара в обе недели
+                 row(3, "12:00-13:35", "", "<b>Химия</b>")])
+    assert parse_timetable(html) == [Lesson(0, ODD, 1, 510, 605, "Физика"), Lesson(2, EVEN, 3, 720, 815, "Химия")]
+    alarms = generate_alarms(parse_timetable(html), lead_minutes=0)
+    assert {alarm.week_type: alarm.schedule for alarm in alarms} == {
+        ODD: {"Понедельник": datetime.time(8, 30)}, EVEN: {"Среда": datetime.time(12, 0)}}
+
+
+def test_only_one_week_type_has_lessons():
+    alarms = generate_alarms(parse_timetable(page([day("Пятница"), row(1, "8:30-10:05", "", "<b>Химия</b>")])))
+    assert [(alarm.week_type, alarm.schedule) for alarm in alarms] == [(EVEN, {"Пятница": datetime.time(7, 30)})]
+
+
+def test_column_order_from_header():
+    html = page([day("Понедельник"), row(1, "8:30-10:05", "<b>Физика</b>", "<b>Химия</b>")],
+                header=("Чётная неделя", "Нечётная неделя"))
+    assert parse_timetable(html) == [Lesson(0, EVEN, 1, 510, 605, "Физика"), Lesson(0, ODD, 1, 510, 605, "Химия")]
+
+
+def test_page_without_timetable():
+    assert parse_timetable("<html><body>Расписание не найдено</body></html>") == []
+    assert generate_alarms([]) == []
+
+
+def test_cache_regenerates_without_fetching(tmp_path):
+    html = read_fixture("timetable_odd.html")
+    now = datetime.datetime(2024, 9, 2, 8, 0)
+    assert TimetableCache(str(tmp_path), fetch_page=lambda group: html).get("g", now) == FIXTURE_LESSONS
+
+    def offline(group):
+        raise AssertionError("свежий кэш не должен обращаться к сайту")
+
+    cache = TimetableCache(str(tmp_path), fetch_page=offline)
+    assert cache.get("g", now + datetime.timedelta(days=1)) == FIXTURE_LESSONS
+    # Устаревший кэш перечитывается, а если сайт недоступен – остаётся прежним
+    stale = TimetableCache(str(tmp_path), fetch_page=lambda group: None)
+    assert stale.get("g", now + datetime.timedelta(days=30)) == FIXTURE_LESSONS
+    assert TimetableCache(str(tmp_path / "empty"), fetch_page=lambda group: None).get("g", now) is None
@@ -0,0 +1,156 @@
+"""
+Иерархическое колесо таймеров для разовых срабатываний (отложенные будильники, напоминания).
+
+Время делится на такты по resolution секунд. Уровень L колеса – SLOTS ячеек по SLOTS**L тактов.
+Таймер кладётся на уровень, где его такт впервые расходится с текущим (старшие разряды
+совпадают), поэтому добавление и отмена – O(1): ячейка – словарь, используемый как
+упорядоченное множество. При переходе к следующей ячейке уровня её таймеры
+перекладываются на нижние уровни. Таймеры дальше LEVELS уровней ждут отдельно.
+"""
+import datetime
+import math
+
+SLOT_BITS = 6
+SLOTS = 1 << SLOT_BITS
+LEVELS = 4  # при тактах в 1 секунду колесо охватывает 64**4 с ≈ 194 дня
+
+
+class Timer:
+    __slots__ = ("when", "payload", "tick", "_slot")
+
+    def __init__(self, when, payload, tick):
+        self.when = when
+        self.payload = payload
+        self.tick = tick
+        self._slot = None  # словарь ячейки, в которой лежит таймер
+
+    @property
+    def pending(self):
+        return self._slot is not None
+
+
+class TimerWheel:
+    def __init__(self, now, resolution=1):
+        """
+        :param now: datetime.datetime – начало отсчёта тактов
+        :param resolution: длительность такта, сек
+        """
+        self.origin = now
+        self.resolution = resolution
+        self.tick = 0
+        self._levels = [[{} for _ in range(SLOTS)] for _ in range(LEVELS)]
+        self._overflow = {}
+        self._due = {}  # таймеры, срок которых наступил к моменту добавления
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def _seconds(self, when):
+        return (when - self.origin).total_seconds() / self.resolution
+
+    def schedule(self, when, payload):
+        """Добавляет таймер на время when; возвращает Timer для отмены."""
+        # Такт округляется вверх, чтобы таймер не сработал раньше срока
+        timer = Timer(when, payload, math.ceil(self._seconds(when)))
+        self._place(timer)
+        self._count += 1
+        return timer
+
+    def cancel(self, timer):
+        if timer._slot is not None:
+            del timer._slot[timer]
+            timer._slot = None
+            self._count -= 1
+
+    def _place(self, timer):
+        diff = timer.tick ^ self.tick
+        if timer.tick <= self.tick:
+            slot = self._due
+        else:
+            level = (diff.bit_length() - 1) // SLOT_BITS
+            if level >= LEVELS:
+                slot = self._overflow
+            else:
+                slot = self._levels[level][(timer.tick >> (SLOT_BITS * level)) & (SLOTS - 1)]
+        slot[timer] = None
+        timer._slot = slot
+
+    def _jump(self, tick):
+        # Переход к такту tick, раньше которого таймеров нет: ячейки, в которые попал tick, разбираются сверху вниз
+        crossed_overflow = (tick >> (SLOT_BITS * LEVELS)) != (self.tick >> (SLOT_BITS * LEVELS))
+        self.tick = tick
+        if crossed_overflow and self._overflow:
+            self._cascade(self._overflow)
+        for level in range(LEVELS - 1, 0, -1):
+            slot = self._levels[level][(tick >> (SLOT_BITS * level)) & (SLOTS - 1)]
+            if slot:
+                self._cascade(slot)
+        slot = self._levels[0][tick & (SLOTS - 1)]
+        if slot:
+            self._cascade(slot)
+
+    def _cascade(self, slot):
+        timers = list(slot)
+        slot.clear()
+        for timer in timers:
+            self._place(timer)
+
+    def _earliest(self):
+        """Таймер с наименьшим тактом или None."""
+        if self._due:
+            return min(self._due, key=lambda timer: timer.tick)
+        # Все таймеры уровня L позже любого таймера уровня L-1, поэтому достаточно первой непустой ячейки
+        for level in range(LEVELS):
+            slots = self._levels[level]
+            for index in range(((self.tick >> (SLOT_BITS * level)) & (SLOTS - 1)) + 1, SLOTS):
+                if slots[index]:
+                    if level == 0:
+                        return next(iter(slots[index]))
+                    return min(slots[index], key=lambda timer: timer.tick)
+        if self._overflow:
+            return min(self._overflow, key=lambda timer: timer.tick)
+        return None
+
+    def _next_event(self):
+        """Ближайший такт, на котором нужно что-то сделать: выдать таймеры или разобрать ячейку; None – таймеров нет."""
+        for level in range(LEVELS):
+            shift = SLOT_BITS * level
+            slots = self._levels[level]
+            for index in range(((self.tick >> shift) & (SLOTS - 1)) + 1, SLOTS):
+                if slots[index]:
+                    return ((self.tick >> (shift + SLOT_BITS)) << (shift + SLOT_BITS)) | (index << shift)
+        if self._overflow:
+            return ((self.tick >> (SLOT_BITS * LEVELS)) + 1) << (SLOT_BITS * LEVELS)
+        return None
+
+    def peek(self):
+        """Ближайший таймер или None."""
+        return self._earliest()
+
+    def next_deadline(self):
+        """Когда сработает ближайший таймер: начало его такта (не раньше timer.when) или None."""
+        timer = self._earliest()
+        if timer is None:
+            return None
+        return self.origin + datetime.timedelta(seconds=timer.tick * self.resolution)
+
+    def advance(self, now):
+        """Сдвигает колесо к моменту now и возвращает сработавшие таймеры в порядке сроков."""
+        target = math.floor(self._seconds(now))
+        fired = []
+        while True:
+            fired.extend(self._take_due())
+            if target <= self.tick:
+                break
+            tick = self._next_event()
+            self._jump(target if tick is None or tick > target else tick)
+        return fired
+
+    def _take_due(self):
+        timers = sorted(self._due, key=lambda timer: timer.tick)
+        for timer in timers:
+            timer._slot = None
+        self._due.clear()
+        self._count -= len(timers)
+        return timers
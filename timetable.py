@@ -0,0 +1,184 @@
+"""
+Разбор расписания группы с edu.sfu-kras.ru и создание будильников по нему.
+
+Расписание хранится компактно: список занятий (день недели, тип недели,
+номер пары, начало и конец в минутах от полуночи, название). Разобранные
+расписания кэшируются по группам в памяти и на диске, поэтому повторное
+создание будильников не требует ни сети, ни разбора HTML.
+"""
+import datetime
+import hashlib
+import json
+import os
+import re
+from collections import namedtuple
+
+from alarm_core import Alarm, DAYS_OF_WEEK
+
+Lesson = namedtuple("Lesson", "weekday week_type number start end title")
+
+# Расписание группы перепроверяется на сайте не чаще раза в неделю
+DEFAULT_MAX_AGE = datetime.timedelta(days=7)
+# За сколько минут до первой пары звонит будильник по умолчанию
+DEFAULT_LEAD_MINUTES = 60
+
+TIME_RANGE_PATTERN = re.compile(r'(\d{1,2}):(\d{2})\s*[-–]\s*(\d{1,2}):(\d{2})')
+
+
+def _week_type_of_header(text):
+    text = text.lower()
+    if "неч" in text or "1 нед" in text:
+        return "нечётная"
+    if "чёт" in text or "чет" in text or "2 нед" in text:
+        return "чётная"
+    return None
+
+
+def parse_timetable(page):
+    """
+    Разбирает HTML страницы расписания.
+
+    :return: список Lesson; занятие, идущее каждую неделю, попадает в список дважды – для каждого типа недели
+    """
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(page, 'html.parser')
+    table = soup.find("table", class_="timetable")
+    if table is None:
+        return []
+    columns = ["нечётная", "чётная"]
+    weekday = None
+    lessons = []
+    for row in table.find_all("tr"):
+        headers = row.find_all("th")
+        if headers:
+            text = headers[0].get_text(" ", strip=True)
+            if text in DAYS_OF_WEEK:
+                weekday = DAYS_OF_WEEK.index(text)
+            else:
+                header_types = [_week_type_of_header(th.get_text(" ", strip=True)) for th in headers[2:]]
+                if len(header_types) == 2 and None not in header_types:
+                    columns = header_types
+            continue
+        cells = row.find_all("td")
+        if weekday is None or len(cells) < 3:
+            continue
+        match = TIME_RANGE_PATTERN.search(cells[1].get_text(" ", strip=True))
+        if match is None:
+            continue
+        start = int(match.group(1)) * 60 + int(match.group(2))
+        end = int(match.group(3)) * 60 + int(match.group(4))
+        try:
+            number = int(cells[0].get_text(strip=True))
+        except ValueError:
+            number = 0
+        lesson_cells = cells[2:]
+        if len(lesson_cells) == 1:
+            # Одна ячейка на две колонки – занятие идёт каждую неделю
+            lesson_cells = lesson_cells * 2
+        for week_type, cell in zip(columns, lesson_cells):
+            title_tag = cell.find("b")
+            title = (title_tag or cell).get_text(" ", strip=True)
+            if title:
+                lessons.append(Lesson(weekday, week_type, number, start, end, title))
+    return lessons
+
+
+def first_lessons(lessons, week_type):
+    """Начало первой пары по дням недели: {номер дня: минуты от полуночи}."""
+    result = {}
+    for lesson in lessons:
+        if lesson.week_type == week_type and lesson.start < result.get(lesson.weekday, 24 * 60):
+            result[lesson.weekday] = lesson.start
+    return result
+
+
+def generate_alarms(lessons, lead_minutes=DEFAULT_LEAD_MINUTES, sound="Sounds/Beep.mp3", sound_name="Beep",
+                    source=None):
+    """
+    Будильники за lead_minutes до первой пары каждого дня.
+    Если по чётным и нечётным неделям первые пары совпадают, создаётся один будильник на любую неделю.
+    """
+    schedules = {}
+    for week_type in ("нечётная", "чётная"):
+        schedule = {}
+        for weekday, start in sorted(first_lessons(lessons, week_type).items()):
+            minute = max(start - lead_minutes, 0)
+            schedule[DAYS_OF_WEEK[weekday]] = datetime.time(minute // 60, minute % 60)
+        schedules[week_type] = schedule
+    if schedules["нечётная"] == schedules["чётная"]:
+        schedules = {"любая": schedules["чётная"]}
+    return [Alarm(schedule=schedule, week_type=week_type, sound=sound, sound_name=sound_name, source=source)
+            for week_type, schedule in schedules.items() if schedule]
+
+
+def _lessons_to_json(lessons):
+    return [list(lesson) for lesson in lessons]
+
+
+def _lessons_from_json(rows):
+    return [Lesson(*row) for row in rows]
+
+
+class TimetableCache:
+    """Разобранные расписания групп: в памяти и в JSON-файлах в directory."""
+
+    def __init__(self, directory, max_age=DEFAULT_MAX_AGE, fetch_page=None):
+        """
+        :param directory: каталог для файлов кэша
+        :param max_age: datetime.timedelta – после этого срока расписание перечитывается с сайта
+        :param fetch_page: fetch_page(group) -> HTML или None (по умолчанию parser.fetch_timetable_page)
+        """
+        self.directory = directory
+        self.max_age = max_age
+        if fetch_page is None:
+            from parser import fetch_timetable_page as fetch_page
+        self._fetch_page = fetch_page
+        self._memory = {}  # группа -> (время получения, список Lesson)
+
+    def _path(self, group):
+        name = hashlib.sha1(group.encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.directory, f"timetable_{name}.json")
+
+    def _load(self, group):
+        try:
+            with open(self._path(group), encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("group") != group:
+                return None
+            return datetime.datetime.fromisoformat(data["fetched_at"]), _lessons_from_json(data["lessons"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _save(self, group, fetched_at, lessons):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(group)
+        try:
+            with open(path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump({"group": group, "fetched_at": fetched_at.isoformat(),
+                           "lessons": _lessons_to_json(lessons)}, f, ensure_ascii=False)
+            os.replace(path + ".tmp", path)
+        except OSError as e:
+            print("Не удалось сохранить расписание:", e)
+
+    def get(self, group, now=None, refresh=False):
+        """
+        Расписание группы: из памяти, с диска или с сайта (если кэш устарел или refresh=True).
+        Если сайт недоступен, возвращается устаревший кэш; если кэша нет – None.
+        """
+        now = now if now is not None else datetime.datetime.now()
+        cached = self._memory.get(group)
+        if cached is None:
+            cached = self._load(group)
+            if cached is not None:
+                self._memory[group] = cached
+        if cached is not None and not refresh and now - cached[0] < self.max_age:
+            return cached[1]
+
+        page = self._fetch_page(group)
+        lessons = parse_timetable(page) if page else []
+        if not lessons:
+            return cached[1] if cached is not None else None
+        self._memory[group] = (now, lessons)
+        self._save(group, now, lessons)
+        return lessons